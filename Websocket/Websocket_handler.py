@@ -1,21 +1,40 @@
-import websocket
-import json
 import threading
-import time
 from trading.binance_futures import execute_trade
 from risk_management.leverage_manager import dynamic_leverage
 from risk_management.stop_loss import calculate_dynamic_stop_loss, calculate_dynamic_take_profit
 from ai_models.reinforcement_trading import reinforcement_trade
-from notifications.telegram_bot import send_telegram_message
+from notifications.telegram_bot import send_telegram_message, PRIORITY_CRITICAL
+from config.app_context import get_app_context
+from Websocket.candle_aggregator import get_candle_aggregator, backfill_agg_trades, start_flush_timer
+from Websocket.message_pipeline import MessagePipeline
+from Websocket.stream_manager import get_stream_manager
+from config.config import (WS_PIPELINE_WORKERS, WS_PIPELINE_MAXSIZE, WS_COALESCE_MODE, WS_SYMBOLS,
+                           WS_GAP_BACKFILL_MAX_PAGES)
 
-BINANCE_WS_URL = "wss://fstream.binance.com/ws/btcusdt@aggTrade"
+TRADING_SYMBOL = WS_SYMBOLS[0] if WS_SYMBOLS else "BTCUSDT"  # Strateji sadece bu sembolün işlemleriyle çalışır
 
-def on_message(ws, message):
+def on_agg_trade(symbol, stream_type, data):
     """
-    WebSocket mesajlarını işleyerek botun işlem stratejisini uygular.
+    Alma thread'i: aggTrade mesajını canlı bar üreticisine ekler ve işlem
+    sembolünün strateji işini kuyruğa bırakır. Strateji, emir ve Telegram
+    çağrıları burada yapılmaz; böylece yoğun piyasada soket geride kalmaz.
+    Diğer semboller (ör. hedge için ETHUSDT) sadece barları ve son fiyat önbelleğini besler.
+    """
+    try:
+        # İşlemi canlı bar üreticisine ekle (modeller son barları REST çağrısı olmadan alır)
+        get_candle_aggregator(symbol).on_agg_trade(data)
+
+        if symbol == TRADING_SYMBOL:
+            get_message_pipeline().submit(data)
+
+    except Exception as e:
+        print(f"⚠️ Hata: {e}")
+
+def process_trade(data):
+    """
+    İşçi thread'i: kuyruktan gelen (birleştirilmiş) işlem mesajı için botun işlem stratejisini uygular.
     """
     try:
-        data = json.loads(message)
         price = float(data["p"])  # Güncel işlem fiyatı
 
         # AI destekli işlem kararı
@@ -38,55 +57,61 @@ def on_message(ws, message):
 
         send_telegram_message(
             f"📈 AI İşlem Kararı: {trade_decision} | Fiyat: {price} | Kaldıraç: {leverage}x"
-            f"\n🛑 Stop-Loss: {stop_loss} | 🎯 Take-Profit: {take_profit}"
+            f"\n🛑 Stop-Loss: {stop_loss} | 🎯 Take-Profit: {take_profit}",
+            key=f"ws_trade_decision:{data.get('s', TRADING_SYMBOL)}"  # Gönderilmeyi bekleyen eski karar en yenisiyle değişir
         )
 
     except Exception as e:
         print(f"⚠️ Hata: {e}")
-        send_telegram_message(f"⚠️ Veri işleme hatası: {e}")
+        send_telegram_message(f"⚠️ Veri işleme hatası: {e}", priority=PRIORITY_CRITICAL, key="ws_process_error")
 
-def on_error(ws, error):
-    """
-    WebSocket bağlantısı sırasında hata oluşursa Telegram'a bildirir.
-    """
-    print(f"⚠️ WebSocket Hatası: {error}")
-    send_telegram_message(f"⚠️ WebSocket Hatası: {error}")
+def get_message_pipeline():
+    """Strateji işçilerini besleyen paylaşılan mesaj hattı (ilk çağrıda başlatılır)."""
+    return get_app_context().get_or_create(
+        "ws_message_pipeline",
+        lambda: MessagePipeline(process_trade, num_workers=WS_PIPELINE_WORKERS, maxsize=WS_PIPELINE_MAXSIZE,
+                                coalesce=WS_COALESCE_MODE).start()
+    )
 
-def on_close(ws, close_status_code, close_msg):
+def on_stream_reconnect(streams, downtime_seconds):
     """
-    WebSocket bağlantısı kesildiğinde log kaydı yapar ve tekrar başlatır.
+    Bağlantı kopup yeniden açıldığında (ilk mesajdan önce) çağrılır: her
+    aggTrade akışı için son görülen işlem kimliği alınır ve aradaki işlemler
+    ayrı bir thread'de REST ile barlara eklenir.
     """
-    print("🔌 WebSocket Bağlantısı Kapandı. 10 saniye içinde tekrar bağlanıyor...")
-    send_telegram_message("🔄 WebSocket Bağlantısı Kapandı! 10 saniye içinde tekrar bağlanıyor...")
-    time.sleep(10)
-    start_websocket()  # Tekrar bağlanmayı sağla
+    for name in streams:
+        if not name.endswith("@aggTrade"):
+            continue
+        aggregator = get_candle_aggregator(name.split("@", 1)[0])
+        if aggregator.last_agg_id is None:
+            continue
+        threading.Thread(target=_backfill_gap, args=(aggregator, aggregator.last_agg_id + 1, downtime_seconds),
+                         name=f"aggtrade-backfill-{aggregator.symbol}", daemon=True).start()
 
-def on_open(ws):
+def _backfill_gap(aggregator, from_id, downtime_seconds):
+    try:
+        added = backfill_agg_trades(aggregator, from_id, max_pages=WS_GAP_BACKFILL_MAX_PAGES)
+        print(f"🧩 {aggregator.symbol}: {downtime_seconds:.1f} sn kesintide kaçan {added} işlem REST ile tamamlandı")
+    except Exception as e:
+        print(f"⚠️ {aggregator.symbol} işlem boşluğu doldurulamadı: {e}")
+        send_telegram_message(f"⚠️ {aggregator.symbol} işlem boşluğu doldurulamadı: {e}")
+
+def start_websocket():
     """
-    WebSocket bağlantısı başarılı olursa log kaydı yapar.
+    WS_SYMBOLS içindeki sembollerin aggTrade akışlarına birleşik akış
+    bağlantısı üzerinden abone olur ve bağlantıları başlatır.
     """
-    print("✅ Binance WebSocket Bağlantısı Açıldı")
-    send_telegram_message("✅ Binance WebSocket Bağlantısı Açıldı!")
+    manager = get_stream_manager()
+    if on_stream_reconnect not in manager.reconnect_listeners:
+        manager.on_reconnect(on_stream_reconnect)
+    for symbol in WS_SYMBOLS:
+        manager.subscribe(symbol, "aggTrade", on_agg_trade)
+    start_flush_timer(WS_SYMBOLS)  # Sakin piyasada da barlar zamanında kapanır
+    return manager.start()
 
-def start_websocket():
+def start_websocket_thread():
     """
-    Binance WebSocket bağlantısını başlatır ve hata durumunda tekrar bağlanır.
+    Akış yöneticisini (süreç başına bir kez) başlatır; her bağlantı kendi
+    thread'inde çalışır. Modül içe aktarıldığında bağlantı açılmaz.
     """
-    while True:
-        try:
-            ws = websocket.WebSocketApp(
-                BINANCE_WS_URL,
-                on_message=on_message,
-                on_error=on_error,
-                on_close=on_close
-            )
-            ws.on_open = on_open
-            ws.run_forever()
-        except Exception as e:
-            print(f"⚠️ WebSocket Yeniden Başlatılıyor... Hata: {e}")
-            send_telegram_message(f"⚠️ WebSocket Yeniden Başlatılıyor... Hata: {e}")
-            time.sleep(10)  # Bağlantıyı tekrar denemeden önce bekleme süresi
-
-# WebSocket'i ayrı bir thread içinde çalıştır
-ws_thread = threading.Thread(target=start_websocket, daemon=True)
-ws_thread.start()
+    return start_websocket()
@@ -0,0 +1,421 @@
+import json
+import threading
+import time
+import numpy as np
+from collections import deque
+from config.app_context import get_app_context, get_binance_transport
+from data_fetch.ohlcv_store import OHLCVView
+
+# 📌 Desteklenen bar aralıkları (milisaniye)
+TIMEFRAMES_MS = {"1s": 1_000, "1m": 60_000, "5m": 300_000, "1h": 3_600_000}
+
+# 📌 Her aralık için bellekte tutulan kapanmış bar sayısı
+DEFAULT_CAPACITY = {"1s": 3_600, "1m": 1_440, "5m": 2_016, "1h": 1_000}
+
+# 📌 Bar kolonları ve veri tipleri
+BAR_COLUMNS = {
+    "open_time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "buy_volume": np.float64,   # Alıcının agresif (taker) olduğu hacim
+    "quote_volume": np.float64,
+    "vwap": np.float64,
+    "trades": np.int64,
+    "first_trade_time": np.int64,
+    "last_trade_time": np.int64,
+}
+
+# Açık barın alanları: liste indeksleri (sözlük yerine liste; her işlemde daha hızlı)
+_OPEN_TIME, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _BUY, _QUOTE, _TRADES, _FIRST_T, _LAST_T = range(11)
+
+def _bar_dict(bar):
+    """Açık bar listesini kapanmış bar sözlüğüne çevirir."""
+    volume = bar[_VOLUME]
+    return {
+        "open_time": bar[_OPEN_TIME], "open": bar[_OPEN], "high": bar[_HIGH], "low": bar[_LOW],
+        "close": bar[_CLOSE], "volume": volume, "buy_volume": bar[_BUY], "quote_volume": bar[_QUOTE],
+        "vwap": bar[_QUOTE] / volume if volume else bar[_CLOSE], "trades": bar[_TRADES],
+        "first_trade_time": bar[_FIRST_T], "last_trade_time": bar[_LAST_T],
+    }
+
+# **📌 Tek Aralık İçin Halka Tamponlu Bar Serisi**
+class BarRing:
+    """
+    Tek bir aralığın (örn. 1m) açık barını ve son `capacity` kapanmış barını tutar.
+    Kolonlar RollingPriceWindow gibi çift yazılır; son N bar her zaman bitişik
+    bir dilimdir ve kopyalanmadan okunabilir.
+    """
+
+    def __init__(self, interval_ms, capacity):
+        self.interval_ms = interval_ms
+        self.capacity = capacity
+        self.columns = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in BAR_COLUMNS.items()}
+        self.position = 0  # Bir sonraki kapanmış barın yazılacağı indeks
+        self.count = 0     # Tampondaki kapanmış bar sayısı (en fazla capacity)
+        self.current = None  # Açık bar (liste) veya None
+
+    def _write(self, bar):
+        for name, value in bar.items():
+            column = self.columns[name]
+            column[self.position] = value
+            column[self.position + self.capacity] = value
+        self.position = (self.position + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _close_current(self, closed):
+        bar = _bar_dict(self.current)
+        self._write(bar)
+        closed.append(bar)
+        self.current = None
+
+    def _new_bar(self, open_time, price, qty, is_buyer_maker, trade_count, trade_time):
+        self.current = [open_time, price, price, price, price, qty, 0.0 if is_buyer_maker else qty,
+                        price * qty, trade_count, trade_time, trade_time]
+
+    def advance(self, now_ms):
+        """
+        Bitiş zamanı `now_ms`'yi geçmiş açık barı kapatır. İşlem gelmeyen aralıklar
+        için (önceki kapanışla) düz bar üretilir; zaman serisi boşluksuz kalır.
+        :return: Kapanan barların listesi
+        """
+        closed = []
+        if self.current is None or now_ms < self.current[_OPEN_TIME] + self.interval_ms:
+            return closed
+
+        last_close = self.current[_CLOSE]
+        next_open = self.current[_OPEN_TIME] + self.interval_ms
+        self._close_current(closed)
+        self._fill_flat(next_open, now_ms // self.interval_ms * self.interval_ms, last_close, closed)
+        return closed
+
+    def _fill_flat(self, next_open, target_open, last_close, closed):
+        """[next_open, target_open) aralığındaki işlemsiz barları önceki kapanışla düz bar olarak yazar."""
+        empty_bars = (target_open - next_open) // self.interval_ms
+        if empty_bars > self.capacity:  # Tamponda zaten tutulamayacak barlar atlanır
+            next_open += (empty_bars - self.capacity) * self.interval_ms
+        while next_open < target_open:
+            flat = [next_open, last_close, last_close, last_close, last_close, 0.0, 0.0, 0.0, 0, 0, 0]
+            bar = _bar_dict(flat)
+            self._write(bar)
+            closed.append(bar)
+            next_open += self.interval_ms
+
+    def add_trade(self, trade_time, price, qty, is_buyer_maker, trade_count=1):
+        """
+        İşlemi ait olduğu bara ekler.
+        :return: (kapanan barlar, düzeltilen kapanmış bar veya None, işlem kullanıldı mı)
+        """
+        open_time = trade_time // self.interval_ms * self.interval_ms
+        closed = []
+
+        if self.current is not None and open_time < self.current[_OPEN_TIME]:
+            amended = self._amend_closed(open_time, trade_time, price, qty, is_buyer_maker, trade_count)
+            return closed, amended, amended is not None
+
+        closed = self.advance(trade_time)
+        if self.current is None:
+            if self.count:
+                latest = self.position + self.capacity - 1
+                latest_open = int(self.columns["open_time"][latest])
+                if open_time <= latest_open:
+                    amended = self._amend_closed(open_time, trade_time, price, qty, is_buyer_maker, trade_count)
+                    return closed, amended, amended is not None
+                # flush() ile kapanmış son bardan sonraki işlemsiz aralıklar düz barla doldurulur
+                self._fill_flat(latest_open + self.interval_ms, open_time, float(self.columns["close"][latest]), closed)
+            self._new_bar(open_time, price, qty, is_buyer_maker, trade_count, trade_time)
+            return closed, None, True
+
+        bar = self.current
+        if price > bar[_HIGH]:
+            bar[_HIGH] = price
+        if price < bar[_LOW]:
+            bar[_LOW] = price
+        if trade_time < bar[_FIRST_T]:  # Geç gelen ama bu bara ait işlem açılışı değiştirebilir
+            bar[_OPEN], bar[_FIRST_T] = price, trade_time
+        if trade_time >= bar[_LAST_T]:
+            bar[_CLOSE], bar[_LAST_T] = price, trade_time
+        bar[_VOLUME] += qty
+        if not is_buyer_maker:
+            bar[_BUY] += qty
+        bar[_QUOTE] += price * qty
+        bar[_TRADES] += trade_count
+        return closed, None, True
+
+    def _amend_closed(self, open_time, trade_time, price, qty, is_buyer_maker, trade_count):
+        """Sırası bozuk gelen işlemi zaten kapanmış bara işler (tampon dışındaysa None)."""
+        if not self.count:
+            return None
+        latest_index = (self.position - 1) % self.capacity
+        latest_open = self.columns["open_time"][latest_index]
+        offset = (latest_open - open_time) // self.interval_ms
+        if offset < 0 or offset >= self.count:
+            return None
+
+        index = (latest_index - offset) % self.capacity
+        if self.columns["open_time"][index] != open_time:  # Seri bitişik değilse yanlış bara yazılmaz
+            return None
+        c = {name: column[index] for name, column in self.columns.items()}
+        if c["trades"] == 0:  # Boş (düz) bar: işlem bu barın tek işlemi olur
+            c.update(open=price, high=price, low=price, close=price, first_trade_time=trade_time,
+                     last_trade_time=trade_time)
+        else:
+            c["high"], c["low"] = max(c["high"], price), min(c["low"], price)
+            if trade_time < c["first_trade_time"]:
+                c["open"], c["first_trade_time"] = price, trade_time
+            if trade_time >= c["last_trade_time"]:
+                c["close"], c["last_trade_time"] = price, trade_time
+        c["volume"] += qty
+        c["buy_volume"] += 0.0 if is_buyer_maker else qty
+        c["quote_volume"] += price * qty
+        c["vwap"] = c["quote_volume"] / c["volume"] if c["volume"] else c["close"]
+        c["trades"] += trade_count
+
+        for name, value in c.items():
+            self.columns[name][index] = value
+            self.columns[name][index + self.capacity] = value
+        return {name: (int(value) if BAR_COLUMNS[name] is np.int64 else float(value)) for name, value in c.items()}
+
+    def latest(self, count=None, copy=True):
+        """Son `count` kapanmış barı kronolojik sırada {kolon: dizi} olarak döndürür."""
+        count = self.count if count is None else min(count, self.count)
+        end = self.position + self.capacity
+        start = end - count
+        return {name: (column[start:end].copy() if copy else column[start:end]) for name, column in self.columns.items()}
+
+# **📌 aggTrade Akışından Canlı Bar Üretici**
+class CandleAggregator:
+    """
+    Binance aggTrade mesajlarından 1s/1m/5m/1h barlarını (OHLCV, taker alış
+    hacmi, VWAP, işlem sayısı) bellekte üretir. Modeller son N barı REST
+    çağrısı yapmadan alır. Tekrarlanan aggTrade ID'leri atlanır; sırası bozuk
+    gelen işlemler açık bara veya tampondaki kapanmış bara işlenir.
+
+    Bar kapanışında on_bar_close ile kaydedilen fonksiyonlar çağrılır, örneğin
+    OnlineLSTMTrainer.on_candle_close:
+        aggregator.on_bar_close(lambda symbol, tf, bar: trainer.on_candle_close(bar["close"]), "1m")
+    """
+
+    def __init__(self, symbol="BTCUSDT", timeframes=tuple(TIMEFRAMES_MS), capacity=None, dedupe_window=50_000):
+        capacity = {**DEFAULT_CAPACITY, **(capacity or {})}
+        self.symbol = symbol.upper()
+        self.rings = {tf: BarRing(TIMEFRAMES_MS[tf], capacity.get(tf, 1_000)) for tf in timeframes}
+        self.lock = threading.Lock()
+        self.close_listeners = []
+        self.amend_listeners = []
+        self.last_agg_id = None
+        self.first_agg_id = None
+        self.recent_ids = set()
+        self.recent_order = deque()
+        self.dedupe_window = dedupe_window
+        self.metrics = {"trades": 0, "duplicates": 0, "out_of_order": 0, "late_amended": 0,
+                        "late_dropped": 0, "missing_trade_ids": 0, "backfilled_trades": 0,
+                        "bars_closed": {tf: 0 for tf in self.rings}, "listener_errors": 0}
+
+    def on_bar_close(self, callback, timeframe=None):
+        """callback(symbol, timeframe, bar) — bar kapandığında (timeframe=None: hepsi)."""
+        self.close_listeners.append((timeframe, callback))
+
+    def on_bar_amend(self, callback, timeframe=None):
+        """callback(symbol, timeframe, bar) — kapanmış bar geç gelen işlemle düzeltildiğinde."""
+        self.amend_listeners.append((timeframe, callback))
+
+    def _remember(self, agg_id):
+        self.recent_ids.add(agg_id)
+        self.recent_order.append(agg_id)
+        if len(self.recent_order) > self.dedupe_window:
+            self.recent_ids.discard(self.recent_order.popleft())
+
+    def on_agg_trade(self, message):
+        """
+        aggTrade mesajını (JSON string veya sözlük) işler.
+        :return: İşlem kullanıldıysa True; tekrar veya tampondan eski ise False
+        """
+        data = json.loads(message) if isinstance(message, (str, bytes)) else message
+        if "data" in data:  # Birleşik (combined) akış biçimi
+            data = data["data"]
+        agg_id = int(data["a"])
+        trade_time = int(data["T"])
+        price, qty = float(data["p"]), float(data["q"])
+        is_buyer_maker = bool(data["m"])
+        trade_count = int(data["l"]) - int(data["f"]) + 1 if "l" in data and "f" in data else 1
+
+        events = []
+        with self.lock:
+            if agg_id in self.recent_ids:
+                self.metrics["duplicates"] += 1
+                return False
+            if self.last_agg_id is not None and agg_id < self.last_agg_id:
+                self.metrics["out_of_order"] += 1
+                if agg_id > self.first_agg_id and self.metrics["missing_trade_ids"] > 0:
+                    self.metrics["missing_trade_ids"] -= 1  # Eksik sayılan ID sonradan geldi
+            elif self.last_agg_id is not None and agg_id > self.last_agg_id + 1:
+                self.metrics["missing_trade_ids"] += agg_id - self.last_agg_id - 1
+            self._remember(agg_id)
+            if self.first_agg_id is None:
+                self.first_agg_id = agg_id
+            self.last_agg_id = agg_id if self.last_agg_id is None else max(self.last_agg_id, agg_id)
+
+            used_any = False
+            for timeframe, ring in self.rings.items():
+                closed, amended, used = ring.add_trade(trade_time, price, qty, is_buyer_maker, trade_count)
+                used_any = used_any or used
+                self.metrics["bars_closed"][timeframe] += len(closed)
+                events.extend(("close", timeframe, bar) for bar in closed)
+                if amended is not None:
+                    events.append(("amend", timeframe, amended))
+
+            self.metrics["trades"] += 1
+            if not used_any:
+                self.metrics["late_dropped"] += 1
+            elif any(kind == "amend" for kind, _, _ in events):
+                self.metrics["late_amended"] += 1
+
+        self._dispatch(events)
+        return used_any
+
+    def flush(self, now_ms):
+        """
+        İşlem gelmese bile süresi dolan barları kapatır (sakin piyasada bar
+        kapanışını geciktirmemek için start_flush_timer zamanlayıcısından çağrılır).
+        """
+        events = []
+        with self.lock:
+            for timeframe, ring in self.rings.items():
+                closed = ring.advance(now_ms)
+                self.metrics["bars_closed"][timeframe] += len(closed)
+                events.extend(("close", timeframe, bar) for bar in closed)
+        self._dispatch(events)
+
+    def _dispatch(self, events):
+        for kind, timeframe, bar in events:
+            listeners = self.close_listeners if kind == "close" else self.amend_listeners
+            for wanted, callback in listeners:
+                if wanted is not None and wanted != timeframe:
+                    continue
+                try:
+                    callback(self.symbol, timeframe, bar)
+                except Exception as e:
+                    self.metrics["listener_errors"] += 1
+                    print(f"⚠️ Bar dinleyicisi hatası ({timeframe}): {e}")
+
+    def latest_bars(self, timeframe="1m", count=None, include_open=False):
+        """
+        Son `count` kapanmış barı OHLCVView olarak döndürür (kopya; WebSocket
+        thread'i yazmaya devam ederken güvenle okunabilir).
+        :param include_open: Henüz kapanmamış barı da sona ekle
+        """
+        with self.lock:
+            ring = self.rings[timeframe]
+            columns = ring.latest(count)
+            if include_open and ring.current is not None:
+                open_bar = _bar_dict(ring.current)
+                columns = {name: np.append(values, open_bar[name]).astype(BAR_COLUMNS[name])
+                           for name, values in columns.items()}
+        return OHLCVView(columns)
+
+    def latest_closes(self, timeframe="1m", count=60):
+        """Modeller için son `count` kapanış fiyatı (float64)."""
+        return self.latest_bars(timeframe, count).close
+
+    def get_metrics(self):
+        with self.lock:
+            return {**self.metrics, "bars_closed": dict(self.metrics["bars_closed"]),
+                    "buffered_bars": {tf: ring.count for tf, ring in self.rings.items()}}
+
+def get_candle_aggregator(symbol="BTCUSDT"):
+    """Sembol başına süreç genelinde tek CandleAggregator (AppContext üzerinden)."""
+    symbol = symbol.upper()
+    return get_app_context().get_or_create(f"candle_aggregator:{symbol}", lambda: CandleAggregator(symbol))
+
+# **📌 Bar Kapanış Zamanlayıcısı**
+def _flush_loop(symbols, interval_seconds, grace_ms):
+    while True:
+        time.sleep(interval_seconds)
+        # Borsa işlem zamanı yerel saatin biraz gerisinde kalabilir; grace_ms kadar geriden kapatılır
+        now_ms = int(time.time() * 1000) - grace_ms
+        for symbol in symbols:
+            try:
+                get_candle_aggregator(symbol).flush(now_ms)
+            except Exception as e:
+                print(f"⚠️ {symbol} bar kapatma hatası: {e}")
+
+def start_flush_timer(symbols, interval_seconds=1.0, grace_ms=2_000):
+    """
+    İşlem gelmeyen sürelerde de barları kapatan arka plan thread'ini (süreç
+    başına bir kez) başlatır.
+    """
+    symbols = tuple(symbol.upper() for symbol in symbols)
+
+    def create():
+        thread = threading.Thread(target=_flush_loop, args=(symbols, interval_seconds, grace_ms),
+                                  name="candle-flush-timer", daemon=True)
+        thread.start()
+        return thread
+    return get_app_context().get_or_create("candle_flush_timer", create)
+
+# **📌 Kopma Sırasında Kaçan İşlemleri REST ile Tamamla**
+def backfill_agg_trades(aggregator, from_id, max_pages=20, transport=None):
+    """
+    /fapi/v1/aggTrades?fromId=... ile `from_id`'den itibaren işlemleri çeker ve
+    bar üreticisine ekler. Canlı akışın zaten getirdiği işlemler tekrar olarak
+    atlanır; kapanmış barlar geç gelen işlemlerle düzeltilir. Canlı akışa
+    yetişilince veya `max_pages` sayfa sonra durur.
+    :return: Barlara eklenen işlem sayısı
+    """
+    transport = transport or get_binance_transport()
+    added = 0
+    for _ in range(max_pages):
+        trades = transport.get_json("/fapi/v1/aggTrades",
+                                    params={"symbol": aggregator.symbol, "fromId": int(from_id), "limit": 1000})
+        if isinstance(trades, dict):  # {"code": ..., "msg": ...}
+            raise RuntimeError(f"Binance aggTrades hatası: {trades}")
+        for trade in trades:
+            if aggregator.on_agg_trade(trade):
+                added += 1
+        if len(trades) < 1000 or int(trades[-1]["a"]) >= aggregator.last_agg_id:
+            break
+        from_id = int(trades[-1]["a"]) + 1
+    with aggregator.lock:
+        aggregator.metrics["backfilled_trades"] += added
+    return added
+
+# 📌 **Doğrudan çalıştırılırsa sentetik işlem akışı ile test edilir**
+if __name__ == "__main__":
+    rng = np.random.default_rng(7)
+    aggregator = CandleAggregator("BTCUSDT")
+    closed_1m = []
+    aggregator.on_bar_close(lambda symbol, tf, bar: closed_1m.append(bar), "1m")
+
+    start = 1_700_000_000_000
+    trades = []
+    price = 50_000.0
+    for agg_id in range(200_000):
+        price *= 1 + rng.normal(0, 0.0001)
+        trades.append({"a": agg_id, "p": f"{price:.2f}", "q": f"{rng.exponential(0.05):.3f}",
+                       "f": agg_id, "l": agg_id, "T": start + agg_id * 30, "m": bool(rng.random() < 0.5)})
+
+    # %1 tekrar ve %1 sırası bozuk mesaj
+    stream = list(trades)
+    for index in sorted(rng.choice(len(trades) - 100, 2_000, replace=False), reverse=True):
+        stream.insert(int(index) + 50, trades[int(index)])  # Sondan başa: önceki eklemeler indeksi kaydırmaz
+    for index in rng.choice(len(stream) - 5, 2_000, replace=False):
+        stream[index], stream[index + 3] = stream[index + 3], stream[index]
+
+    started = time.perf_counter()
+    for message in stream:
+        aggregator.on_agg_trade(message)
+    seconds = time.perf_counter() - started
+
+    reference = CandleAggregator("BTCUSDT")
+    for message in trades:
+        reference.on_agg_trade(message)
+    same = all(np.allclose(aggregator.latest_bars(tf)[name], reference.latest_bars(tf)[name])
+               for tf in ("1m", "5m") for name in ("open", "high", "low", "close", "volume", "vwap"))
+
+    print(f"⚡ {len(stream)} mesaj: {seconds / len(stream) * 1e6:.2f} µs/mesaj")
+    print(f"📊 Metrikler: {aggregator.get_metrics()}")
+    print(f"🕯️ Son 1m bar: {closed_1m[-1]}")
+    print(f"✅ Sırasız/tekrarlı akış sıralı akış ile aynı barları üretti: {same}")
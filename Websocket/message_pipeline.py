@@ -0,0 +1,163 @@
+import itertools
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from data_fetch.binance_transport import LatencyHistogram
+
+# 📌 Birleştirme (coalescing) modları
+COALESCE_NONE = "none"      # Her mesaj işlenir (FIFO)
+COALESCE_LATEST = "latest"  # Sembol başına sadece en son bekleyen mesaj işlenir
+COALESCE_BAR = "bar"        # Sembol + bar başına en son mesaj işlenir (her bar en az bir kez)
+
+class _Shard:
+    """Tek bir işçinin bekleyen mesajları (anahtar -> (mesaj, kuyruğa girme zamanı))."""
+
+    __slots__ = ("pending", "condition", "maxsize")
+
+    def __init__(self, maxsize):
+        self.pending = OrderedDict()
+        self.condition = threading.Condition()
+        self.maxsize = maxsize
+
+# **📌 Sınırlı, Birleştirmeli Mesaj Hattı**
+class MessagePipeline:
+    """
+    WebSocket alma thread'ini strateji çalıştırmadan ayırır. Alma thread'i sadece
+    submit() çağırır (O(1), asla bloklanmaz); işçi thread'leri mesajları handler
+    ile işler. Aynı sembolün mesajları hep aynı işçiye gider, böylece sembol
+    başına sıra korunur. Kuyruk doluysa en eski bekleyen mesaj atılır.
+
+    Birleştirme modları:
+    - "latest": Sembol başına bekleyen tek mesaj tutulur; yenisi eskisinin yerine geçer.
+    - "bar":    Aynı bar aralığındaki mesajlar birleşir; bar değişince yeni mesaj kuyruğa girer.
+    - "none":   Birleştirme yapılmaz.
+    """
+
+    def __init__(self, handler, num_workers=2, maxsize=1000, coalesce=COALESCE_LATEST, bar_ms=60_000,
+                 name="ws-pipeline"):
+        if coalesce not in (COALESCE_NONE, COALESCE_LATEST, COALESCE_BAR):
+            raise ValueError(f"Geçersiz birleştirme modu: {coalesce}")
+        self.handler = handler
+        self.coalesce = coalesce
+        self.bar_ms = bar_ms
+        self.name = name
+        self.shards = [_Shard(max(1, maxsize // num_workers)) for _ in range(num_workers)]
+        self.sequence = itertools.count()
+        self.threads = []
+        self.running = False
+
+        self.metrics_lock = threading.Lock()
+        self.lag = LatencyHistogram()         # Borsa olay zamanından (E) işlenene kadar geçen süre
+        self.queue_wait = LatencyHistogram()  # Kuyrukta bekleme süresi
+        self.metrics = {"submitted": 0, "processed": 0, "coalesced": 0, "dropped": 0, "handler_errors": 0,
+                        "max_depth": 0, "last_lag_ms": None}
+
+    def _key(self, message):
+        symbol = message.get("s", "")
+        if self.coalesce == COALESCE_LATEST:
+            return symbol
+        if self.coalesce == COALESCE_BAR:
+            return symbol, int(message.get("E") or message.get("T") or time.time() * 1000) // self.bar_ms
+        return next(self.sequence)
+
+    def submit(self, message):
+        """Mesajı kuyruğa ekler (alma thread'inden çağrılır)."""
+        symbol = message.get("s", "")
+        shard = self.shards[zlib.crc32(symbol.encode()) % len(self.shards)]
+        key = self._key(message)
+        coalesced = dropped = False
+
+        with shard.condition:
+            if key in shard.pending:
+                # Sırası korunur, içerik en yeni mesajla değiştirilir (ilk kuyruğa girme zamanı saklanır)
+                shard.pending[key] = (message, shard.pending[key][1])
+                coalesced = True
+            else:
+                if len(shard.pending) >= shard.maxsize:
+                    shard.pending.popitem(last=False)
+                    dropped = True
+                shard.pending[key] = (message, time.monotonic())
+            depth = len(shard.pending)
+            shard.condition.notify()
+
+        with self.metrics_lock:
+            self.metrics["submitted"] += 1
+            self.metrics["coalesced"] += coalesced
+            self.metrics["dropped"] += dropped
+            self.metrics["max_depth"] = max(self.metrics["max_depth"], depth)
+
+    def _worker(self, shard):
+        while True:
+            with shard.condition:
+                while self.running and not shard.pending:
+                    shard.condition.wait(0.5)
+                if not shard.pending:
+                    return  # Durduruldu ve kuyruk boş
+                _, (message, enqueued_at) = shard.pending.popitem(last=False)
+
+            wait_ms = (time.monotonic() - enqueued_at) * 1000
+            try:
+                self.handler(message)
+            except Exception as e:
+                with self.metrics_lock:
+                    self.metrics["handler_errors"] += 1
+                print(f"⚠️ WebSocket mesaj işleme hatası: {e}")
+
+            event_time = message.get("E")
+            lag_ms = time.time() * 1000 - event_time if event_time else None
+            with self.metrics_lock:
+                self.metrics["processed"] += 1
+                self.queue_wait.observe(wait_ms)
+                if lag_ms is not None:
+                    self.lag.observe(max(lag_ms, 0.0))
+                    self.metrics["last_lag_ms"] = round(lag_ms, 1)
+
+    def start(self):
+        """İşçi thread'lerini başlatır."""
+        if self.running:
+            return self
+        self.running = True
+        self.threads = [threading.Thread(target=self._worker, args=(shard,), name=f"{self.name}-{index}", daemon=True)
+                        for index, shard in enumerate(self.shards)]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Yeni mesaj beklemeyi bırakır; kuyrukta kalanlar işlendikten sonra işçiler çıkar."""
+        self.running = False
+        for shard in self.shards:
+            with shard.condition:
+                shard.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def depth(self):
+        return sum(len(shard.pending) for shard in self.shards)
+
+    def get_metrics(self):
+        with self.metrics_lock:
+            return {**self.metrics, "depth": self.depth(), "coalesce": self.coalesce,
+                    "lag_ms": self.lag.snapshot(), "queue_wait_ms": self.queue_wait.snapshot()}
+
+# 📌 **Doğrudan çalıştırılırsa yavaş handler ile yük testi yapılır**
+if __name__ == "__main__":
+    messages = 20_000
+    for mode in (COALESCE_NONE, COALESCE_BAR, COALESCE_LATEST):
+        processed = []
+        pipeline = MessagePipeline(lambda message: (time.sleep(0.002), processed.append(message["p"])),
+                                   num_workers=2, maxsize=500, coalesce=mode, bar_ms=1_000).start()
+        submit_seconds = 0.0
+        for index in range(messages):
+            message = {"e": "aggTrade", "s": ("BTCUSDT", "ETHUSDT")[index % 2], "E": int(time.time() * 1000),
+                       "p": str(index)}
+            started = time.perf_counter()
+            pipeline.submit(message)  # Alma thread'inin ödediği maliyet
+            submit_seconds += time.perf_counter() - started
+            time.sleep(0.0001)  # Yoğun piyasa: handler'ın yetişebileceğinden hızlı mesaj akışı
+        pipeline.stop()
+        metrics = pipeline.get_metrics()
+        print(f"📨 {mode:6s}: gönderim {submit_seconds / messages * 1e6:.1f} µs/mesaj | işlenen {metrics['processed']} | "
+              f"birleşen {metrics['coalesced']} | atılan {metrics['dropped']} | "
+              f"gecikme p50 {metrics['lag_ms']['p50_ms']} ms, p99 {metrics['lag_ms']['p99_ms']} ms")
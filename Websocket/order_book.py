@@ -0,0 +1,352 @@
+import threading
+import time
+from collections import deque
+from config.app_context import get_app_context, get_binance_transport
+from Websocket.stream_manager import Backoff
+from notifications.telegram_bot import send_telegram_message
+from utils.lazy_import import lazy_import
+
+sortedcontainers = lazy_import("sortedcontainers")
+
+# 📌 REST anlık görüntüsünün derinliği (ağırlık: 20)
+SNAPSHOT_LIMIT = 1000
+
+# 📌 Anlık görüntü beklenirken tamponlanan en fazla diff olayı (100ms akışta ~100 sn)
+MAX_BUFFERED_EVENTS = 1000
+
+# 📌 Başarısız anlık görüntüden sonra üstel bekleme (sn)
+SNAPSHOT_BACKOFF_BASE_SECONDS = 1.0
+SNAPSHOT_BACKOFF_MAX_SECONDS = 60.0
+
+# **📌 Yerel L2 Emir Defteri**
+class OrderBook:
+    """
+    REST anlık görüntüsü + @depth@100ms diff akışı ile tutulan yerel L2 emir defteri.
+
+    Senkronizasyon (Binance Futures prosedürü):
+    1. Diff olayları tamponlanırken /fapi/v1/depth anlık görüntüsü alınır.
+    2. u < lastUpdateId olan olaylar atılır; ilk olay U <= lastUpdateId <= u olmalıdır.
+    3. u <= lastUpdateId olan (deftere zaten işlenmiş) olaylar atılır; sonraki her
+       olayda pu önceki olayın u değerine eşit olmalıdır, değilse boşluk vardır ve
+       defter yeniden senkronize edilir.
+    4. Miktarı 0 olan seviye silinir.
+
+    Fiyat seviyeleri SortedDict içinde tutulur: güncelleme O(log n), en iyi
+    alış (bids son eleman) / satış (asks ilk eleman) O(1).
+    """
+
+    def __init__(self, symbol="BTCUSDT", snapshot_fetcher=None):
+        self.symbol = symbol.upper()
+        self.snapshot_fetcher = snapshot_fetcher or fetch_depth_snapshot
+        self.bids = sortedcontainers.SortedDict()  # fiyat -> miktar (artan; en iyi alış sonda)
+        self.asks = sortedcontainers.SortedDict()  # fiyat -> miktar (artan; en iyi satış başta)
+        self.lock = threading.RLock()
+        self.last_update_id = None
+        self.last_event_time = None
+        self.synced = False
+        self.syncing = False
+        self.buffer = deque(maxlen=MAX_BUFFERED_EVENTS)
+        self.snapshot_backoff = Backoff(SNAPSHOT_BACKOFF_BASE_SECONDS, SNAPSHOT_BACKOFF_MAX_SECONDS)
+        self.next_snapshot_at = 0.0  # Başarısız anlık görüntüden sonra bu zamana kadar yeni istek yapılmaz
+        self.metrics = {"updates": 0, "snapshots": 0, "resyncs": 0, "gaps": 0, "stale_events": 0,
+                        "buffer_overflows": 0, "snapshot_errors": 0}
+
+    # 📌 Senkronizasyon
+    def on_depth_update(self, data):
+        """depthUpdate olayını işler (StreamManager callback'inden veya doğrudan)."""
+        if "data" in data:  # Birleşik (combined) akış biçimi
+            data = data["data"]
+        with self.lock:
+            if not self.synced:
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.metrics["buffer_overflows"] += 1
+                self.buffer.append(data)
+                if not self.syncing and time.monotonic() >= self.next_snapshot_at:
+                    self._start_resync()
+                return
+            if data["u"] <= self.last_update_id:
+                self.metrics["stale_events"] += 1  # Tekrarlanan / zaten işlenmiş olay
+                return
+            if data["pu"] != self.last_update_id:
+                self.metrics["gaps"] += 1
+                print(f"⚠️ {self.symbol} emir defterinde boşluk (pu={data['pu']}, beklenen {self.last_update_id}), "
+                      f"yeniden senkronize ediliyor")
+                self.resync(data)
+                return
+            self._apply(data)
+
+    def _apply(self, data):
+        self._apply_levels(self.bids, data["b"])
+        self._apply_levels(self.asks, data["a"])
+        self.last_update_id = data["u"]
+        self.last_event_time = data.get("E")
+        self.metrics["updates"] += 1
+
+    @staticmethod
+    def _apply_levels(side, levels):
+        for price, qty in levels:
+            price, qty = float(price), float(qty)
+            if qty == 0.0:
+                side.pop(price, None)
+            else:
+                side[price] = qty
+
+    def resync(self, pending_event=None):
+        """Defteri senkronize değil olarak işaretler ve arka planda yeni anlık görüntü ister."""
+        with self.lock:
+            self.synced = False
+            self.buffer.clear()
+            if pending_event is not None:
+                self.buffer.append(pending_event)
+            self.metrics["resyncs"] += 1
+            if not self.syncing and time.monotonic() >= self.next_snapshot_at:
+                self._start_resync()
+
+    def _start_resync(self):
+        self.syncing = True
+        threading.Thread(target=self._sync_from_snapshot, name=f"order-book-sync-{self.symbol}", daemon=True).start()
+
+    def _sync_from_snapshot(self):
+        try:
+            snapshot = self.snapshot_fetcher(self.symbol)
+        except Exception as e:
+            with self.lock:
+                self.metrics["snapshot_errors"] += 1
+                delay = self.snapshot_backoff.next_delay()
+                self.next_snapshot_at = time.monotonic() + delay
+                self.syncing = False
+            print(f"⚠️ {self.symbol} emir defteri anlık görüntüsü alınamadı: {e} ({delay:.1f} sn sonra tekrar denenecek)")
+            send_telegram_message(f"⚠️ {self.symbol} emir defteri anlık görüntüsü alınamadı: {e}",
+                                  key=f"order_book_snapshot:{self.symbol}")
+            return
+
+        with self.lock:
+            self.syncing = False
+            if self.apply_snapshot(snapshot):
+                self.snapshot_backoff.reset()
+                self.next_snapshot_at = 0.0
+                return
+            # Anlık görüntü tampondaki olaylara köprü kurmadı; akış gerideyse ağır
+            # derinlik isteğini art arda tekrarlamamak için bekleme süresinden sonra denenir
+            delay = self.snapshot_backoff.next_delay()
+            self.next_snapshot_at = time.monotonic() + delay
+        print(f"⚠️ {self.symbol} emir defteri anlık görüntüsü tampondaki olaylarla örtüşmedi "
+              f"({delay:.1f} sn sonra tekrar denenecek)")
+
+    def apply_snapshot(self, snapshot):
+        """
+        Anlık görüntüyü yükler ve tampondaki olayları üzerine uygular.
+        :return: Defter senkronize olduysa True
+        """
+        with self.lock:
+            last_update_id = snapshot["lastUpdateId"]
+            events = [event for event in self.buffer if event["u"] >= last_update_id]
+            if events and events[0]["U"] > last_update_id:
+                return False  # Anlık görüntü ile ilk olay arasında boşluk var
+
+            self.bids.clear()
+            self.asks.clear()
+            self._apply_levels(self.bids, snapshot["bids"])
+            self._apply_levels(self.asks, snapshot["asks"])
+            self.last_update_id = last_update_id
+            self.metrics["snapshots"] += 1
+            self.metrics["stale_events"] += len(self.buffer) - len(events)
+            self.buffer.clear()
+
+            for index, event in enumerate(events):
+                if index > 0 and event["pu"] != self.last_update_id:
+                    self.metrics["gaps"] += 1
+                    self.buffer.extend(events[index:])
+                    return False
+                self._apply(event)
+            self.synced = True
+            return True
+
+    # 📌 Sorgular
+    def best_bid(self):
+        """(fiyat, miktar) veya None."""
+        with self.lock:
+            return self.bids.peekitem(-1) if self.bids else None
+
+    def best_ask(self):
+        """(fiyat, miktar) veya None."""
+        with self.lock:
+            return self.asks.peekitem(0) if self.asks else None
+
+    def _top(self):
+        if not self.synced or not self.bids or not self.asks:
+            return None
+        return self.bids.peekitem(-1), self.asks.peekitem(0)
+
+    def mid_price(self):
+        with self.lock:
+            top = self._top()
+            return None if top is None else (top[0][0] + top[1][0]) / 2
+
+    def spread(self):
+        """En iyi satış - en iyi alış (fiyat birimi)."""
+        with self.lock:
+            top = self._top()
+            return None if top is None else top[1][0] - top[0][0]
+
+    def spread_bps(self):
+        """Orta fiyata göre spread (baz puan)."""
+        with self.lock:
+            top = self._top()
+            if top is None:
+                return None
+            (bid, _), (ask, _) = top
+            return (ask - bid) / ((ask + bid) / 2) * 10_000
+
+    def microprice(self):
+        """
+        Miktar ağırlıklı orta fiyat: satış tarafı kalınsa alışa, alış tarafı
+        kalınsa satışa yaklaşır (kısa vadeli fiyat yönü için orta fiyattan iyi tahmin).
+        """
+        with self.lock:
+            top = self._top()
+            if top is None:
+                return None
+            (bid, bid_qty), (ask, ask_qty) = top
+            return (bid * ask_qty + ask * bid_qty) / (bid_qty + ask_qty)
+
+    def depth_within_bps(self, bps):
+        """
+        Orta fiyatın ±`bps` baz puanı içindeki toplam miktar ve notional.
+        :return: {"bid_qty", "ask_qty", "bid_notional", "ask_notional"} veya None
+        """
+        with self.lock:
+            mid = self.mid_price()
+            if mid is None:
+                return None
+            bid_levels = [(price, self.bids[price]) for price in self.bids.irange(minimum=mid * (1 - bps / 10_000))]
+            ask_levels = [(price, self.asks[price]) for price in self.asks.irange(maximum=mid * (1 + bps / 10_000))]
+        return {"bid_qty": sum(qty for _, qty in bid_levels), "ask_qty": sum(qty for _, qty in ask_levels),
+                "bid_notional": sum(price * qty for price, qty in bid_levels),
+                "ask_notional": sum(price * qty for price, qty in ask_levels)}
+
+    def imbalance(self, bps=10):
+        """
+        ±`bps` içindeki alış/satış dengesizliği: (alış - satış) / (alış + satış),
+        -1 (sadece satış) ile +1 (sadece alış) arası.
+        """
+        depth = self.depth_within_bps(bps)
+        if depth is None or depth["bid_qty"] + depth["ask_qty"] == 0:
+            return None
+        return (depth["bid_qty"] - depth["ask_qty"]) / (depth["bid_qty"] + depth["ask_qty"])
+
+    def impact_price(self, side, quantity):
+        """
+        `quantity` büyüklüğünde piyasa emrinin ortalama dolum fiyatı (pozisyon
+        büyüklüğü / kayma tahmini için). side="BUY" satış seviyelerini tüketir.
+        :return: Ortalama fiyat veya defter derinliği yetmezse None
+        """
+        with self.lock:
+            if not self.synced:
+                return None
+            levels = self.asks.items() if side.upper() == "BUY" else reversed(self.bids.items())
+            remaining, cost = quantity, 0.0
+            for price, qty in levels:
+                fill = min(remaining, qty)
+                cost += fill * price
+                remaining -= fill
+                if remaining <= 0:
+                    return cost / quantity
+        return None
+
+    def top(self, limit=10):
+        """En iyi `limit` seviye: {"bids": [[fiyat, miktar], ...], "asks": [...]}."""
+        with self.lock:
+            bids = [[price, self.bids[price]] for price in self.bids.islice(-limit, reverse=True)]
+            asks = [[price, self.asks[price]] for price in self.asks.islice(0, limit)]
+        return {"bids": bids, "asks": asks}
+
+    def get_metrics(self):
+        with self.lock:
+            return {**self.metrics, "synced": self.synced, "last_update_id": self.last_update_id,
+                    "bid_levels": len(self.bids), "ask_levels": len(self.asks), "buffered": len(self.buffer)}
+
+def fetch_depth_snapshot(symbol, limit=SNAPSHOT_LIMIT, transport=None):
+    """/fapi/v1/depth anlık görüntüsü (paylaşılan taşıma katmanı ve ağırlık limitleyicisi üzerinden)."""
+    transport = transport or get_binance_transport()
+    snapshot = transport.get_json("/fapi/v1/depth", params={"symbol": symbol, "limit": limit})
+    if "lastUpdateId" not in snapshot:  # {"code": ..., "msg": ...}
+        raise RuntimeError(f"Binance depth hatası: {snapshot}")
+    return snapshot
+
+def get_order_book(symbol="BTCUSDT"):
+    """
+    Sembol başına süreç genelinde tek OrderBook. İlk çağrıda depth diff akışına
+    abone olunur; ilk olay geldiğinde anlık görüntü alınıp defter senkronize edilir.
+    """
+    symbol = symbol.upper()
+
+    def create():
+        from Websocket.stream_manager import get_stream_manager
+
+        book = OrderBook(symbol)
+        manager = get_stream_manager()
+        manager.subscribe(symbol, "depth", lambda _symbol, _stream_type, data: book.on_depth_update(data))
+        # Kopmada kaçan diff olayları pu kontrolüyle de yakalanır; burada beklemeden yenilenir
+        manager.on_reconnect(lambda streams, downtime: book.resync()
+                             if f"{symbol.lower()}@depth@100ms" in streams else None)
+        return book
+
+    return get_app_context().get_or_create(f"order_book:{symbol}", create)
+
+def find_order_book(symbol="BTCUSDT"):
+    """Sembol için zaten çalışan OrderBook'u döndürür; yoksa None (akışa abone olmaz)."""
+    return get_app_context().get(f"order_book:{symbol.upper()}")
+
+# 📌 **Doğrudan çalıştırılırsa sentetik diff akışı ile test edilir**
+if __name__ == "__main__":
+    import random
+
+    random.seed(3)
+    reference = {"bids": {}, "asks": {}}  # Borsadaki "gerçek" defter
+    for index in range(500):
+        reference["bids"][round(50_000 - 0.1 * (index + 1), 1)] = round(random.uniform(0.01, 5), 3)
+        reference["asks"][round(50_000 + 0.1 * index, 1)] = round(random.uniform(0.01, 5), 3)
+
+    events, update_id = [], 1_000
+    for _ in range(20_000):
+        side = random.choice(("bids", "asks"))
+        offset = random.randint(0, 600) * 0.1
+        price = round(50_000 - 0.1 - offset if side == "bids" else 50_000 + offset, 1)
+        qty = 0.0 if random.random() < 0.3 else round(random.uniform(0.01, 5), 3)
+        if qty == 0.0:
+            reference[side].pop(price, None)
+        else:
+            reference[side][price] = qty
+        events.append({"e": "depthUpdate", "E": 0, "s": "BTCUSDT", "U": update_id + 1, "u": update_id + 3,
+                       "pu": update_id, "b": [[str(price), str(qty)]] if side == "bids" else [],
+                       "a": [[str(price), str(qty)]] if side == "asks" else []})
+        update_id += 3
+        if len(events) == 50:
+            snapshot = {"lastUpdateId": update_id - 1,  # Anlık görüntü 50. olayın ortasında alınmış
+                        "bids": [[str(p), str(q)] for p, q in reference["bids"].items()],
+                        "asks": [[str(p), str(q)] for p, q in reference["asks"].items()]}
+
+    book = OrderBook("BTCUSDT", snapshot_fetcher=lambda symbol: snapshot)
+    book.syncing = True  # Anlık görüntüyü aşağıda elle uygula
+    started = time.perf_counter()
+    for event in events[:50]:
+        book.on_depth_update(event)
+    assert book.apply_snapshot(snapshot)
+    for event in events[50:]:
+        book.on_depth_update(event)
+    seconds = time.perf_counter() - started
+
+    same = dict(book.bids) == reference["bids"] and dict(book.asks) == reference["asks"]
+    print(f"⚡ {len(events)} diff olayı: {seconds / len(events) * 1e6:.2f} µs/olay | referansla aynı: {same}")
+    print(f"📗 En iyi alış {book.best_bid()} | 📕 en iyi satış {book.best_ask()} | spread {book.spread_bps():.2f} bps")
+    print(f"⚖️ Mikrofiyat {book.microprice():.2f} | ±10 bps dengesizlik {book.imbalance(10):+.3f}")
+    print(f"💧 ±10 bps derinlik {book.depth_within_bps(10)} | 5 BTC alım ort. fiyatı {book.impact_price('BUY', 5):.2f}")
+
+    gap_event = dict(events[-1], U=update_id + 10, u=update_id + 12, pu=update_id + 9)
+    book.snapshot_fetcher = lambda symbol: {"lastUpdateId": update_id + 11, "bids": snapshot["bids"],
+                                            "asks": snapshot["asks"]}
+    book.syncing = False
+    book.on_depth_update(gap_event)
+    time.sleep(0.2)
+    print(f"🔄 Boşluk sonrası: {book.get_metrics()}")
@@ -0,0 +1,527 @@
+import itertools
+import json
+import random
+import threading
+import time
+from config.config import (BINANCE_TESTNET, WS_MAX_STREAMS_PER_CONNECTION, WS_PING_INTERVAL_SECONDS,
+                           WS_PING_TIMEOUT_SECONDS, WS_STALE_TIMEOUT_SECONDS, WS_CONNECT_TIMEOUT_SECONDS,
+                           WS_ROTATE_AFTER_SECONDS, WS_BACKOFF_BASE_SECONDS, WS_BACKOFF_MAX_SECONDS,
+                           WS_BACKOFF_RESET_SECONDS)
+from config.app_context import get_app_context
+from notifications.telegram_bot import send_telegram_message
+from utils.lazy_import import lazy_import
+
+websocket = lazy_import("websocket")  # websocket-client, sadece bağlantı açılırken yüklenir
+
+# 📌 **Binance Futures Birleşik (Combined) Akış Adresi**
+BINANCE_FUTURES_WS_URL = "wss://stream.binancefuture.com" if BINANCE_TESTNET else "wss://fstream.binance.com"
+
+# 📌 Binance, bağlantı başına saniyede en fazla 10 gelen (kontrol) mesajı kabul eder
+CONTROL_MESSAGES_PER_SECOND = 5
+
+# 📌 Akış tipleri -> Binance akış adı soneki
+STREAM_TYPES = {
+    "aggTrade": "aggTrade",
+    "markPrice": "markPrice@1s",
+    "bookTicker": "bookTicker",
+    "depth": "depth@100ms",  # Emir defteri fark (diff) akışı
+    "kline_1m": "kline_1m",
+    "kline_5m": "kline_5m",
+    "kline_1h": "kline_1h",
+}
+
+def stream_name(symbol, stream_type):
+    """("BTCUSDT", "aggTrade") -> "btcusdt@aggTrade" """
+    return f"{symbol.lower()}@{STREAM_TYPES.get(stream_type, stream_type)}"
+
+def parse_stream_name(name):
+    """"btcusdt@markPrice@1s" -> ("BTCUSDT", "markPrice")"""
+    symbol, suffix = name.split("@", 1)
+    for stream_type, known_suffix in STREAM_TYPES.items():
+        if suffix == known_suffix:
+            return symbol.upper(), stream_type
+    return symbol.upper(), suffix
+
+def price_from_message(stream_type, data):
+    """Akış mesajından güncel fiyatı çıkarır (fiyat taşımayan akışlar için None)."""
+    if stream_type == "aggTrade" or stream_type == "markPrice":
+        return float(data["p"])
+    if stream_type == "bookTicker":
+        return (float(data["b"]) + float(data["a"])) / 2  # Orta fiyat
+    if stream_type.startswith("kline"):
+        return float(data["k"]["c"])
+    return None
+
+# 📌 Bağlantı durumları
+STATE_IDLE = "idle"
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_ROTATING = "rotating"
+STATE_BACKOFF = "backoff"
+STATE_STOPPED = "stopped"
+
+# **📌 Jitter'lı Üstel Geri Çekilme**
+class Backoff:
+    """
+    "Full jitter" üstel bekleme: n. denemede [0, min(cap, base * 2^n)] aralığından
+    rastgele süre. Binance kesintisinde bütün bağlantıların aynı anda yeniden
+    bağlanmasını (thundering herd) önler.
+    """
+
+    def __init__(self, base=WS_BACKOFF_BASE_SECONDS, cap=WS_BACKOFF_MAX_SECONDS):
+        self.base = base
+        self.cap = cap
+        self.attempts = 0
+
+    def next_delay(self):
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** self.attempts))
+        self.attempts += 1
+        return delay
+
+    def reset(self):
+        self.attempts = 0
+
+class _Session:
+    """Tek bir WebSocketApp bağlantısı ve onu çalıştıran thread."""
+
+    def __init__(self, connection, url, streams):
+        self.connection = connection
+        self.streams = streams  # URL'de bulunan akışlar
+        self.opened = threading.Event()
+        self.closed = threading.Event()
+        self.opened_at = None
+        self.last_message_at = time.monotonic()
+        self.app = websocket.WebSocketApp(url, on_open=self._on_open, on_message=self._on_message,
+                                          on_error=self._on_error, on_close=self._on_close)
+        self.thread = threading.Thread(target=self._run, name=f"binance-stream-{connection.index}-session",
+                                       daemon=True)
+
+    def _run(self):
+        try:
+            # websocket-client ping gönderir; ping_timeout içinde pong gelmezse bağlantıyı kapatır
+            self.app.run_forever(ping_interval=WS_PING_INTERVAL_SECONDS, ping_timeout=WS_PING_TIMEOUT_SECONDS)
+        except Exception as e:
+            print(f"⚠️ Akış bağlantısı #{self.connection.index} çalıştırma hatası: {e}")
+        finally:
+            self._mark_closed()
+
+    def _on_open(self, app):
+        self.opened_at = self.last_message_at = time.monotonic()
+        self.connection._session_opened(self)
+        self.opened.set()
+
+    def _on_message(self, app, message):
+        self.last_message_at = time.monotonic()
+        # Rotasyonda yeni oturum devraldıktan sonra eski oturumun mesajları tekrar dağıtılmaz
+        if self is self.connection.session:
+            self.connection.manager.dispatch(message)
+
+    def _on_error(self, app, error):
+        print(f"⚠️ Akış bağlantısı #{self.connection.index} hatası: {error}")
+
+    def _on_close(self, app, close_status_code, close_msg):
+        self._mark_closed()
+
+    def _mark_closed(self):
+        if not self.closed.is_set():
+            self.closed.set()
+            self.connection._session_closed(self)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        try:
+            self.app.close()
+        except Exception:
+            pass
+        self._mark_closed()
+
+# **📌 Tek Birleşik Akış Bağlantısı (Shard)**
+class StreamConnection:
+    """
+    /stream?streams=... birleşik akış bağlantısı ve yaşam döngüsü durum makinesi:
+
+        idle -> connecting -> connected -> (rotating -> connected) ...
+                    ^              |
+                    +-- backoff <--+  (kopma, pong/mesaj zaman aşımı, bağlanamama)
+
+    - Yeniden bağlanma tek bir denetçi thread'indeki döngüyle yapılır (callback
+      içinden özyinelemeli yeniden başlatma yok); bekleme jitter'lı üsteldir.
+    - Canlılık: websocket-client ping/pong + belirli süre mesaj gelmezse kapatma.
+    - Binance bağlantıları 24 saatte keser; bu süreden önce yeni bağlantı
+      açılır, açıldıktan sonra eskisi kapatılır (önce-aç-sonra-kapat).
+    - Kopmadan sonra yeniden bağlanınca manager.on_reconnect dinleyicileri
+      çağrılır (ör. kaçan işlemlerin REST ile tamamlanması).
+    Bağlıyken akışlar SUBSCRIBE / UNSUBSCRIBE mesajlarıyla eklenir/çıkarılır.
+    """
+
+    def __init__(self, manager, index, base_url=BINANCE_FUTURES_WS_URL):
+        self.manager = manager
+        self.index = index
+        self.base_url = base_url
+        self.streams = set()
+        self.lock = threading.RLock()
+        self.session = None
+        self.state = STATE_IDLE
+        self.running = False
+        self.stop_event = threading.Event()
+        self.backoff = Backoff()
+        self.request_ids = itertools.count(1)
+        self.control_sent_at = []  # Son kontrol mesajlarının zamanları (hız sınırı için)
+        self.disconnected_at = None
+        self.metrics = {"connects": 0, "reconnects": 0, "rotations": 0, "connect_failures": 0,
+                        "stale_disconnects": 0, "downtime_seconds": 0.0, "last_downtime_seconds": None}
+
+    @property
+    def url(self):
+        return f"{self.base_url}/stream?streams={'/'.join(sorted(self.streams))}"
+
+    @property
+    def connected(self):
+        return self.state in (STATE_CONNECTED, STATE_ROTATING)
+
+    def has_capacity(self, count=1):
+        return len(self.streams) + count <= self.manager.max_streams_per_connection
+
+    def _send_control(self, method, params, session=None):
+        """SUBSCRIBE/UNSUBSCRIBE gönderir; saniyedeki kontrol mesajı sınırını aşmaz."""
+        now = time.monotonic()
+        self.control_sent_at = [sent for sent in self.control_sent_at if now - sent < 1.0]
+        if len(self.control_sent_at) >= CONTROL_MESSAGES_PER_SECOND:
+            time.sleep(1.0 - (now - self.control_sent_at[0]))
+        self.control_sent_at.append(time.monotonic())
+        (session or self.session).app.send(json.dumps({"method": method, "params": params,
+                                                       "id": next(self.request_ids)}))
+
+    def add(self, names):
+        with self.lock:
+            new = [name for name in names if name not in self.streams]
+            self.streams.update(new)
+            if new and self.connected:
+                self._send_control("SUBSCRIBE", new)
+                self.session.streams.update(new)
+
+    def remove(self, names):
+        with self.lock:
+            removed = [name for name in names if name in self.streams]
+            self.streams.difference_update(removed)
+            if removed and self.connected:
+                self._send_control("UNSUBSCRIBE", removed)
+                self.session.streams.difference_update(removed)
+
+    def _set_state(self, state):
+        self.state = state
+
+    def _session_opened(self, session):
+        """Oturumun alma thread'inde, ilk mesajdan önce çağrılır."""
+        with self.lock:
+            # URL oluşturulduktan sonra eklenen / çıkarılan akışları eşitle
+            missing = sorted(self.streams - session.streams)
+            if missing:
+                self._send_control("SUBSCRIBE", missing, session)
+            stale = sorted(session.streams - self.streams)
+            if stale:
+                self._send_control("UNSUBSCRIBE", stale, session)
+            session.streams = set(self.streams)
+            if self.state == STATE_ROTATING:
+                return
+
+            self.metrics["connects"] += 1
+            downtime = None
+            if self.disconnected_at is not None:
+                downtime = time.monotonic() - self.disconnected_at
+                self.disconnected_at = None
+                self.metrics["reconnects"] += 1
+                self.metrics["downtime_seconds"] += downtime
+                self.metrics["last_downtime_seconds"] = round(downtime, 3)
+            self.session = session
+            self._set_state(STATE_CONNECTED)
+            streams = sorted(self.streams)
+
+        print(f"✅ Binance akış bağlantısı #{self.index} açıldı ({len(streams)} akış)")
+        if downtime is not None:
+            send_telegram_message(f"✅ Binance WebSocket #{self.index} yeniden bağlandı "
+                                  f"(kesinti: {downtime:.1f} sn, {len(streams)} akış)")
+            self.manager._notify_reconnect(self, streams, downtime)
+        else:
+            send_telegram_message(f"✅ Binance WebSocket Bağlantısı #{self.index} Açıldı! ({len(streams)} akış)")
+
+    def _session_closed(self, session):
+        """Oturum kapanır kapanmaz çağrılır; aktif oturumsa bağlantı artık bağlı sayılmaz."""
+        with self.lock:
+            if session is self.session and self.connected:
+                self._set_state(STATE_BACKOFF)
+
+    def _connect(self):
+        """Yeni oturum açar; WS_CONNECT_TIMEOUT içinde açılamazsa None döndürür."""
+        with self.lock:
+            session = _Session(self, self.url, set(self.streams))
+        session.start()
+        if session.opened.wait(WS_CONNECT_TIMEOUT_SECONDS):
+            return session
+        session.close()
+        self.metrics["connect_failures"] += 1
+        return None
+
+    def _rotate(self):
+        """24 saat sınırından önce önce-aç-sonra-kapat ile bağlantıyı yeniler."""
+        with self.lock:
+            if self.state != STATE_CONNECTED:
+                return False
+            self._set_state(STATE_ROTATING)
+        new_session = self._connect()
+        if new_session is None:
+            with self.lock:
+                if self.state == STATE_ROTATING:  # Eski oturum bu arada kapandıysa durum korunur
+                    self._set_state(STATE_CONNECTED)
+            return False
+        with self.lock:
+            # Yeni oturum açılırken eski oturuma gönderilen abonelik değişikliklerini taşı
+            missing = sorted(self.streams - new_session.streams)
+            if missing:
+                self._send_control("SUBSCRIBE", missing, new_session)
+            stale = sorted(new_session.streams - self.streams)
+            if stale:
+                self._send_control("UNSUBSCRIBE", stale, new_session)
+            new_session.streams = set(self.streams)
+            old_session, self.session = self.session, new_session
+            if not new_session.closed.is_set():
+                self._set_state(STATE_CONNECTED)
+        old_session.close()
+        self.metrics["rotations"] += 1
+        print(f"🔁 Akış bağlantısı #{self.index} 24 saat sınırından önce yenilendi")
+        return True
+
+    def _supervise(self):
+        """Bağlı oturumu izler; oturum bitince döner."""
+        while self.running and not self.stop_event.is_set():
+            session = self.session
+            if session.closed.wait(1.0):
+                return "closed"
+            now = time.monotonic()
+            if now - session.last_message_at > WS_STALE_TIMEOUT_SECONDS:
+                self.metrics["stale_disconnects"] += 1
+                session.close()
+                return "stale"
+            if now - session.opened_at > WS_ROTATE_AFTER_SECONDS:
+                if not self._rotate():
+                    time.sleep(min(5.0, WS_CONNECT_TIMEOUT_SECONDS))
+        return "stopped"
+
+    def run(self):
+        """Durum makinesi döngüsü (kendi denetçi thread'inde çalışır)."""
+        while self.running and self.streams:
+            self._set_state(STATE_CONNECTING)
+            session = self._connect()
+            if session is not None:
+                reason = self._supervise()
+                session = self.session  # Rotasyondan sonra aktif oturum yenisidir
+                session.close()
+                if not self.running:
+                    break
+                # Yeterince uzun açık kaldıysa bir sonraki bağlanma hemen denenir
+                if time.monotonic() - session.opened_at >= WS_BACKOFF_RESET_SECONDS:
+                    self.backoff.reset()
+                with self.lock:
+                    if self.disconnected_at is None:
+                        self.disconnected_at = time.monotonic()
+                print(f"🔌 Akış bağlantısı #{self.index} kapandı ({reason})")
+                send_telegram_message(f"🔄 WebSocket #{self.index} bağlantısı kapandı ({reason}), yeniden bağlanıyor...")
+            elif self.disconnected_at is None:
+                self.disconnected_at = time.monotonic()
+
+            if not (self.running and self.streams):
+                break
+            self._set_state(STATE_BACKOFF)
+            delay = self.backoff.next_delay()
+            print(f"⏳ Akış bağlantısı #{self.index} {delay:.1f} sn sonra tekrar denenecek "
+                  f"(deneme {self.backoff.attempts})")
+            if self.stop_event.wait(delay):
+                break
+        self._set_state(STATE_STOPPED if not self.running else STATE_IDLE)
+
+    def start(self):
+        self.running = True
+        self.stop_event.clear()
+        return get_app_context().start_thread(f"binance-stream-{self.index}", self.run)
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        if self.session is not None:
+            self.session.close()
+
+    def get_metrics(self):
+        now = time.monotonic()
+        session = self.session
+        return {**self.metrics, "index": self.index, "state": self.state, "streams": len(self.streams),
+                "connected": self.connected, "backoff_attempts": self.backoff.attempts,
+                "current_downtime_seconds": round(now - self.disconnected_at, 3) if self.disconnected_at else None,
+                "uptime_seconds": round(now - session.opened_at, 3)
+                if self.connected and session and session.opened_at else None}
+
+# **📌 Çoklu Sembol / Çoklu Akış Yöneticisi**
+class StreamManager:
+    """
+    Birçok sembol ve akış tipini (aggTrade, markPrice, bookTicker, depth,
+    kline) az sayıda birleşik akış bağlantısı üzerinden çoğullar. Bağlantı
+    başına akış sınırı dolunca yeni bir bağlantı (shard) açılır. Tüketiciler
+    akış veya sembol bazında callback kaydeder; fiyat taşıyan akışlar
+    son fiyat önbelleğini günceller (hedge stratejileri REST yoklaması yerine
+    bunu kullanır).
+    """
+
+    def __init__(self, base_url=BINANCE_FUTURES_WS_URL, max_streams_per_connection=WS_MAX_STREAMS_PER_CONNECTION):
+        self.base_url = base_url
+        self.max_streams_per_connection = max_streams_per_connection
+        self.lock = threading.RLock()
+        self.connections = []
+        self.stream_connection = {}  # akış adı -> StreamConnection
+        self.stream_callbacks = {}   # akış adı -> [callback(symbol, stream_type, data)]
+        self.symbol_callbacks = {}   # sembol -> [callback(symbol, stream_type, data)]
+        self.latest_prices = {}      # sembol -> (fiyat, yerel zaman)
+        self.reconnect_listeners = []
+        self.started = False
+        self.metrics = {"messages": 0, "callback_errors": 0, "unknown_streams": 0, "messages_per_stream": {}}
+
+    # 📌 Abonelik yönetimi
+    def subscribe(self, symbol, stream_type, callback=None):
+        """
+        Akışa abone olur (gerekirse bağlı bağlantıya SUBSCRIBE gönderir).
+        :param callback: callback(symbol, stream_type, data) — opsiyonel
+        :return: Akış adı
+        """
+        name = stream_name(symbol, stream_type)
+        with self.lock:
+            callbacks = self.stream_callbacks.setdefault(name, [])
+            if callback is not None and callback not in callbacks:
+                callbacks.append(callback)
+            if name in self.stream_connection:
+                return name
+
+            connection = next((c for c in self.connections if c.has_capacity()), None)
+            if connection is None:
+                connection = StreamConnection(self, len(self.connections), self.base_url)
+                self.connections.append(connection)
+            connection.add([name])
+            self.stream_connection[name] = connection
+            if self.started and not connection.running:
+                connection.start()
+        return name
+
+    def unsubscribe(self, symbol, stream_type, callback=None):
+        """Callback'i (None ise hepsini) kaldırır; akışın dinleyicisi kalmadıysa UNSUBSCRIBE gönderir."""
+        name = stream_name(symbol, stream_type)
+        with self.lock:
+            callbacks = self.stream_callbacks.get(name, [])
+            if callback is not None and callback in callbacks:
+                callbacks.remove(callback)
+            if callback is not None and callbacks:
+                return
+            self.stream_callbacks.pop(name, None)
+            connection = self.stream_connection.pop(name, None)
+        if connection is not None:
+            connection.remove([name])
+            if not connection.streams:
+                connection.stop()
+
+    def on_symbol(self, symbol, callback):
+        """Sembolün abone olunan bütün akışlarından gelen mesajlar için callback kaydeder."""
+        with self.lock:
+            self.symbol_callbacks.setdefault(symbol.upper(), []).append(callback)
+
+    def on_reconnect(self, callback):
+        """
+        callback(streams, downtime_seconds) — bir bağlantı kopup yeniden açıldığında,
+        ilk mesajdan önce alma thread'inde çağrılır (uzun işler ayrı thread'e bırakılmalı).
+        """
+        self.reconnect_listeners.append(callback)
+
+    def _notify_reconnect(self, connection, streams, downtime):
+        for callback in self.reconnect_listeners:
+            try:
+                callback(streams, downtime)
+            except Exception as e:
+                print(f"⚠️ Yeniden bağlanma dinleyicisi hatası (bağlantı #{connection.index}): {e}")
+
+    # 📌 Mesaj dağıtımı
+    def dispatch(self, message):
+        """Birleşik akış mesajını ({"stream": ..., "data": ...}) ilgili callback'lere iletir."""
+        payload = json.loads(message) if isinstance(message, (str, bytes)) else message
+        name = payload.get("stream")
+        if name is None:  # SUBSCRIBE yanıtı ({"result": null, "id": 1}) vb.
+            return
+        data = payload["data"]
+        symbol, stream_type = parse_stream_name(name)
+
+        price = price_from_message(stream_type, data)
+        if price is not None:
+            self.latest_prices[symbol] = (price, time.monotonic())
+
+        callbacks = self.stream_callbacks.get(name)
+        if callbacks is None:
+            self.metrics["unknown_streams"] += 1
+            return
+        self.metrics["messages"] += 1
+        per_stream = self.metrics["messages_per_stream"]
+        per_stream[name] = per_stream.get(name, 0) + 1
+
+        for callback in tuple(callbacks) + tuple(self.symbol_callbacks.get(symbol, ())):
+            try:
+                callback(symbol, stream_type, data)
+            except Exception as e:
+                self.metrics["callback_errors"] += 1
+                print(f"⚠️ Akış callback hatası ({name}): {e}")
+
+    # 📌 Son fiyat önbelleği
+    def get_latest_price(self, symbol, max_age_seconds=5.0):
+        """Akışlardan gelen son fiyat; yoksa veya `max_age_seconds`'tan eskiyse None."""
+        cached = self.latest_prices.get(symbol.upper())
+        if cached is None:
+            return None
+        price, received_at = cached
+        if max_age_seconds is not None and time.monotonic() - received_at > max_age_seconds:
+            return None
+        return price
+
+    # 📌 Yaşam döngüsü
+    def start(self):
+        """Bütün bağlantıları başlatır; sonradan eklenen shard'lar otomatik başlar."""
+        with self.lock:
+            self.started = True
+            for connection in self.connections:
+                if connection.streams and not connection.running:
+                    connection.start()
+        return self
+
+    def stop(self):
+        with self.lock:
+            self.started = False
+            for connection in self.connections:
+                connection.stop()
+
+    def get_metrics(self):
+        with self.lock:
+            return {**self.metrics, "messages_per_stream": dict(self.metrics["messages_per_stream"]),
+                    "connections": [c.get_metrics() for c in self.connections],
+                    "reconnects": sum(c.metrics["reconnects"] for c in self.connections),
+                    "downtime_seconds": round(sum(c.metrics["downtime_seconds"] for c in self.connections), 3),
+                    "cached_prices": len(self.latest_prices)}
+
+def get_stream_manager():
+    """Süreç genelinde paylaşılan StreamManager (AppContext üzerinden)."""
+    return get_app_context().get_or_create("stream_manager", StreamManager)
+
+def get_live_price(symbol, max_age_seconds=5.0):
+    """
+    Sembolün son fiyatını akış önbelleğinden döndürür; önbellekte taze fiyat
+    yoksa REST'e (get_binance_price) düşer.
+    """
+    price = get_stream_manager().get_latest_price(symbol, max_age_seconds)
+    if price is None:
+        from data_fetch.binance_api import get_binance_price
+
+        price = get_binance_price(symbol)
+    return price
@@ -1,26 +1,38 @@
+import time
+import threading
 import numpy as np
-import pandas as pd
-import arch  # GARCH modeli için
-import matplotlib.pyplot as plt
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from utils.lazy_import import lazy_import
+from data_fetch.candles import as_close_array
 from trading.binance_futures import execute_trade
 from notifications.telegram_bot import send_telegram_message
 
+# 📌 Ağır bağımlılıklar ilk kullanımda yüklenir
+pd = lazy_import("pandas")
+arch = lazy_import("arch")  # GARCH modeli için
+plt = lazy_import("matplotlib.pyplot")
+
+# 📌 GARCH filtresinin eğitilebilmesi için gereken en az fiyat sayısı
+MIN_FIT_PRICES = 30
+
 # **📌 GARCH Modeli ile Volatilite Tahmini**
-def train_garch_model(price_data):
+def train_garch_model(price_data, starting_values=None):
     """
     GARCH(1,1) modelini eğit ve volatiliteyi tahmin et.
     :param price_data: Geçmiş fiyat verileri (numpy array)
+    :param starting_values: Önceki eğitimin parametreleri (warm-start için, opsiyonel)
     :return: Eğitilmiş model ve volatilite tahminleri
     """
     try:
         if len(price_data) < 30:
             raise ValueError("GARCH modeli için en az 30 veri noktası gereklidir.")
 
-        df = pd.DataFrame(price_data, columns=["Close"])
-        log_returns = np.log(df["Close"]).diff().dropna()  # Log getirileri hesapla
+        prices = as_close_array(price_data)  # mmap görünümü / Candles kopyalanmaz
+        log_returns = np.diff(np.log(prices))  # Log getirileri hesapla
 
         model = arch.arch_model(log_returns, vol="Garch", p=1, q=1)
-        fitted_model = model.fit(disp="off")  # Modeli eğit
+        fitted_model = model.fit(disp="off", starting_values=starting_values)  # Modeli eğit
 
         # Son volatilite tahmini
         forecast = fitted_model.forecast(horizon=1).variance.iloc[-1, 0] ** 0.5
@@ -30,6 +42,330 @@ def train_garch_model(price_data):
         send_telegram_message(f"⚠️ GARCH Modeli Hatası: {e}")
         return None, None
 
+# **📌 GARCH Parametre Tahmini (Warm-Start Destekli)**
+GarchFitResult = namedtuple(
+    "GarchFitResult",
+    ["params", "sigma2_next", "in_sample_loglik", "observation", "duration", "iterations", "converged"]
+)
+
+def fit_garch_parameters(prices, scale=100.0, starting_values=None, observation=None):
+    """
+    Fiyatlardan GARCH(1,1) parametrelerini tahmin eder.
+    :param prices: Fiyat dizisi
+    :param scale: Getirilerin çarpılacağı ölçek
+    :param starting_values: Önceki (mu, omega, alpha, beta) parametreleri; verilirse optimizasyon bunlardan başlar
+    :param observation: Fiyat dizisinin son elemanının filtre içindeki gözlem sırası
+    :return: Değiştirilemez GarchFitResult
+    """
+    started = time.perf_counter()
+    log_returns = np.diff(np.log(as_close_array(prices))) * scale
+    model = arch.arch_model(log_returns, vol="Garch", p=1, q=1, rescale=False)
+    fitted_model = model.fit(
+        disp="off",
+        starting_values=None if starting_values is None else np.asarray(starting_values, dtype=np.float64)
+    )
+
+    params = fitted_model.params
+    mu, omega, alpha, beta = (float(params["mu"]), float(params["omega"]),
+                              float(params["alpha[1]"]), float(params["beta[1]"]))
+    last_resid = float(np.asarray(fitted_model.resid)[-1])
+    last_sigma2 = float(np.asarray(fitted_model.conditional_volatility)[-1]) ** 2
+    optimization_result = getattr(fitted_model, "optimization_result", None)
+
+    return GarchFitResult(
+        params=(mu, omega, alpha, beta),
+        sigma2_next=omega + alpha * last_resid ** 2 + beta * last_sigma2,
+        in_sample_loglik=float(fitted_model.loglikelihood) / max(int(fitted_model.nobs), 1),
+        observation=observation,
+        duration=time.perf_counter() - started,
+        iterations=getattr(optimization_result, "nit", None),
+        converged=fitted_model.convergence_flag == 0,
+    )
+
+# **📌 Artımlı (Incremental) GARCH(1,1) Volatilite Filtresi**
+class GarchVolatilityFilter:
+    """
+    Periyodik olarak eğitilen ve arada her yeni getiri için koşullu varyansı
+    O(1) özyineleme ile güncelleyen GARCH(1,1) filtresi:
+        sigma2[t+1] = omega + alpha * eps[t]^2 + beta * sigma2[t]
+    Böylece bir adım sonraki volatilite tahmini her tick'te MLE optimizasyonu
+    yapılmadan okunabilir.
+    """
+
+    def __init__(self, window=1000, refit_interval=500, refit_seconds=None,
+                 drift_window=100, drift_threshold=1.0, scale=100.0, auto_refit=True, scheduler=None,
+                 refit_backoff_seconds=30.0, max_refit_backoff_seconds=600.0):
+        """
+        :param window: Yeniden eğitim için saklanacak son fiyat sayısı
+        :param refit_interval: Kaç yeni getiriden sonra yeniden eğitileceği (None = kapalı)
+        :param refit_seconds: Kaç saniyede bir yeniden eğitileceği (None = kapalı)
+        :param drift_window: Olabilirlik kaymasının ölçüleceği son gözlem sayısı
+        :param drift_threshold: Gözlem başına ortalama log-olabilirlik düşüşü eşiği
+        :param scale: Optimizasyonun kararlılığı için getirilerin çarpıldığı ölçek
+        :param auto_refit: Gerektiğinde update() içinde yeniden eğitim yapılsın mı
+        :param scheduler: GarchRefitScheduler verilirse yeniden eğitim arka planda yapılır
+        :param refit_backoff_seconds: Başarısız / yakınsamayan eğitimden sonra bekleme (her hatada iki katına çıkar)
+        :param max_refit_backoff_seconds: Bekleme üst sınırı
+        """
+        self.prices = deque(maxlen=window)
+        self.refit_interval = refit_interval
+        self.refit_seconds = refit_seconds
+        self.drift_window = drift_window
+        self.drift_threshold = drift_threshold
+        self.scale = scale
+        self.auto_refit = auto_refit
+        self.scheduler = scheduler
+
+        self.params = None
+        self.sigma2_next = None
+        self.in_sample_loglik = None
+        self.recent_loglik = deque(maxlen=drift_window)
+        self.recent_loglik_sum = 0.0
+        self.updates_since_fit = 0
+        self.fitted_at = None
+        self.fit_count = 0
+        self.observations = 0  # Filtreye girmiş toplam fiyat sayısı
+        self.pending_fit = None  # Arka planda hazırlanmış, henüz devreye alınmamış sonuç
+        self.pending_lock = threading.Lock()
+        self.refit_backoff_seconds = refit_backoff_seconds
+        self.max_refit_backoff_seconds = max_refit_backoff_seconds
+        self.refit_failures = 0  # Art arda başarısız eğitim sayısı
+        self.last_refit_failure = None
+
+    @property
+    def is_fitted(self):
+        return self.params is not None
+
+    def fit(self, price_data=None):
+        """
+        GARCH(1,1) modelini (yeniden) eğitir ve filtre durumunu son gözleme getirir.
+        Önceki parametreler varsa optimizasyon onlardan başlar (warm-start).
+        :param price_data: Eğitimde kullanılacak fiyatlar (None ise saklanan pencere kullanılır)
+        :return: GarchFitResult veya None
+        """
+        if price_data is not None:
+            self.prices.clear()
+            self.prices.extend(as_close_array(price_data)[-self.prices.maxlen:].tolist())
+            self.observations += len(self.prices)
+
+        if len(self.prices) < MIN_FIT_PRICES:
+            print(f"⚠️ GARCH filtresi için en az {MIN_FIT_PRICES} veri noktası gereklidir.")
+            return None
+
+        try:
+            result = fit_garch_parameters(list(self.prices), self.scale, self.params, self.observations)
+            self.apply_fit(result)
+            return result
+        except Exception as e:
+            self.record_refit_failure()
+            print(f"⚠️ GARCH Filtresi Eğitim Hatası: {e}")
+            send_telegram_message(f"⚠️ GARCH Filtresi Eğitim Hatası: {e}", key="garch_fit_error")
+            return None
+
+    def record_refit_failure(self):
+        """Başarısız / yakınsamayan eğitimi kaydeder; sonraki deneme üstel beklemeden sonra yapılır."""
+        self.refit_failures += 1
+        self.last_refit_failure = time.monotonic()
+
+    def refit_backoff_remaining(self):
+        """Son başarısız eğitimden sonra yeni eğitim için kalan bekleme (sn)."""
+        if not self.refit_failures:
+            return 0.0
+        backoff = min(self.max_refit_backoff_seconds,
+                      self.refit_backoff_seconds * 2 ** (self.refit_failures - 1))
+        return max(0.0, self.last_refit_failure + backoff - time.monotonic())
+
+    def publish_fit(self, result):
+        """Arka plan eğitiminin sonucunu bir sonraki update() için bırakır."""
+        with self.pending_lock:
+            self.pending_fit = result
+
+    def snapshot(self):
+        """Arka plan eğitimi için fiyat penceresinin kopyasını ve gözlem sırasını döndürür."""
+        return list(self.prices), self.observations, self.params
+
+    def apply_fit(self, result):
+        """
+        Eğitim sonucunu devreye alır. Eğitim sırasında gelen getiriler yeni
+        parametrelerle tekrar işlenerek koşullu varyans güncel gözleme taşınır.
+        """
+        mu, omega, alpha, beta = result.params
+        sigma2 = result.sigma2_next
+
+        missed = self.observations - result.observation if result.observation is not None else 0
+        missed = min(missed, len(self.prices) - 1)
+        if missed > 0:
+            recent = np.log(np.asarray(self.prices, dtype=np.float64)[-(missed + 1):])
+            for log_return in np.diff(recent) * self.scale:
+                eps = log_return - mu
+                sigma2 = omega + alpha * eps * eps + beta * sigma2
+
+        self.params = result.params
+        self.sigma2_next = sigma2
+        self.in_sample_loglik = result.in_sample_loglik
+        self.recent_loglik.clear()
+        self.recent_loglik_sum = 0.0
+        self.updates_since_fit = 0
+        self.fitted_at = time.monotonic()
+        self.fit_count += 1
+        self.refit_failures = 0
+
+    def update(self, price):
+        """
+        Yeni fiyatı filtreye işler ve bir adım sonraki volatilite tahminini döndürür (O(1)).
+        """
+        price = float(price)
+
+        # Arka planda tamamlanmış bir eğitim varsa devreye al (aynı anda yayınlanan sonuç kaybolmasın)
+        with self.pending_lock:
+            pending, self.pending_fit = self.pending_fit, None
+        if pending is not None:
+            self.apply_fit(pending)
+
+        if not self.is_fitted or not self.prices:
+            self.prices.append(price)
+            self.observations += 1
+            # Henüz eğitilmemiş filtre, pencere yeterince dolunca kendini eğitir
+            if len(self.prices) >= MIN_FIT_PRICES:
+                self._auto_refit()
+            return None if not self.is_fitted else self.forecast()
+
+        mu, omega, alpha, beta = self.params
+        log_return = np.log(price / self.prices[-1]) * self.scale
+        self.prices.append(price)
+        self.observations += 1
+
+        eps = log_return - mu
+        sigma2 = self.sigma2_next
+
+        # Gözlemin mevcut parametreler altındaki log-olabilirliği (kayma tespiti için)
+        loglik = -0.5 * (np.log(2.0 * np.pi) + np.log(sigma2) + eps * eps / sigma2)
+        if len(self.recent_loglik) == self.recent_loglik.maxlen:
+            self.recent_loglik_sum -= self.recent_loglik[0]
+        self.recent_loglik.append(loglik)
+        self.recent_loglik_sum += loglik
+
+        self.sigma2_next = omega + alpha * eps * eps + beta * sigma2
+        self.updates_since_fit += 1
+
+        self._auto_refit()
+        return self.forecast()
+
+    def _auto_refit(self):
+        """auto_refit açıksa ve gerekiyorsa eğitimi (arka planda veya hemen) başlatır."""
+        if self.auto_refit and self.needs_refit():
+            if self.scheduler is not None:
+                self.scheduler.request_refit(self)
+            else:
+                self.fit()
+
+    def loglik_drift(self):
+        """Eğitim içi ortalama log-olabilirlik ile son gözlemlerinki arasındaki fark."""
+        if self.in_sample_loglik is None or len(self.recent_loglik) < self.drift_window:
+            return 0.0
+        return self.in_sample_loglik - self.recent_loglik_sum / len(self.recent_loglik)
+
+    def needs_refit(self):
+        """Zamanlamaya veya olabilirlik kaymasına göre yeniden eğitim gerekip gerekmediğini söyler."""
+        if self.refit_backoff_remaining() > 0:  # Son eğitim başarısız; her update'te yeniden denenmez
+            return False
+        if not self.is_fitted:
+            return True
+        if self.refit_interval is not None and self.updates_since_fit >= self.refit_interval:
+            return True
+        if self.refit_seconds is not None and time.monotonic() - self.fitted_at >= self.refit_seconds:
+            return True
+        return self.drift_threshold is not None and self.loglik_drift() > self.drift_threshold
+
+    def forecast(self):
+        """Bir adım sonraki volatilite tahmini (ölçeklenmemiş log getiri biriminde)."""
+        if self.sigma2_next is None:
+            return None
+        return float(np.sqrt(self.sigma2_next)) / self.scale
+
+# **📌 Arka Plan GARCH Yeniden Eğitim Zamanlayıcısı**
+class GarchRefitScheduler:
+    """
+    GARCH yeniden eğitimlerini arka plandaki bir işçide yapar. Eğitimler önceki
+    parametrelerden başlar (warm-start); başarılı sonuç filtrenin pending_fit
+    alanına tek referans ataması ile bırakılır ve bir sonraki update() çağrısında
+    devreye girer. İşlem yolu hiçbir zaman eğitimi beklemez.
+    """
+
+    def __init__(self, max_workers=1):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="garch-refit")
+        self.lock = threading.Lock()
+        self.in_flight = set()
+        self.metrics = {
+            "fits": 0,
+            "convergence_failures": 0,
+            "errors": 0,
+            "skipped": 0,
+            "last_duration": None,
+            "total_duration": 0.0,
+            "last_iterations": None,
+            "total_iterations": 0,
+            "last_error": None,
+        }
+
+    def request_refit(self, garch_filter):
+        """
+        Filtre için arka planda yeniden eğitim başlatır. Aynı filtre için zaten
+        çalışan bir eğitim varsa yeni istek yok sayılır.
+        :return: Future veya None
+        """
+        with self.lock:
+            if id(garch_filter) in self.in_flight:
+                self.metrics["skipped"] += 1
+                return None
+            self.in_flight.add(id(garch_filter))
+
+        prices, observation, previous_params = garch_filter.snapshot()
+        return self.executor.submit(self._refit, garch_filter, prices, observation, previous_params)
+
+    def _refit(self, garch_filter, prices, observation, previous_params):
+        try:
+            result = fit_garch_parameters(prices, garch_filter.scale, previous_params, observation)
+            with self.lock:
+                self.metrics["fits"] += 1
+                self.metrics["last_duration"] = result.duration
+                self.metrics["total_duration"] += result.duration
+                self.metrics["last_iterations"] = result.iterations
+                self.metrics["total_iterations"] += result.iterations or 0
+                if not result.converged:
+                    self.metrics["convergence_failures"] += 1
+
+            if not result.converged:
+                garch_filter.record_refit_failure()
+                print("⚠️ GARCH yeniden eğitimi yakınsamadı, önceki parametreler korunuyor.")
+                return None
+
+            garch_filter.publish_fit(result)
+            return result
+        except Exception as e:
+            with self.lock:
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = str(e)
+            garch_filter.record_refit_failure()
+            print(f"⚠️ GARCH Arka Plan Eğitim Hatası: {e}")
+            send_telegram_message(f"⚠️ GARCH Arka Plan Eğitim Hatası: {e}", key="garch_refit_error")
+            return None
+        finally:
+            with self.lock:
+                self.in_flight.discard(id(garch_filter))
+
+    def get_metrics(self):
+        """Eğitim süresi, iterasyon ve yakınsama hatası metriklerini döndürür."""
+        with self.lock:
+            metrics = dict(self.metrics)
+        attempts = metrics["fits"]
+        metrics["mean_duration"] = metrics["total_duration"] / attempts if attempts else None
+        metrics["mean_iterations"] = metrics["total_iterations"] / attempts if attempts else None
+        return metrics
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
 # **📌 GARCH Volatilite Tahminini Görselleştir**
 def plot_garch_volatility(price_data):
     """
@@ -52,41 +388,61 @@ def plot_garch_volatility(price_data):
         print(f"⚠️ Grafik çizim hatası: {e}")
         send_telegram_message(f"⚠️ GARCH Grafik Çizim Hatası: {e}")
 
+# **📌 Volatiliteye Göre Kaldıraç**
+def leverage_from_volatility(volatility_forecast):
+    """Volatilite tahminini 1x - 10x arası kaldıraca çevirir."""
+    if volatility_forecast is None:
+        return 1  # Varsayılan kaldıraç
+
+    if volatility_forecast < 0.005:
+        return 10  # Çok düşük volatilite, en yüksek kaldıraç
+    elif volatility_forecast < 0.015:
+        return 7
+    elif volatility_forecast < 0.03:
+        return 5
+    elif volatility_forecast < 0.05:
+        return 3
+    else:
+        return 1  # Yüksek volatilite, minimum kaldıraç
+
 # **📌 AI Destekli Kaldıraç Yönetimi**
-def garch_based_leverage(price_data):
+def garch_based_leverage(price_data, garch_filter=None):
     """
     GARCH modeli ile volatiliteye bağlı olarak AI destekli kaldıraç hesaplar.
     :param price_data: Geçmiş fiyat verileri
+    :param garch_filter: Eğitilmiş GarchVolatilityFilter (verilirse model yeniden eğitilmez)
     :return: Optimal kaldıraç oranı (1x - 10x)
     """
     try:
-        _, volatility_forecast = train_garch_model(price_data)
-        if volatility_forecast is None:
-            return 1  # Varsayılan kaldıraç
-
-        if volatility_forecast < 0.005:
-            return 10  # Çok düşük volatilite, en yüksek kaldıraç
-        elif volatility_forecast < 0.015:
-            return 7
-        elif volatility_forecast < 0.03:
-            return 5
-        elif volatility_forecast < 0.05:
-            return 3
+        if garch_filter is not None and garch_filter.is_fitted:
+            volatility_forecast = garch_filter.forecast()
         else:
-            return 1  # Yüksek volatilite, minimum kaldıraç
+            _, volatility_forecast = train_garch_model(price_data)
+
+        return leverage_from_volatility(volatility_forecast)
     except Exception as e:
         print(f"⚠️ Kaldıraç hesaplama hatası: {e}")
         send_telegram_message(f"⚠️ Kaldıraç hesaplama hatası: {e}")
         return 1  # Varsayılan kaldıraç
 
 # **📌 GARCH'a Göre AI Destekli İşlem Açma**
-def garch_trade_decision(price_data):
+def garch_signal(price_data, garch_filter=None, rng=None):
+    """
+    GARCH karar kuralı (emir göndermez; canlı işlem ve backtest aynı kuralı kullanır).
+    :param rng: Yön seçimi için np.random.Generator (backtest'te tekrarlanabilirlik için)
+    :return: (trade_type, leverage)
+    """
+    leverage = garch_based_leverage(price_data, garch_filter)
+    draw = rng.random() if rng is not None else np.random.rand()
+    trade_type = "LONG" if draw > 0.5 else "SHORT"
+    return trade_type, leverage
+
+def garch_trade_decision(price_data, garch_filter=None):
     """
     GARCH Modeli sonucuna göre alım/satım stratejisi belirler.
     """
     try:
-        leverage = garch_based_leverage(price_data)
-        trade_type = "LONG" if np.random.rand() > 0.5 else "SHORT"
+        trade_type, leverage = garch_signal(price_data, garch_filter)
 
         execute_trade("BTCUSDT", trade_type, quantity=0.01, leverage=leverage)
         send_telegram_message(f"📊 GARCH Modeli: AI destekli işlem açıldı.\nİşlem Türü: {trade_type} | Kaldıraç: {leverage}x")
@@ -1,61 +1,213 @@
 import numpy as np
-import pandas as pd
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from sklearn.preprocessing import MinMaxScaler
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.lazy_import import lazy_import
+from data_fetch.candles import as_close_array
+from ai_models.model_registry import (ModelRegistry, data_fingerprint, hyperparameter_fingerprint,
+                                      save_scaler, load_scaler)
+from collections import deque
+import math
 import os
+import threading
+import time
+
+# 📌 TensorFlow ağır bir bağımlılıktır; sadece LSTM stratejisi kullanıldığında yüklenir
+tf = lazy_import("tensorflow")
 
 # 📌 Model ve scaler için klasörü oluştur
 MODEL_DIR = "models"
 os.makedirs(MODEL_DIR, exist_ok=True)
+lstm_registry = ModelRegistry(MODEL_DIR, "lstm")
 
-# **📌 LSTM Modelini Eğitme Fonksiyonu**
-def train_lstm_model(price_data, epochs=20, batch_size=32):
-    """📈 LSTM modelini fiyat tahmini için eğit ve kaydet"""
-    
-    scaler = MinMaxScaler(feature_range=(0,1))
-    scaled_data = scaler.fit_transform(np.array(price_data).reshape(-1, 1))
+# 📌 Model mimarisi (uyumluluk kontrolü bu değerlerin parmak izi ile yapılır)
+LSTM_HYPERPARAMETERS = {"window": 60, "units": 50, "dropout": 0.2, "layers": 2, "loss": "mse"}
 
-    X, y = [], []
-    for i in range(60, len(scaled_data)):
-        X.append(scaled_data[i-60:i, 0])
-        y.append(scaled_data[i, 0])
+# **📌 Kopyasız Kayan Pencere Veri Seti**
+class SlidingWindowBatches:
+    """
+    Ölçeklenmiş fiyat serisini `sliding_window_view` ile kopyalamadan pencereler
+    ve Keras'a batch batch verir. Bellekte sadece seri ve o anki batch tutulur;
+    (örnek sayısı x 60 x 1) boyutlu tensör hiçbir zaman oluşturulmaz.
+    Keras Sequence'a dönüştürmek için sliding_window_sequence() kullanılır.
+    """
 
-    X, y = np.array(X), np.array(y)
-    X = np.reshape(X, (X.shape[0], X.shape[1], 1))
+    def __init__(self, series, window=60, batch_size=32, shuffle=True, seed=None, indices=None, **kwargs):
+        super().__init__(**kwargs)
+        self.series = np.ascontiguousarray(series, dtype=np.float32).reshape(-1)
+        if len(self.series) <= window:
+            raise ValueError(f"⚠️ Yeterli veri yok! En az {window + 1} fiyat verisi gerekli.")
 
-    # **📌 LSTM Modeli**
-    model = Sequential([
-        LSTM(units=50, return_sequences=True, input_shape=(X.shape[1], 1)),
-        Dropout(0.2),
-        LSTM(units=50),
-        Dropout(0.2),
-        Dense(units=1)
+        self.window = window
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.windows = sliding_window_view(self.series[:-1], window)  # (n - window, window) görünüm
+        self.targets = self.series[window:]
+        # indices verilirse sadece o hedefler (pencere sonları) kullanılır
+        self.indices = np.arange(len(self.targets)) if indices is None else np.asarray(indices, dtype=np.int64)
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+
+    def __len__(self):
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, batch_index):
+        batch = self.indices[batch_index * self.batch_size:(batch_index + 1) * self.batch_size]
+        return self.windows[batch][..., np.newaxis], self.targets[batch]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+
+_sliding_window_sequence_class = None
+
+def sliding_window_sequence(series, **kwargs):
+    """
+    SlidingWindowBatches'ı tf.keras.utils.Sequence ile birleştirip örnek oluşturur.
+    Sınıf TensorFlow ilk kez gerektiğinde bir kez tanımlanır.
+    """
+    global _sliding_window_sequence_class
+    if _sliding_window_sequence_class is None:
+        _sliding_window_sequence_class = type(
+            "SlidingWindowSequence", (SlidingWindowBatches, tf.keras.utils.Sequence), {}
+        )
+    return _sliding_window_sequence_class(series, **kwargs)
+
+# **📌 LSTM Modelini Oluşturma**
+def build_lstm_model(window=60, units=50, dropout=0.2):
+    """LSTM mimarisini oluşturur ve derler."""
+    layers = tf.keras.layers
+    model = tf.keras.Sequential([
+        layers.LSTM(units=units, return_sequences=True, input_shape=(window, 1)),
+        layers.Dropout(dropout),
+        layers.LSTM(units=units),
+        layers.Dropout(dropout),
+        layers.Dense(units=1)
     ])
-    
     model.compile(optimizer="adam", loss="mse")
-    model.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=1)
+    return model
+
+def _fit_lstm(model, scaled_data, epochs, batch_size, window, validation_split):
+    """Seriyi zaman sırasına göre eğitim/doğrulama olarak bölüp modeli eğitir."""
+    split = int(len(scaled_data) * (1 - validation_split))
+    validation = None
+    if validation_split > 0 and len(scaled_data) - split > window and split > window:
+        # Doğrulama pencereleri, ilk hedeften önceki `window` fiyatı da içermeli
+        validation = sliding_window_sequence(scaled_data[split - window:], window=window,
+                                           batch_size=batch_size, shuffle=False)
+        scaled_data = scaled_data[:split]
+
+    dataset = sliding_window_sequence(scaled_data, window=window, batch_size=batch_size)
+    history = model.fit(dataset, validation_data=validation, epochs=epochs, verbose=1)
+
+    losses = history.history.get("val_loss") or history.history.get("loss")
+    return float(losses[-1]) if losses else None
+
+def _register_lstm_model(model, scaler, data_hash, num_samples, val_loss, epochs, parent=None):
+    """Modeli, scaler'ı ve meta verisini kayıt defterine yazar."""
+    path = lstm_registry.create_artifact_dir(data_hash)
+    model.save(os.path.join(path, "model.keras"))
+    save_scaler(scaler, os.path.join(path, "scaler.npz"))
+    metadata = lstm_registry.commit_artifact(path, {
+        "data_hash": data_hash,
+        "num_samples": int(num_samples),
+        "data_min": float(scaler.data_min_[0]),
+        "data_max": float(scaler.data_max_[0]),
+        "hyperparameters": LSTM_HYPERPARAMETERS,
+        "hyperparameter_hash": hyperparameter_fingerprint(LSTM_HYPERPARAMETERS),
+        "validation_loss": val_loss,
+        "epochs": epochs,
+        "parent": parent,
+    })
+    lstm_registry.prune()
+    return metadata
+
+# **📌 LSTM Modelini Eğitme Fonksiyonu**
+def train_lstm_model(price_data, epochs=20, batch_size=32, validation_split=0.1):
+    """📈 LSTM modelini fiyat tahmini için eğit ve kayıt defterine kaydet"""
+    from sklearn.preprocessing import MinMaxScaler
+
+    window = LSTM_HYPERPARAMETERS["window"]
+    prices = as_close_array(price_data).reshape(-1, 1)
+
+    scaler = MinMaxScaler(feature_range=(0,1))
+    scaled_data = scaler.fit_transform(prices)
+
+    # **📌 LSTM Modeli**
+    model = build_lstm_model(window, LSTM_HYPERPARAMETERS["units"], LSTM_HYPERPARAMETERS["dropout"])
+    val_loss = _fit_lstm(model, scaled_data, epochs, batch_size, window, validation_split)
 
     # 📌 **Modeli Kaydet**
-    model.save(os.path.join(MODEL_DIR, "lstm_model.h5"))
-    np.save(os.path.join(MODEL_DIR, "lstm_scaler.npy"), scaler)
+    _register_lstm_model(model, scaler, data_fingerprint(prices), len(prices), val_loss, epochs)
 
     print("✅ LSTM modeli başarıyla eğitildi ve kaydedildi!")
     return model, scaler
 
 # **📌 LSTM Modelini Yükleme Fonksiyonu**
-def load_lstm_model():
-    """Kaydedilmiş LSTM modelini ve scaler'ı yükler"""
+def load_lstm_model(artifact_path=None):
+    """
+    Kaydedilmiş LSTM modelini ve scaler'ı yükler.
+    :param artifact_path: Kayıt klasörü (None ise kayıt defterindeki en yeni model,
+                          o da yoksa eski lstm_model.h5 / lstm_scaler.npy dosyaları)
+    """
     try:
-        model = load_model(os.path.join(MODEL_DIR, "lstm_model.h5"))
-        scaler = np.load(os.path.join(MODEL_DIR, "lstm_scaler.npy"), allow_pickle=True).item()
+        if artifact_path is None:
+            artifacts = lstm_registry.list_artifacts()
+            artifact_path = artifacts[0]["path"] if artifacts else None
+
+        if artifact_path is not None:
+            model = tf.keras.models.load_model(os.path.join(artifact_path, "model.keras"))
+            scaler = load_scaler(os.path.join(artifact_path, "scaler.npz"))
+        else:
+            model = tf.keras.models.load_model(os.path.join(MODEL_DIR, "lstm_model.h5"))
+            scaler = np.load(os.path.join(MODEL_DIR, "lstm_scaler.npy"), allow_pickle=True).item()
+
         print("✅ LSTM modeli ve scaler başarıyla yüklendi!")
         return model, scaler
     except Exception as e:
         print(f"⚠️ Model yüklenirken hata oluştu: {e}")
         return None, None
 
+# **📌 Kayıt Defterinden Yükle, Fine-Tune Et veya Eğit**
+def get_or_train_lstm_model(price_data, epochs=20, fine_tune_epochs=3, batch_size=32,
+                            validation_split=0.1, max_range_drift=0.2):
+    """
+    Fiyat verisinin parmak izine göre gereksiz eğitimi atlar:
+    - Aynı veri ve mimari ile eğitilmiş model varsa doğrudan yüklenir.
+    - Uyumlu (aynı mimari) bir model varsa ve fiyatlar scaler aralığından çok
+      taşmıyorsa o model yeni veriyle birkaç epoch fine-tune edilir.
+    - Aksi halde sıfırdan eğitilir.
+    :param max_range_drift: Fiyatların scaler aralığı dışına taşabileceği oran (aralığa göre)
+    :return: (model, scaler, durum) -> durum: "reused", "fine_tuned" veya "trained"
+    """
+    window = LSTM_HYPERPARAMETERS["window"]
+    prices = as_close_array(price_data).reshape(-1, 1)
+    data_hash = data_fingerprint(prices)
+    hyperparameter_hash = hyperparameter_fingerprint(LSTM_HYPERPARAMETERS)
+
+    exact = lstm_registry.find_exact(data_hash, hyperparameter_hash)
+    if exact is not None:
+        model, scaler = load_lstm_model(exact["path"])
+        if model is not None:
+            return model, scaler, "reused"
+
+    compatible = lstm_registry.latest_compatible(hyperparameter_hash)
+    if compatible is not None:
+        data_range = compatible["data_max"] - compatible["data_min"]
+        overflow = max(compatible["data_min"] - prices.min(), prices.max() - compatible["data_max"], 0.0)
+        if data_range > 0 and overflow / data_range <= max_range_drift:
+            model, scaler = load_lstm_model(compatible["path"])
+            if model is not None:
+                val_loss = _fit_lstm(model, scaler.transform(prices), fine_tune_epochs, batch_size,
+                                     window, validation_split)
+                _register_lstm_model(model, scaler, data_hash, len(prices), val_loss, fine_tune_epochs,
+                                     parent=os.path.basename(compatible["path"]))
+                print("✅ LSTM modeli mevcut modelden fine-tune edildi!")
+                return model, scaler, "fine_tuned"
+
+    model, scaler = train_lstm_model(prices, epochs=epochs, batch_size=batch_size,
+                                     validation_split=validation_split)
+    return model, scaler, "trained"
+
 # **📌 LSTM Modeli ile Fiyat Tahmini**
 def predict_price_lstm(model, scaler, last_60_prices):
     """📉 LSTM modeli ile fiyat tahmini yap"""
@@ -70,6 +222,254 @@ def predict_price_lstm(model, scaler, last_60_prices):
     predicted_price = model.predict(X_test)
     return scaler.inverse_transform(predicted_price)[0][0]
 
+# **📌 Yeni Kapanan Mumlarla Online Fine-Tune**
+class OnlineLSTMTrainer:
+    """
+    Mevcut modeli sadece son güncellemeden beri kapanan mumlarla fine-tune eder.
+    Unutmayı (catastrophic forgetting) önlemek için sınırlı bir tekrar (replay)
+    tamponundaki eski pencerelerden rastgele örnekler de eğitime katılır.
+    """
+
+    def __init__(self, model, scaler, replay_size=5000, replay_samples=512, epochs=1,
+                 batch_size=32, window=60, seed=None, on_update=None):
+        """
+        :param replay_size: Tekrar tamponunda tutulacak en fazla kapanış fiyatı
+        :param replay_samples: Her güncellemede eklenecek eski pencere sayısı
+        :param on_update: Her güncellemeden sonra çağrılacak fonksiyon (metrikler ile)
+        """
+        self.model = model
+        self.scaler = scaler
+        self.window = window
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.replay_samples = replay_samples
+        self.replay_buffer = deque(maxlen=replay_size)
+        self.pending_prices = []
+        self.rng = np.random.default_rng(seed)
+        self.on_update = on_update
+        self.lock = threading.Lock()
+        self.update_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.schedule_thread = None
+        self.metrics = {"updates": 0, "last_update_seconds": None, "total_update_seconds": 0.0,
+                        "last_loss": None, "last_new_samples": 0, "last_replay_samples": 0}
+
+    def seed_history(self, price_data):
+        """Tekrar tamponunu modelin eğitildiği geçmiş fiyatlarla doldurur."""
+        with self.lock:
+            self.replay_buffer.extend(as_close_array(price_data).reshape(-1).tolist())
+
+    def on_candle_close(self, close_price):
+        """Kapanan mumun fiyatını bir sonraki güncelleme için kuyruğa ekler."""
+        with self.lock:
+            self.pending_prices.append(float(close_price))
+
+    def update(self):
+        """
+        Bekleyen mumlarla modeli fine-tune eder.
+        :return: Güncelleme metrikleri veya (yeni veri yoksa) None
+        """
+        with self.update_lock:
+            with self.lock:
+                new_prices, self.pending_prices = self.pending_prices, []
+                history = list(self.replay_buffer)
+
+            if not new_prices or len(history) < self.window:
+                if new_prices:
+                    with self.lock:
+                        self.replay_buffer.extend(new_prices)
+                return None
+
+            started = time.perf_counter()
+            try:
+                series = np.asarray(history + new_prices, dtype=np.float64).reshape(-1, 1)
+                scaled = self.scaler.transform(series)
+
+                # Hedef indeksleri: yeni mumların hepsi + eski pencerelerden rastgele örnekler
+                num_targets = len(series) - self.window
+                new_indices = np.arange(num_targets - len(new_prices), num_targets)
+                old_count = num_targets - len(new_prices)
+                replay_indices = self.rng.choice(old_count, size=min(self.replay_samples, old_count), replace=False) \
+                    if old_count > 0 else np.empty(0, dtype=np.int64)
+
+                dataset = sliding_window_sequence(scaled, window=self.window, batch_size=self.batch_size,
+                                                indices=np.concatenate([new_indices, replay_indices]))
+                history_result = self.model.fit(dataset, epochs=self.epochs, verbose=0)
+            finally:
+                # Eğitim başarısız olsa bile (OOM, NaN, kesinti) mumlar kaybolmaz; tekrar tamponuna eklenir
+                with self.lock:
+                    self.replay_buffer.extend(new_prices)
+
+            elapsed = time.perf_counter() - started
+            losses = history_result.history.get("loss")
+            self.metrics["updates"] += 1
+            self.metrics["last_update_seconds"] = elapsed
+            self.metrics["total_update_seconds"] += elapsed
+            self.metrics["last_loss"] = float(losses[-1]) if losses else None
+            self.metrics["last_new_samples"] = len(new_indices)
+            self.metrics["last_replay_samples"] = len(replay_indices)
+            print(f"🔄 LSTM online güncelleme: {len(new_indices)} yeni mum, {elapsed:.2f} sn")
+
+        if self.on_update is not None:
+            self.on_update(dict(self.metrics))
+        return dict(self.metrics)
+
+    def save(self):
+        """Güncel modeli tekrar tamponunun parmak izi ile kayıt defterine yazar."""
+        with self.lock:
+            history = np.asarray(self.replay_buffer, dtype=np.float64)
+        return _register_lstm_model(self.model, self.scaler, data_fingerprint(history), len(history),
+                                    self.metrics["last_loss"], self.epochs, parent="online")
+
+    # **📌 Zamanlayıcı Kancası**
+    def start_schedule(self, interval_seconds=60):
+        """update() fonksiyonunu arka planda her `interval_seconds` saniyede bir çalıştırır."""
+        if self.schedule_thread is not None and self.schedule_thread.is_alive():
+            return self.schedule_thread
+
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.wait(interval_seconds):
+                try:
+                    self.update()
+                except Exception as e:
+                    print(f"⚠️ LSTM online güncelleme hatası: {e}")
+
+        self.schedule_thread = threading.Thread(target=run, name="lstm-online-update", daemon=True)
+        self.schedule_thread.start()
+        return self.schedule_thread
+
+    def stop_schedule(self):
+        self.stop_event.set()
+
+# **📌 Kayan Fiyat Penceresi**
+class RollingPriceWindow:
+    """
+    Sabit boyutlu, kopyasız okunabilen fiyat penceresi. Her değer tamponun iki
+    yarısına birden yazılır; böylece son `size` değer her zaman bitişik bir dilimdir.
+    """
+    __slots__ = ("size", "buffer", "position", "count")
+
+    def __init__(self, size=60):
+        self.size = size
+        self.buffer = np.zeros(2 * size, dtype=np.float32)
+        self.position = 0
+        self.count = 0
+
+    def append(self, value):
+        self.buffer[self.position] = value
+        self.buffer[self.position + self.size] = value
+        self.position = (self.position + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def is_ready(self):
+        return self.count == self.size
+
+    def view(self):
+        return self.buffer[self.position:self.position + self.size]
+
+# **📌 Kalıcı LSTM Tahmin Servisi**
+class LSTMPredictor:
+    """
+    Modeli ve scaler'ı bir kez yükleyip sembol başına son 60 fiyatı tutan uzun
+    ömürlü tahmin servisi. Tahminler `model.predict` yerine sabit imzalı bir
+    `tf.function` üzerinden yapılır; birden fazla sembol tek çağrıda (micro-batch)
+    tahmin edilebilir.
+    """
+
+    def __init__(self, model=None, scaler=None, window=60):
+        if model is None or scaler is None:
+            model, scaler = load_lstm_model()
+        if model is None or scaler is None:
+            raise FileNotFoundError("⚠️ Kaydedilmiş LSTM modeli bulunamadı! Önce modeli eğitin.")
+
+        self.model = model
+        self.window = window
+        # MinMaxScaler dönüşümü skaler işlemlerle yapılır (sklearn doğrulama maliyeti olmadan)
+        self.scale = float(scaler.scale_[0])
+        self.offset = float(scaler.min_[0])
+        self.windows = {}
+        self._infer = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=[None, window, 1], dtype=tf.float32)],
+            reduce_retracing=True,
+        )
+
+    def update(self, price, symbol="BTCUSDT"):
+        """Sembolün penceresine yeni (kapanmış) fiyatı ekler."""
+        rolling_window = self.windows.get(symbol)
+        if rolling_window is None:
+            rolling_window = self.windows[symbol] = RollingPriceWindow(self.window)
+        rolling_window.append(float(price) * self.scale + self.offset)
+
+    def extend(self, prices, symbol="BTCUSDT"):
+        """Pencereyi geçmiş fiyatlarla doldurur (sadece son `window` fiyat kullanılır)."""
+        for price in as_close_array(prices)[-self.window:]:
+            self.update(price, symbol)
+
+    def warmup(self, batch_sizes=(1,)):
+        """İlk çağrıdaki iz çıkarma (tracing) maliyetini önceden öder."""
+        for batch_size in batch_sizes:
+            self._infer(tf.zeros((batch_size, self.window, 1), dtype=tf.float32))
+
+    def _inverse(self, scaled):
+        return (scaled - self.offset) / self.scale
+
+    def predict(self, symbol="BTCUSDT"):
+        """Sembolün mevcut penceresi ile bir sonraki fiyatı tahmin eder."""
+        rolling_window = self.windows.get(symbol)
+        if rolling_window is None or not rolling_window.is_ready():
+            print(f"⚠️ {symbol} için yeterli veri yok! En az {self.window} fiyat verisi gerekli.")
+            return None
+
+        x = rolling_window.view().reshape(1, self.window, 1)
+        return float(self._inverse(self._infer(x).numpy()[0, 0]))
+
+    def predict_many(self, symbols):
+        """
+        Birden fazla sembolü tek model çağrısında (micro-batch) tahmin eder.
+        :return: {sembol: tahmini fiyat}
+        """
+        ready = [s for s in symbols if s in self.windows and self.windows[s].is_ready()]
+        if not ready:
+            return {}
+
+        batch = np.stack([self.windows[s].view() for s in ready])[..., np.newaxis]
+        predictions = self._inverse(self._infer(batch).numpy()[:, 0])
+        return {symbol: float(price) for symbol, price in zip(ready, predictions)}
+
+# **📌 Tahmin Gecikmesi Benchmark'ı**
+def benchmark_lstm_predictor(model, scaler, price_data, iterations=200):
+    """
+    `predict_price_lstm` (model.predict) ile LSTMPredictor gecikmesini karşılaştırır.
+    :return: {yöntem: {"mean_ms": ..., "p99_ms": ...}}
+    """
+    def measure(call):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        return {"mean_ms": round(float(np.mean(timings)), 4), "p99_ms": round(float(np.percentile(timings, 99)), 4)}
+
+    predictor = LSTMPredictor(model, scaler)
+    predictor.extend(price_data)
+    predictor.warmup()
+
+    results = {
+        "model.predict": measure(lambda: predict_price_lstm(model, scaler, price_data[-60:])),
+        "LSTMPredictor.predict": measure(predictor.predict),
+    }
+
+    symbols = [f"SYM{i}" for i in range(8)]
+    for symbol in symbols:
+        predictor.extend(price_data, symbol)
+    predictor.warmup(batch_sizes=(len(symbols),))
+    results["LSTMPredictor.predict_many (8 sembol)"] = measure(lambda: predictor.predict_many(symbols))
+
+    return results
+
 # 📌 **Eğer bu dosya doğrudan çalıştırılırsa model eğitilir**
 if __name__ == "__main__":
     # **Simüle edilen fiyat verileri (Binance API bağlandığında gerçek veriyle değiştirilir)**
@@ -83,3 +483,7 @@ if __name__ == "__main__":
     
     if predicted_price is not None:
         print(f"📊 AI Tahmini BTC/USDT Fiyatı: {predicted_price:.2f} USD")
+
+    # 📌 Kalıcı tahmin servisinin gecikmesini ölç
+    for method, timing in benchmark_lstm_predictor(trained_model, trained_scaler, fake_price_data).items():
+        print(f"⏱️ {method}: ortalama {timing['mean_ms']} ms | p99 {timing['p99_ms']} ms")
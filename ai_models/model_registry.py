@@ -0,0 +1,133 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from datetime import datetime, timezone
+
+# 📌 Kayıt dizini ve dosya formatlarının sürümleri
+REGISTRY_FORMAT_VERSION = 1
+SCALER_FORMAT_VERSION = 1
+METADATA_FILE = "metadata.json"
+
+# **📌 Veri ve Hiperparametre Parmak İzleri**
+def data_fingerprint(price_data):
+    """Fiyat serisinin (float64 baytları üzerinden) SHA-256 parmak izini döndürür."""
+    prices = np.ascontiguousarray(price_data, dtype=np.float64).reshape(-1)
+    digest = hashlib.sha256()
+    digest.update(str(len(prices)).encode())
+    digest.update(prices.tobytes())
+    return digest.hexdigest()
+
+def hyperparameter_fingerprint(hyperparameters):
+    """Hiperparametre sözlüğünün sıralı JSON temsilinden parmak izi üretir."""
+    encoded = json.dumps(hyperparameters, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+# **📌 Scaler Kalıcılığı (Sürümlü, Pickle'sız)**
+def save_scaler(scaler, path):
+    """
+    MinMaxScaler'ı pickle kullanmadan, sürümlü bir .npz dosyasına kaydeder.
+    """
+    np.savez(
+        path,
+        format_version=np.array(SCALER_FORMAT_VERSION),
+        feature_range=np.asarray(scaler.feature_range, dtype=np.float64),
+        data_min_=scaler.data_min_,
+        data_max_=scaler.data_max_,
+        data_range_=scaler.data_range_,
+        scale_=scaler.scale_,
+        min_=scaler.min_,
+        n_samples_seen_=np.asarray(scaler.n_samples_seen_),
+    )
+
+def load_scaler(path):
+    """save_scaler ile kaydedilmiş MinMaxScaler'ı yükler."""
+    from sklearn.preprocessing import MinMaxScaler
+
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["format_version"])
+        if version > SCALER_FORMAT_VERSION:
+            raise ValueError(f"⚠️ Desteklenmeyen scaler formatı: v{version}")
+
+        feature_range = tuple(float(v) for v in data["feature_range"])
+        scaler = MinMaxScaler(feature_range=feature_range)
+        scaler.data_min_ = data["data_min_"]
+        scaler.data_max_ = data["data_max_"]
+        scaler.data_range_ = data["data_range_"]
+        scaler.scale_ = data["scale_"]
+        scaler.min_ = data["min_"]
+        scaler.n_samples_seen_ = int(data["n_samples_seen_"])
+        scaler.n_features_in_ = len(scaler.scale_)
+    return scaler
+
+# **📌 Model Kayıt Defteri**
+class ModelRegistry:
+    """
+    MODEL_DIR altında modelleri meta verileriyle birlikte saklar:
+        <root>/registry/<model_name>/<artifact_id>/{model dosyaları, metadata.json}
+    metadata.json en son yazılır; bu dosyası olmayan (yarım kalmış) kayıtlar yok sayılır.
+    """
+
+    def __init__(self, root, model_name):
+        self.directory = os.path.join(root, "registry", model_name)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def list_artifacts(self):
+        """Tamamlanmış kayıtların meta verilerini en yeniden eskiye sıralı döndürür."""
+        artifacts = []
+        for artifact_id in os.listdir(self.directory):
+            metadata_path = os.path.join(self.directory, artifact_id, METADATA_FILE)
+            if not os.path.exists(metadata_path):
+                continue
+            try:
+                with open(metadata_path) as metadata_file:
+                    metadata = json.load(metadata_file)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Bozuk model meta verisi atlandı ({artifact_id}): {e}")
+                continue
+            metadata["path"] = os.path.join(self.directory, artifact_id)
+            artifacts.append(metadata)
+        return sorted(artifacts, key=lambda m: m.get("created_at", ""), reverse=True)
+
+    def find_exact(self, data_hash, hyperparameter_hash):
+        """Aynı veri ve aynı hiperparametrelerle eğitilmiş en yeni kaydı bulur."""
+        for metadata in self.list_artifacts():
+            if metadata.get("data_hash") == data_hash and metadata.get("hyperparameter_hash") == hyperparameter_hash:
+                return metadata
+        return None
+
+    def latest_compatible(self, hyperparameter_hash):
+        """Aynı hiperparametrelere sahip en yeni kaydı bulur (fine-tune için)."""
+        for metadata in self.list_artifacts():
+            if metadata.get("hyperparameter_hash") == hyperparameter_hash:
+                return metadata
+        return None
+
+    def create_artifact_dir(self, data_hash):
+        """Yeni bir kayıt için boş klasör oluşturur ve yolunu döndürür."""
+        created_at = datetime.now(timezone.utc)
+        artifact_id = f"{created_at:%Y%m%dT%H%M%S%f}-{data_hash[:12]}"
+        path = os.path.join(self.directory, artifact_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def commit_artifact(self, path, metadata):
+        """Meta veriyi atomik olarak yazarak kaydı tamamlar."""
+        metadata = dict(metadata)
+        metadata.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        metadata["registry_format_version"] = REGISTRY_FORMAT_VERSION
+        temp_path = os.path.join(path, METADATA_FILE + ".tmp")
+        with open(temp_path, "w") as metadata_file:
+            json.dump(metadata, metadata_file, indent=2, sort_keys=True)
+        os.replace(temp_path, os.path.join(path, METADATA_FILE))
+        metadata["path"] = path
+        return metadata
+
+    def prune(self, keep=5):
+        """En yeni `keep` kayıt dışındakileri ve yarım kalmış klasörleri siler."""
+        complete = {m["path"] for m in self.list_artifacts()[:keep]}
+        for artifact_id in os.listdir(self.directory):
+            path = os.path.join(self.directory, artifact_id)
+            if os.path.isdir(path) and path not in complete:
+                shutil.rmtree(path, ignore_errors=True)
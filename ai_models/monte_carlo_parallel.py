@@ -0,0 +1,193 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ai_models.monte_carlo_simulation import estimate_return_parameters, simulate_terminal_prices
+
+# **📌 Birleştirilebilir Kantil Özeti (Quantile Sketch)**
+class QuantileSketch:
+    """
+    Log-uzayda sabit aralıklı histogram ile birleştirilebilir kantil özeti.
+    Aynı sınırlarla oluşturulan özetler sayaçlar toplanarak birleştirilir;
+    böylece işçiler bütün yol matrisini değil sadece birkaç KB'lık sayacı geri gönderir.
+    """
+
+    def __init__(self, lower, upper, num_bins=4096):
+        if lower <= 0 or upper <= lower:
+            raise ValueError("Kantil özeti için 0 < lower < upper olmalıdır.")
+        self.log_lower = float(np.log(lower))
+        self.log_upper = float(np.log(upper))
+        self.num_bins = int(num_bins)
+        self.bin_width = (self.log_upper - self.log_lower) / self.num_bins
+        self.counts = np.zeros(self.num_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        """Değerleri özete ekler."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            positions = (np.log(values) - self.log_lower) / self.bin_width
+        positions = np.nan_to_num(positions, nan=-1.0, neginf=-1.0)
+        below = positions < 0
+        above = positions >= self.num_bins
+        self.underflow += int(below.sum())
+        self.overflow += int(above.sum())
+        inside = positions[~(below | above)].astype(np.int64)
+        self.counts += np.bincount(inside, minlength=self.num_bins)
+
+    def merge(self, other):
+        """Aynı sınırlara sahip başka bir özeti bu özete ekler."""
+        if (other.log_lower, other.log_upper, other.num_bins) != (self.log_lower, self.log_upper, self.num_bins):
+            raise ValueError("Farklı sınırlara sahip kantil özetleri birleştirilemez.")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """
+        q (0-1 arası) kantilini bin içinde log-doğrusal interpolasyonla tahmin eder.
+        Göreli hata en fazla bir bin genişliği kadardır.
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.underflow:
+            return self.min
+        cumulative = np.cumsum(self.counts) + self.underflow
+        idx = int(np.searchsorted(cumulative, rank, side="right"))
+        if idx >= self.num_bins:
+            return self.max
+        previous = cumulative[idx - 1] if idx > 0 else self.underflow
+        fraction = (rank - previous) / self.counts[idx] if self.counts[idx] else 0.0
+        value = float(np.exp(self.log_lower + (idx + fraction) * self.bin_width))
+        return min(max(value, self.min), self.max)
+
+def terminal_price_bounds(last_price, mean_return, std_dev, time_horizon, num_std=12.0):
+    """Vade sonu fiyatlar için kantil özetinin kapsayacağı log-uzay sınırlarını hesaplar."""
+    drift = time_horizon * np.log1p(mean_return)
+    spread = num_std * max(std_dev, 1e-12) * np.sqrt(time_horizon)
+    return last_price * np.exp(drift - spread), last_price * np.exp(drift + spread)
+
+# **📌 İşçi Süreci**
+def _risk_worker(worker_id, seed_sequence, last_price, mean_return, std_dev, num_simulations,
+                 time_horizon, bounds, num_bins, dtype, chunk_size):
+    """Tek bir işçi sürecinde simülasyon yapar ve sadece kantil özetini döndürür."""
+    started = time.perf_counter()
+    terminal_prices = simulate_terminal_prices(last_price, mean_return, std_dev, num_simulations,
+                                               time_horizon, rng=np.random.default_rng(seed_sequence),
+                                               dtype=dtype, chunk_size=chunk_size)
+    sketch = QuantileSketch(bounds[0], bounds[1], num_bins)
+    sketch.add(terminal_prices)
+    timing = {
+        "worker": worker_id,
+        "pid": os.getpid(),
+        "simulations": num_simulations,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    return sketch, timing
+
+def split_simulations(num_simulations, num_workers):
+    """Simülasyon sayısını işçiler arasında deterministik olarak böler."""
+    base, remainder = divmod(num_simulations, num_workers)
+    return [base + (1 if i < remainder else 0) for i in range(num_workers)]
+
+# **📌 Çok Süreçli Monte Carlo Risk Analizi**
+def parallel_monte_carlo_risk_analysis(price_data, num_simulations=1_000_000, time_horizon=30, seed=None,
+                                       num_workers=None, dtype=np.float64, chunk_size=100_000,
+                                       num_bins=4096, executor=None):
+    """
+    Monte Carlo risk analizini süreç havuzunda (ProcessPoolExecutor) çalıştırır.
+    Her işçi SeedSequence.spawn ile türetilmiş bağımsız bir rastgele akış kullanır;
+    aynı seed ve işçi sayısı ile sonuçlar tekrarlanabilir.
+    :param executor: Tekrar kullanılacak hazır bir ProcessPoolExecutor (opsiyonel)
+    :return: monte_carlo_risk_analysis ile aynı risk raporu + işçi süreleri
+    """
+    started = time.perf_counter()
+    num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_simulations))
+    mean_return, std_dev, last_price = estimate_return_parameters(price_data)
+    bounds = terminal_price_bounds(last_price, mean_return, std_dev, time_horizon)
+
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    child_seeds = seed_sequence.spawn(num_workers)
+    counts = split_simulations(num_simulations, num_workers)
+
+    own_executor = executor is None
+    pool = ProcessPoolExecutor(max_workers=num_workers) if own_executor else executor
+    try:
+        futures = [
+            pool.submit(_risk_worker, worker_id, child_seeds[worker_id], last_price, mean_return, std_dev,
+                        counts[worker_id], time_horizon, bounds, num_bins, dtype, chunk_size)
+            for worker_id in range(num_workers)
+        ]
+        results = [future.result() for future in futures]
+    finally:
+        if own_executor:
+            pool.shutdown()
+
+    sketch = results[0][0]
+    for other, _ in results[1:]:
+        sketch.merge(other)
+
+    lower_bound = sketch.quantile(0.05)
+    upper_bound = sketch.quantile(0.95)
+
+    risk_report = {
+        "expected_price": round(sketch.mean(), 2),
+        "lower_bound": round(lower_bound, 2),
+        "upper_bound": round(upper_bound, 2),
+        "VaR_95": round(lower_bound, 2),  # 95% VaR (Value at Risk)
+        "worker_timings": [timing for _, timing in results],
+        "wall_time": round(time.perf_counter() - started, 4),
+    }
+    return risk_report
+
+def parallel_multi_symbol_risk_analysis(price_data_by_symbol, num_simulations=1_000_000, time_horizon=30,
+                                        seed=None, num_workers=None, **kwargs):
+    """
+    Birden fazla sembol için risk analizini tek bir süreç havuzunu paylaşarak yapar.
+    :param price_data_by_symbol: {"BTCUSDT": fiyatlar, "ETHUSDT": fiyatlar, ...}
+    :return: {sembol: risk raporu}
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    symbol_seeds = np.random.SeedSequence(seed).spawn(len(price_data_by_symbol))
+    reports = {}
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        for symbol_seed, (symbol, price_data) in zip(symbol_seeds, price_data_by_symbol.items()):
+            reports[symbol] = parallel_monte_carlo_risk_analysis(
+                price_data, num_simulations, time_horizon, seed=symbol_seed,
+                num_workers=num_workers, executor=pool, **kwargs
+            )
+    return reports
+
+# 📌 **Eğer bu dosya doğrudan çalıştırılırsa tek çekirdek ile karşılaştırma yapılır**
+if __name__ == "__main__":
+    from ai_models.monte_carlo_simulation import monte_carlo_risk_analysis
+
+    fake_price_data = np.cumsum(np.random.randn(500)) + 50000  # 50.000 seviyesinden simüle edilmiş fiyatlar
+
+    start = time.perf_counter()
+    single_report = monte_carlo_risk_analysis(fake_price_data, num_simulations=2_000_000, seed=42)
+    print(f"🧮 Tek çekirdek: {time.perf_counter() - start:.2f} sn | {single_report}")
+
+    parallel_report = parallel_monte_carlo_risk_analysis(fake_price_data, num_simulations=2_000_000, seed=42)
+    print(f"⚡ Çok süreçli: {parallel_report['wall_time']:.2f} sn | {parallel_report}")
@@ -1,35 +1,96 @@
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+from utils.lazy_import import lazy_import
+from data_fetch.candles import as_close_array
 from trading.binance_futures import execute_trade
 from notifications.telegram_bot import send_telegram_message
 
+# 📌 DataFrame ve grafik kütüphaneleri sadece gerektiğinde yüklenir
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+
+# **📌 Getiri Parametrelerini Hesapla**
+def estimate_return_parameters(price_data):
+    """
+    Fiyat serisinden basit getiri ortalaması, standart sapması ve son fiyatı hesaplar.
+    :param price_data: Geçmiş fiyat verileri (numpy array / liste)
+    :return: (mean_return, std_dev, last_price)
+    """
+    prices = as_close_array(price_data)
+    if prices.ndim != 1 or len(prices) < 2:
+        raise ValueError("Monte Carlo simülasyonu için en az 2 fiyat verisi gereklidir.")
+
+    daily_returns = prices[1:] / prices[:-1] - 1.0
+    # pandas .std() ile aynı sonuç için örneklem standart sapması (ddof=1)
+    std_dev = daily_returns.std(ddof=1) if len(daily_returns) > 1 else 0.0
+    return float(daily_returns.mean()), float(std_dev), float(prices[-1])
+
+# **📌 Vektörize Monte Carlo Çekirdeği**
+def generate_price_paths(last_price, mean_return, std_dev, num_simulations=1000, time_horizon=30,
+                         rng=None, dtype=np.float64):
+    """
+    Bütün şok matrisini (num_simulations x time_horizon) tek seferde çekip
+    fiyat yollarını kümülatif çarpım ile üretir.
+    :param rng: numpy.random.Generator veya seed (tekrarlanabilirlik için)
+    :param dtype: np.float64 veya bellek/hız için np.float32
+    :return: (num_simulations, time_horizon) boyutlu fiyat matrisi
+    """
+    rng = np.random.default_rng(rng)
+    dtype = np.dtype(dtype).type
+    paths = rng.standard_normal((num_simulations, time_horizon), dtype=dtype)
+    paths *= dtype(std_dev)
+    paths += dtype(1.0 + mean_return)
+    np.cumprod(paths, axis=1, out=paths)
+    paths *= dtype(last_price)
+    return paths
+
+def simulate_terminal_prices(last_price, mean_return, std_dev, num_simulations=1000, time_horizon=30,
+                             rng=None, dtype=np.float64, chunk_size=100_000):
+    """
+    Sadece vade sonu fiyat dağılımını üretir; yolları parça parça (chunk) işleyerek
+    milyonlarca simülasyonda bile belleği chunk_size x time_horizon ile sınırlar.
+    :return: (num_simulations,) boyutlu vade sonu fiyatları
+    """
+    rng = np.random.default_rng(rng)
+    dtype = np.dtype(dtype).type
+    terminal_prices = np.empty(num_simulations, dtype=dtype)
+    chunk_size = max(1, min(int(chunk_size), num_simulations))
+    shocks = np.empty((chunk_size, time_horizon), dtype=dtype)
+
+    for start in range(0, num_simulations, chunk_size):
+        rows = min(chunk_size, num_simulations - start)
+        block = shocks[:rows]
+        rng.standard_normal(out=block, dtype=dtype)
+        block *= dtype(std_dev)
+        block += dtype(1.0 + mean_return)
+        np.prod(block, axis=1, out=terminal_prices[start:start + rows])
+
+    terminal_prices *= dtype(last_price)
+    return terminal_prices
+
+def monte_carlo_terminal_distribution(price_data, num_simulations=1000, time_horizon=30, seed=None,
+                                      dtype=np.float64, chunk_size=100_000):
+    """
+    Geçmiş fiyatlardan parametreleri tahmin eder ve vade sonu fiyat dağılımını döndürür.
+    Yüzdelik hesapları için DataFrame oluşturmaya gerek kalmaz.
+    """
+    mean_return, std_dev, last_price = estimate_return_parameters(price_data)
+    return simulate_terminal_prices(last_price, mean_return, std_dev, num_simulations, time_horizon,
+                                    rng=seed, dtype=dtype, chunk_size=chunk_size)
+
 # **📌 Monte Carlo Simülasyonu ile Fiyat Tahmini**
-def monte_carlo_simulation(price_data, num_simulations=1000, time_horizon=30):
+def monte_carlo_simulation(price_data, num_simulations=1000, time_horizon=30, seed=None, dtype=np.float64):
     """
     Monte Carlo simülasyonu ile gelecek fiyat tahmini yapar.
     :param price_data: Geçmiş fiyat verileri (numpy array)
     :param num_simulations: Çalıştırılacak simülasyon sayısı (default=1000)
     :param time_horizon: Simülasyon süresi (gün olarak)
+    :param seed: Tekrarlanabilir sonuçlar için seed veya numpy.random.Generator
+    :param dtype: np.float64 veya np.float32
     :return: Simülasyon sonuçları (DataFrame)
     """
-    df = pd.DataFrame(price_data, columns=["Close"])
-    daily_returns = df["Close"].pct_change().dropna()
-
-    mean_return = daily_returns.mean()
-    std_dev = daily_returns.std()
-
-    last_price = df["Close"].iloc[-1]
-    
-    simulation_results = np.zeros((num_simulations, time_horizon))
-
-    for sim in range(num_simulations):
-        simulated_prices = [last_price]
-        for _ in range(time_horizon):
-            simulated_price = simulated_prices[-1] * (1 + np.random.normal(mean_return, std_dev))
-            simulated_prices.append(simulated_price)
-        simulation_results[sim, :] = simulated_prices[1:]
-
+    mean_return, std_dev, last_price = estimate_return_parameters(price_data)
+    simulation_results = generate_price_paths(last_price, mean_return, std_dev, num_simulations,
+                                              time_horizon, rng=seed, dtype=dtype)
     return pd.DataFrame(simulation_results)
 
 # **📌 Monte Carlo Sonuçlarını Görselleştir**
@@ -59,42 +120,57 @@ def plot_monte_carlo(simulation_results):
     plt.show()
 
 # **📌 AI Destekli Risk Analizi**
-def monte_carlo_risk_analysis(price_data, num_simulations=1000, time_horizon=30):
+def monte_carlo_risk_analysis(price_data, num_simulations=1000, time_horizon=30, seed=None,
+                              dtype=np.float64, chunk_size=100_000):
     """
     Monte Carlo Simülasyonu ile AI destekli risk analizi yapar.
     :param price_data: Geçmiş fiyat verileri
     :return: Risk analizi raporu
     """
-    simulation_results = monte_carlo_simulation(price_data, num_simulations, time_horizon)
-    
-    # 5% ve 95% seviyelerinde fiyat projeksiyonları
-    lower_bound = np.percentile(simulation_results.values[:, -1], 5)
-    upper_bound = np.percentile(simulation_results.values[:, -1], 95)
-    
+    terminal_prices = monte_carlo_terminal_distribution(price_data, num_simulations, time_horizon,
+                                                        seed=seed, dtype=dtype, chunk_size=chunk_size)
+
+    # 5% ve 95% seviyelerinde fiyat projeksiyonları (tek geçişte)
+    lower_bound, upper_bound = np.percentile(terminal_prices, [5, 95])
+
     # Risk değerlendirmesi
-    expected_price = np.mean(simulation_results.values[:, -1])
-    var_95 = np.percentile(simulation_results.values[:, -1], 5)  # 95% VaR (Value at Risk)
+    expected_price = float(np.mean(terminal_prices, dtype=np.float64))
+    var_95 = lower_bound  # 95% VaR (Value at Risk)
 
     risk_report = {
         "expected_price": round(expected_price, 2),
-        "lower_bound": round(lower_bound, 2),
-        "upper_bound": round(upper_bound, 2),
-        "VaR_95": round(var_95, 2)
+        "lower_bound": round(float(lower_bound), 2),
+        "upper_bound": round(float(upper_bound), 2),
+        "VaR_95": round(float(var_95), 2)
     }
 
     return risk_report
 
 # **📌 Monte Carlo'ya Göre AI Destekli İşlem Açma**
-def monte_carlo_trade_decision(price_data):
+def monte_carlo_signal(price_data, num_simulations=1000, time_horizon=30, seed=None):
     """
-    Monte Carlo Simülasyonu sonucuna göre alım/satım stratejisi belirler.
+    Monte Carlo karar kuralı (emir göndermez; canlı işlem ve backtest aynı kuralı kullanır).
+    :return: ("LONG" | "SHORT" | "NO TRADE", risk_report)
     """
-    risk_report = monte_carlo_risk_analysis(price_data)
+    risk_report = monte_carlo_risk_analysis(price_data, num_simulations, time_horizon, seed=seed)
 
-    current_price = price_data[-1]
+    current_price = float(as_close_array(price_data)[-1])
     price_difference = (risk_report["expected_price"] - current_price) / current_price
 
-    if price_difference > 0.01:  # Eğer tahmini fiyat %1'den fazla yukarıda ise LONG aç
+    if price_difference > 0.01:  # Eğer tahmini fiyat %1'den fazla yukarıda ise LONG
+        return "LONG", risk_report
+    elif price_difference < -0.01:  # Eğer tahmini fiyat %1'den fazla aşağıda ise SHORT
+        return "SHORT", risk_report
+    return "NO TRADE", risk_report
+
+def monte_carlo_trade_decision(price_data, num_simulations=1000, time_horizon=30, seed=None):
+    """
+    Monte Carlo Simülasyonu sonucuna göre alım/satım stratejisi belirler.
+    """
+    decision, risk_report = monte_carlo_signal(price_data, num_simulations, time_horizon, seed=seed)
+    current_price = float(as_close_array(price_data)[-1])
+
+    if decision == "LONG":
         execute_trade("BTCUSDT", "LONG", quantity=0.01, leverage=3)
         send_telegram_message(
             f"📈 AI Monte Carlo: Yükseliş Bekleniyor! LONG açıldı."
@@ -102,7 +178,7 @@ def monte_carlo_trade_decision(price_data):
         )
         return "LONG", risk_report
 
-    elif price_difference < -0.01:  # Eğer tahmini fiyat %1'den fazla aşağıda ise SHORT aç
+    elif decision == "SHORT":
         execute_trade("BTCUSDT", "SHORT", quantity=0.01, leverage=3)
         send_telegram_message(
             f"📉 AI Monte Carlo: Düşüş Bekleniyor! SHORT açıldı."
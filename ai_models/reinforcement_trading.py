@@ -1,33 +1,48 @@
-import gym
 import numpy as np
 import os
-from stable_baselines3 import PPO, DQN, A2C
+from utils.lazy_import import lazy_import
+from config.app_context import get_app_context
 from trading.binance_futures import execute_trade
 from notifications.telegram_bot import send_telegram_message
-from gym.envs.registration import register
 
-# 📌 **Özel Ticaret Ortamını Kaydet ve Tanımla**
-try:
-    register(
-        id="TradingEnv-v0",
-        entry_point="trading_env:TradingEnv",
-    )
-except:
-    print("⚠️ TradingEnv zaten kayıtlı!")
-
-# 📌 **Ortamı Oluştur**
-try:
-    env = gym.make("TradingEnv-v0")
-except Exception as e:
-    print(f"⚠️ Ortam başlatılamadı: {e}")
-    env = None
+# 📌 gym ve stable-baselines3 (torch) sadece RL stratejisi kullanıldığında yüklenir
+gym = lazy_import("gym")
+stable_baselines3 = lazy_import("stable_baselines3")
 
 # 📌 **Model Dosyalarını Kaydetme ve Yükleme İşlemi**
 MODEL_DIR = "models"
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# 📌 Model adı -> (stable-baselines3 sınıf adı, dosya adı)
+RL_MODELS = {
+    "ppo": ("PPO", "ppo_trading_model"),
+    "dqn": ("DQN", "dqn_trading_model"),
+    "a2c": ("A2C", "a2c_trading_model"),
+}
+
+# 📌 **Özel Ticaret Ortamını Kaydet ve Oluştur**
+def _create_trading_env():
+    try:
+        gym.envs.registration.register(
+            id="TradingEnv-v0",
+            entry_point="trading_env:TradingEnv",
+        )
+    except Exception:
+        print("⚠️ TradingEnv zaten kayıtlı!")
+
+    try:
+        return gym.make("TradingEnv-v0")
+    except Exception as e:
+        print(f"⚠️ Ortam başlatılamadı: {e}")
+        return False  # Başarısız denemeyi önbellekte tut (her çağrıda tekrar denenmesin)
+
+def get_trading_env():
+    """TradingEnv ortamını AppContext üzerinden ilk çağrıda bir kez oluşturur."""
+    return get_app_context().get_or_create("trading_env", _create_trading_env) or None
+
 def load_or_create_model(model_class, model_name):
     """Kaydedilmiş modeli yükler veya yeni model oluşturur."""
+    env = get_trading_env()
     model_path = os.path.join(MODEL_DIR, model_name)
     if os.path.exists(model_path + ".zip"):
         print(f"✅ {model_name} modeli yükleniyor...")
@@ -36,67 +51,68 @@ def load_or_create_model(model_class, model_name):
         print(f"🔄 {model_name} modeli oluşturuluyor...")
         return model_class("MlpPolicy", env, verbose=1)
 
-# 📌 **Modelleri Tanımla**
-ppo_model = load_or_create_model(PPO, "ppo_trading_model")
-dqn_model = load_or_create_model(DQN, "dqn_trading_model")
-a2c_model = load_or_create_model(A2C, "a2c_trading_model")
+# 📌 **Modelleri İlk Kullanımda Yükle**
+def get_rl_model(name):
+    """PPO, DQN veya A2C modelini ilk kullanımda yükler/oluşturur ve AppContext'te tutar."""
+    class_name, model_name = RL_MODELS[name]
+    return get_app_context().get_or_create(
+        f"rl_model:{name}",
+        lambda: load_or_create_model(getattr(stable_baselines3, class_name), model_name)
+    )
 
 def train_models(total_timesteps=100000):
     """📈 PPO, DQN ve A2C modellerini eğit ve kaydet"""
-    if env is None:
+    if get_trading_env() is None:
         print("⚠️ Ortam başlatılamadı! Model eğitimi gerçekleştirilemiyor.")
         return
-    
-    print("🔄 PPO Modeli Eğitiliyor...")
-    ppo_model.learn(total_timesteps=total_timesteps)
-    ppo_model.save(os.path.join(MODEL_DIR, "ppo_trading_model"))
-
-    print("🔄 DQN Modeli Eğitiliyor...")
-    dqn_model.learn(total_timesteps=total_timesteps)
-    dqn_model.save(os.path.join(MODEL_DIR, "dqn_trading_model"))
 
-    print("🔄 A2C Modeli Eğitiliyor...")
-    a2c_model.learn(total_timesteps=total_timesteps)
-    a2c_model.save(os.path.join(MODEL_DIR, "a2c_trading_model"))
+    for name, (class_name, model_name) in RL_MODELS.items():
+        print(f"🔄 {class_name} Modeli Eğitiliyor...")
+        model = get_rl_model(name)
+        model.learn(total_timesteps=total_timesteps)
+        model.save(os.path.join(MODEL_DIR, model_name))
 
     print("✅ Reinforcement Learning Modelleri Eğitildi ve Kaydedildi!")
 
+# 📌 **RL Karar Kuralı** (emir göndermez; canlı işlem ve backtest aynı kuralı kullanır)
+def reinforcement_signal(name, observation, deterministic=False):
+    """PPO / DQN / A2C modelinin gözlem için verdiği kararı döndürür: "LONG" veya "SHORT"."""
+    action, _ = get_rl_model(name).predict(observation, deterministic=deterministic)
+    return "LONG" if action == 1 else "SHORT"
+
 # 📌 **PPO Modeli ile İşlem Aç**
 def reinforcement_trade_ppo():
     """📊 PPO modeli ile AI destekli işlem açar"""
+    env = get_trading_env()
     if env is None:
         print("⚠️ Ortam başlatılamadı! İşlem açılamıyor.")
         return
 
-    obs = env.reset()
-    action, _ = ppo_model.predict(obs)
-    trade_type = "LONG" if action == 1 else "SHORT"
+    trade_type = reinforcement_signal("ppo", env.reset())
     execute_trade(symbol="BTCUSDT", trade_type=trade_type, quantity=0.01, leverage=5)
     send_telegram_message(f"📈 PPO Modeli Kararı: {trade_type}")
 
 # 📌 **DQN Modeli ile İşlem Aç**
 def reinforcement_trade_dqn():
     """📊 DQN modeli ile AI destekli işlem açar"""
+    env = get_trading_env()
     if env is None:
         print("⚠️ Ortam başlatılamadı! İşlem açılamıyor.")
         return
 
-    obs = env.reset()
-    action, _ = dqn_model.predict(obs)
-    trade_type = "LONG" if action == 1 else "SHORT"
+    trade_type = reinforcement_signal("dqn", env.reset())
     execute_trade(symbol="BTCUSDT", trade_type=trade_type, quantity=0.01, leverage=5)
     send_telegram_message(f"📈 DQN Modeli Kararı: {trade_type}")
 
 # 📌 **A2C Modeli ile İşlem Aç**
 def reinforcement_trade_a2c():
     """📊 A2C modeli ile AI destekli işlem açar"""
+    env = get_trading_env()
     if env is None:
         print("⚠️ Ortam başlatılamadı! İşlem açılamıyor.")
         return
 
-    obs = env.reset()
-    action, _ = a2c_model.predict(obs)
-    trade_type = "LONG" if action == 1 else "SHORT"
+    trade_type = reinforcement_signal("a2c", env.reset())
     execute_trade(symbol="BTCUSDT", trade_type=trade_type, quantity=0.01, leverage=5)
     send_telegram_message(f"📈 A2C Modeli Kararı: {trade_type}")
 
@@ -1,21 +1,21 @@
 import numpy as np
-import pandas as pd
-from scipy.stats import norm
+from statistics import NormalDist
+from data_fetch.candles import as_close_array
 from trading.binance_futures import execute_trade
 from notifications.telegram_bot import send_telegram_message
 
 # **📌 AI Destekli Volatilite Hesaplama**
 def calculate_volatility(price_data, window=20):
-    """Fiyat verilerinden volatilite hesaplar"""
-    if len(price_data) < window:
+    """Fiyat verilerinden volatilite hesaplar (liste, numpy dizisi, mmap görünümü veya Candles)"""
+    if len(price_data) <= window:
         print("⚠️ Yetersiz veri! Volatilite hesaplanamıyor.")
         return None
-    
-    df = pd.DataFrame(price_data, columns=["Close"])
-    df["returns"] = df["Close"].pct_change().dropna()
-    df["volatility"] = df["returns"].rolling(window=window).std()
-    
-    return df["volatility"].dropna().iloc[-1]  # Son volatilite değeri
+
+    # Sadece son `window` getiri gerekir; mmap dizisinin tamamı belleğe okunmaz
+    prices = as_close_array(price_data)[-(window + 1):]
+    returns = prices[1:] / prices[:-1] - 1.0
+
+    return float(returns.std(ddof=1))  # Son volatilite değeri (pandas rolling().std() ile aynı)
 
 # **📌 Value at Risk (VaR) Hesaplama**
 def calculate_var(price_data, confidence_level=0.95):
@@ -24,17 +24,18 @@ def calculate_var(price_data, confidence_level=0.95):
         print("⚠️ Yetersiz veri! VaR hesaplanamıyor.")
         return None
 
-    df = pd.DataFrame(price_data, columns=["Close"])
-    daily_returns = df["Close"].pct_change().dropna()
+    prices = as_close_array(price_data)
+    daily_returns = prices[1:] / prices[:-1] - 1.0
 
     mean_return = daily_returns.mean()
-    std_dev = daily_returns.std()
+    std_dev = daily_returns.std(ddof=1)
 
     if std_dev == 0:
         print("⚠️ Standart sapma sıfır! VaR hesaplanamıyor.")
         return None
 
-    var_value = norm.ppf(confidence_level, mean_return, std_dev) * df["Close"].iloc[-1]
+    # scipy.stats.norm.ppf ile aynı sonuç; scipy'yi içe aktarma maliyeti olmadan
+    var_value = NormalDist(mean_return, std_dev).inv_cdf(confidence_level) * prices[-1]
     return abs(var_value)
 
 # **📌 AI Destekli Stop-Loss & Take-Profit Hesaplama**
@@ -0,0 +1,246 @@
+import time
+import numpy as np
+from utils.lazy_import import lazy_import
+from config.app_context import get_binance_transport
+from data_fetch.ohlcv_store import get_ohlcv_store
+from backtest.simulated_broker import (BrokerConfig, simulate_orders, kernel_is_compiled, TRADE_FIELDS,
+                                       EXIT_REASONS, SIGNAL_LONG, SIGNAL_SHORT, SIGNAL_NONE,
+                                       T_GROSS_PNL, T_FEES, T_FUNDING, T_EXIT_REASON)
+
+# 📌 Strateji modülleri (TensorFlow / arch / stable-baselines3) sadece ilgili strateji test edilirken yüklenir
+monte_carlo_simulation = lazy_import("ai_models.monte_carlo_simulation")
+garch_model = lazy_import("ai_models.garch_model")
+reinforcement_trading = lazy_import("ai_models.reinforcement_trading")
+
+# 📌 Strateji kararlarının sinyal kodları
+DECISION_CODES = {"LONG": SIGNAL_LONG, "SHORT": SIGNAL_SHORT, "NO TRADE": SIGNAL_NONE}
+
+FUNDING_INTERVAL_MS = 8 * 3_600_000  # Binance USDⓈ-M: 00:00 / 08:00 / 16:00 UTC
+MAX_FUNDING_PER_REQUEST = 1000
+
+# **📌 Strateji Adaptörleri** (canlı işlemle aynı karar kuralları, emir gönderilmez)
+def monte_carlo_strategy(num_simulations=1000, time_horizon=30, seed=None):
+    """monte_carlo_trade_decision ile aynı kural (bkz. monte_carlo_signal)."""
+    def decide(close_window):
+        return monte_carlo_simulation.monte_carlo_signal(close_window, num_simulations, time_horizon, seed=seed)[0]
+    return decide
+
+def garch_strategy(seed=None):
+    """garch_trade_decision ile aynı kural; yön seçimi tohumlu üreteçle tekrarlanabilir."""
+    rng = np.random.default_rng(seed)
+
+    def decide(close_window):
+        return garch_model.garch_signal(close_window, rng=rng)[0]
+    return decide
+
+def reinforcement_strategy(observation_fn, name="ppo"):
+    """
+    reinforcement_trade_ppo / dqn / a2c ile aynı model kararı.
+    :param observation_fn: Kapanış penceresinden, modelin eğitildiği TradingEnv
+                           gözlemiyle aynı biçimde gözlem üreten fonksiyon (zorunlu;
+                           ham fiyat penceresi modelin gözlem uzayına uymaz)
+    """
+    if not callable(observation_fn):
+        raise ValueError("RL backtest'i için TradingEnv gözlemini üreten observation_fn gereklidir.")
+
+    def decide(close_window):
+        return reinforcement_trading.reinforcement_signal(name, observation_fn(close_window), deterministic=True)
+    return decide
+
+# **📌 Karar Sinyallerini Üret**
+def generate_signals(close, decide, window=500, decision_interval=60):
+    """
+    Stratejiyi her `decision_interval` mumda bir, o muma kadar olan son `window`
+    kapanışla (kopyasız görünüm, ileriye bakma yok) çağırır ve kararları int8
+    sinyal dizisine yazar. Pahalı modeller (Monte Carlo, GARCH, RL) sadece karar
+    anlarında çalışır; simülasyon döngüsü strateji kodunu hiç çağırmaz.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.zeros(len(close), dtype=np.int8)
+    for index in range(window - 1, len(close), max(1, int(decision_interval))):
+        decision = decide(close[index - window + 1:index + 1])
+        signals[index] = DECISION_CODES.get(decision, SIGNAL_NONE)
+    return signals
+
+# **📌 Fonlama Takvimi**
+def funding_schedule(open_time, rate=None, funding_times=None, funding_rates=None):
+    """
+    Her fonlama anını (ms) o andan sonra açılan ilk mumun açılışına yerleştirir.
+    :param rate: Sabit oran (her 8 saatte bir); veya
+    :param funding_times, funding_rates: Geçmiş oranlar (bkz. fetch_funding_history)
+    :return: Mum sayısı uzunluğunda float64 oran dizisi (fonlama olmayan mumlarda 0)
+    """
+    open_time = np.asarray(open_time, dtype=np.int64)
+    funding = np.zeros(len(open_time), dtype=np.float64)
+    if not len(open_time):
+        return funding
+
+    if funding_times is None:
+        if not rate:
+            return funding
+        first = -(-int(open_time[0]) // FUNDING_INTERVAL_MS) * FUNDING_INTERVAL_MS
+        funding_times = np.arange(first, int(open_time[-1]) + 1, FUNDING_INTERVAL_MS, dtype=np.int64)
+        funding_rates = np.full(len(funding_times), float(rate))
+
+    funding_times = np.asarray(funding_times, dtype=np.int64)
+    funding_rates = np.asarray(funding_rates, dtype=np.float64)
+    index = np.searchsorted(open_time, funding_times, side="left")
+    inside = (index < len(open_time)) & (funding_times >= open_time[0])
+    np.add.at(funding, index[inside], funding_rates[inside])
+    return funding
+
+def fetch_funding_history(symbol="BTCUSDT", start_time=None, end_time=None, transport=None):
+    """
+    /fapi/v1/fundingRate geçmişini sayfalayarak çeker.
+    :return: (funding_times int64 ms, funding_rates float64)
+    """
+    transport = transport or get_binance_transport()
+    end_time = int(end_time or time.time() * 1000)
+    cursor = int(start_time or end_time - 365 * 24 * 3_600_000)
+    times, rates = [], []
+    while cursor < end_time:
+        rows = transport.get_json("/fapi/v1/fundingRate", params={"symbol": symbol, "startTime": cursor,
+                                                                  "endTime": end_time,
+                                                                  "limit": MAX_FUNDING_PER_REQUEST})
+        if isinstance(rows, dict):  # {"code": ..., "msg": ...}
+            raise RuntimeError(f"Binance fonlama geçmişi hatası: {rows}")
+        if not rows:
+            break
+        times.extend(int(row["fundingTime"]) for row in rows)
+        rates.extend(float(row["fundingRate"]) for row in rows)
+        if len(rows) < MAX_FUNDING_PER_REQUEST:
+            break
+        cursor = times[-1] + 1
+    return np.asarray(times, dtype=np.int64), np.asarray(rates, dtype=np.float64)
+
+# **📌 aggTrades -> Mum Kolonları**
+def bars_from_agg_trades(trade_times, prices):
+    """
+    aggTrades dizilerini işlem başına bir "mum" olarak (O=H=L=C=fiyat) döndürür;
+    simüle broker böylece stop / limit seviyelerini işlem hassasiyetinde işler.
+    Diziler kopyalanmaz, dört fiyat kolonu aynı diziyi paylaşır.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    return {"open_time": np.asarray(trade_times, dtype=np.int64),
+            "open": prices, "high": prices, "low": prices, "close": prices}
+
+# **📌 Backtest Sonucu**
+class BacktestResult:
+    """Hesap değeri, pozisyon ve işlem dizileri ile özet metrikler."""
+
+    def __init__(self, open_time, equity, position, trades, signals, config, seconds):
+        self.open_time = open_time
+        self.equity = equity
+        self.position = position
+        self.trades = trades
+        self.signals = signals
+        self.config = config
+        self.seconds = seconds
+
+    def trade_column(self, name):
+        """İşlem matrisinden tek kolon (bkz. TRADE_FIELDS)."""
+        return self.trades[:, TRADE_FIELDS.index(name)]
+
+    def trade_records(self):
+        """İşlemleri sözlük listesi olarak döndürür (raporlama / Telegram için)."""
+        records = []
+        for row in self.trades:
+            record = dict(zip(TRADE_FIELDS, row.tolist()))
+            record["exit_reason"] = EXIT_REASONS[int(record["exit_reason"])]
+            record["net_pnl"] = record["gross_pnl"] - record["fees"] - record["funding"]
+            records.append(record)
+        return records
+
+    def summary(self):
+        """Net kâr, getiri, en büyük düşüş, işlem sayısı, kazanma oranı, ücret ve fonlama toplamları."""
+        initial_balance = float(self.config.initial_balance)
+        final_equity = float(self.equity[-1]) if len(self.equity) else initial_balance
+        net_pnl = self.trades[:, T_GROSS_PNL] - self.trades[:, T_FEES] - self.trades[:, T_FUNDING]
+        peak = np.maximum.accumulate(self.equity) if len(self.equity) else np.array([initial_balance])
+        drawdown = (self.equity - peak) / peak if len(self.equity) else np.zeros(1)
+
+        returns = np.diff(self.equity) / self.equity[:-1] if len(self.equity) > 1 else np.zeros(0)
+        sharpe = None
+        if len(returns) > 1 and returns.std() > 0 and len(self.open_time) > 1:
+            bar_ms = float(np.median(np.diff(self.open_time[:1000])))
+            bars_per_year = 365 * 24 * 3_600_000 / bar_ms if bar_ms > 0 else 0
+            sharpe = round(float(returns.mean() / returns.std() * np.sqrt(bars_per_year)), 3)
+
+        reasons = np.bincount(self.trades[:, T_EXIT_REASON].astype(np.int64), minlength=len(EXIT_REASONS))
+        return {
+            "bars": len(self.equity),
+            "final_equity": round(final_equity, 2),
+            "net_pnl": round(final_equity - initial_balance, 2),
+            "return_pct": round((final_equity / initial_balance - 1) * 100, 3),
+            "max_drawdown_pct": round(float(drawdown.min()) * 100, 3),
+            "sharpe": sharpe,
+            "trades": len(self.trades),
+            "win_rate": round(float((net_pnl > 0).mean()), 3) if len(net_pnl) else None,
+            "fees": round(float(self.trades[:, T_FEES].sum()), 4),
+            "funding": round(float(self.trades[:, T_FUNDING].sum()), 4),
+            "exit_reasons": {EXIT_REASONS[code]: int(count) for code, count in enumerate(reasons) if count},
+            "bars_per_second": round(len(self.equity) / self.seconds) if self.seconds > 0 else None,
+            "compiled": kernel_is_compiled(),
+        }
+
+# **📌 Backtest Çalıştır**
+def run_backtest(data, strategy=None, signals=None, config=None, funding=None, window=500, decision_interval=60):
+    """
+    Geçmiş mumları strateji kararlarından ayrı çalışan simüle broker ile oynatır.
+    :param data: OHLCVView / Candles / {kolon: dizi} (open_time, open, high, low, close)
+    :param strategy: decide(close_window) -> "LONG" | "SHORT" | "NO TRADE" (örn. monte_carlo_strategy())
+    :param signals: Önceden üretilmiş sinyal dizisi (verilirse strateji çağrılmaz)
+    :param config: BrokerConfig (emir tipi, stop / kâr al / iz süren stop, ücret, kayma)
+    :param funding: funding_schedule(...) çıktısı veya None
+    :return: BacktestResult
+    """
+    columns = data if isinstance(data, dict) else {name: getattr(data, name)
+                                                  for name in ("open_time", "open", "high", "low", "close")}
+    config = config or BrokerConfig()
+    if signals is None:
+        if strategy is None:
+            raise ValueError("Backtest için strateji veya sinyal dizisi gereklidir.")
+        signals = generate_signals(columns["close"], strategy, window, decision_interval)
+
+    started = time.perf_counter()
+    equity, position, trades = simulate_orders(columns["open"], columns["high"], columns["low"], columns["close"],
+                                               signals, funding=funding, config=config)
+    seconds = time.perf_counter() - started
+    return BacktestResult(np.asarray(columns["open_time"]), equity, position, trades, signals, config, seconds)
+
+def load_backtest_data(symbol="BTCUSDT", interval="1h", start_time=None, end_time=None):
+    """Diskteki mumları (bkz. kline_backfill / OHLCVStore) kopyasız mmap görünümü olarak açar."""
+    return get_ohlcv_store().open(symbol, interval).between(start_time, end_time)
+
+# 📌 **Doğrudan çalıştırılırsa sentetik veriyle çekirdek hızı ölçülür**
+# Kullanım: python -m backtest.engine [mum_sayısı]
+if __name__ == "__main__":
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    rng = np.random.default_rng(0)
+    open_time = 1_600_000_000_000 + np.arange(count, dtype=np.int64) * 60_000
+    close = 50_000 * np.exp(np.cumsum(rng.normal(0, 0.0008, count)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, count)) * close
+    bars = {"open_time": open_time, "open": open_, "close": close,
+            "high": np.maximum(open_, close) + spread, "low": np.minimum(open_, close) - spread}
+
+    # Basit momentum kuralı (vektörel): 60 mumluk getiri yönü, 60 mumda bir karar
+    momentum = np.zeros(count, dtype=np.int8)
+    momentum[60::60] = np.sign(close[60::60] - close[:-60:60]).astype(np.int8)
+
+    config = BrokerConfig(quantity=0.01, stop_loss_pct=0.01, take_profit_pct=0.02,
+                          trailing_activation_pct=0.005, trailing_callback_rate=0.5)
+    funding = funding_schedule(open_time, rate=0.0001)
+    run_backtest({name: values[:1000] for name, values in bars.items()}, signals=momentum[:1000],
+                 config=config, funding=funding[:1000])  # Derleme (numba) ısınması
+
+    result = run_backtest(bars, signals=momentum, config=config, funding=funding)
+    summary = result.summary()
+    print(f"⚡ {count} mum {result.seconds * 1000:.1f} ms "
+          f"({summary['bars_per_second'] * 60 / 1e6:.1f} M mum/dk, derlenmiş: {summary['compiled']})")
+    print(f"📊 {summary}")
+
+    limit_config = config._replace(entry_type="LIMIT", limit_offset_pct=0.001, limit_ttl_bars=30)
+    print(f"📊 LIMIT giriş: {run_backtest(bars, signals=momentum, config=limit_config, funding=funding).summary()}")
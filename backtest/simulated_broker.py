@@ -0,0 +1,296 @@
+import importlib.util
+import threading
+import numpy as np
+from collections import namedtuple
+from config.config import (STOP_LOSS_PERCENT, TAKE_PROFIT_PERCENT, BACKTEST_TAKER_FEE, BACKTEST_MAKER_FEE,
+                           BACKTEST_SLIPPAGE_BPS, BACKTEST_INITIAL_BALANCE)
+
+# 📌 Emir tipleri (trading/order_manager.py ile aynı isimler) ve çıkış nedenleri
+ORDER_TYPES = ("MARKET", "LIMIT", "STOP_MARKET", "TAKE_PROFIT_MARKET", "TRAILING_STOP_MARKET")
+MARKET, LIMIT, STOP_MARKET, TAKE_PROFIT_MARKET, TRAILING_STOP_MARKET = range(len(ORDER_TYPES))
+END_OF_DATA = len(ORDER_TYPES)  # Veri bitince açık pozisyon son kapanıştan kapatılır
+EXIT_REASONS = ORDER_TYPES + ("END_OF_DATA",)
+
+# 📌 İşlem kayıtları tek bir float64 matriste tutulur (işlem başına nesne oluşturulmaz)
+TRADE_FIELDS = ("entry_bar", "exit_bar", "side", "entry_price", "exit_price", "quantity",
+                "gross_pnl", "fees", "funding", "exit_reason")
+(T_ENTRY_BAR, T_EXIT_BAR, T_SIDE, T_ENTRY_PRICE, T_EXIT_PRICE, T_QUANTITY,
+ T_GROSS_PNL, T_FEES, T_FUNDING, T_EXIT_REASON) = range(len(TRADE_FIELDS))
+
+# 📌 Sinyal kodları: strateji kararı mumun kapanışında verilir, emir bir sonraki mumda işler
+SIGNAL_SHORT, SIGNAL_NONE, SIGNAL_LONG = -1, 0, 1
+
+# **📌 Simüle Broker Ayarları**
+BrokerConfig = namedtuple("BrokerConfig", [
+    "quantity",                 # Sabit işlem miktarı (stratejiler canlıda 0.01 BTC açar)
+    "entry_type",               # "MARKET" veya "LIMIT"
+    "limit_offset_pct",         # LIMIT giriş: sinyal kapanışından bu oran kadar iyi fiyat
+    "limit_ttl_bars",           # LIMIT emir bu kadar mum dolmazsa iptal (0 = yeni sinyale kadar GTC)
+    "stop_loss_pct",            # STOP_MARKET mesafesi (0 = kapalı)
+    "take_profit_pct",          # TAKE_PROFIT_MARKET mesafesi (0 = kapalı)
+    "trailing_activation_pct",  # TRAILING_STOP_MARKET aktivasyon mesafesi (0 = girişte aktif)
+    "trailing_callback_rate",   # Binance callbackRate gibi yüzde (örn. 1.0 = %1; 0 = kapalı)
+    "taker_fee",
+    "maker_fee",
+    "slippage_bps",             # Piyasa emirlerinde aleyhe kayma (baz puan)
+    "initial_balance",
+])
+BrokerConfig.__new__.__defaults__ = (0.01, "MARKET", 0.0, 0, STOP_LOSS_PERCENT, TAKE_PROFIT_PERCENT, 0.0, 0.0,
+                                     BACKTEST_TAKER_FEE, BACKTEST_MAKER_FEE, BACKTEST_SLIPPAGE_BPS,
+                                     BACKTEST_INITIAL_BALANCE)
+
+# **📌 Dizi Tabanlı Simülasyon Çekirdeği**
+def _simulate(open_, high, low, close, funding, signal,
+              quantity, entry_type, limit_offset, limit_ttl, stop_loss_pct, take_profit_pct,
+              trailing_activation_pct, trailing_callback, taker_fee, maker_fee, slippage, initial_balance,
+              equity_out, position_out, trades_out):
+    """
+    Bütün mumları tek geçişte işler. Durum sadece skaler yerel değişkenlerde
+    tutulur, sonuçlar önceden ayrılmış dizilere yazılır; numba varsa döngü
+    makine koduna derlenir ve mum başına Python nesnesi oluşturulmaz.
+
+    Mum içi sıra (karamsar varsayım):
+      1. Fonlama: mum açılışında açık pozisyona uygulanır (long pozitif oranda öder)
+      2. Bekleyen giriş: MARKET açılışta (+kayma, taker); LIMIT fiyat mum aralığına girerse (maker)
+      3. Koruma emirleri: açılış boşluğu önce; aynı mumda stop ve kâr al birlikte
+         tetiklenirse önce STOP_MARKET / TRAILING_STOP_MARKET varsayılır
+      4. İz süren stopun tepe/dip değeri mum sonunda güncellenir (tetik bir sonraki mumda)
+      5. Kapanıştaki sinyal bir sonraki mum için giriş emri bekletir
+    :return: Yazılan işlem sayısı
+    """
+    n = close.shape[0]
+    cash = initial_balance
+    side = 0.0
+    entry_price = 0.0
+    entry_bar = 0
+    trade_fees = 0.0
+    trade_funding = 0.0
+    stop_price = 0.0
+    take_profit_price = 0.0
+    trail_activation = 0.0
+    trail_active = False
+    trail_extreme = 0.0
+    pending_side = 0.0
+    pending_price = 0.0
+    pending_bar = 0
+    trade_count = 0
+
+    for i in range(n):
+        bar_open = open_[i]
+
+        # 1️⃣ Fonlama
+        if side != 0.0 and funding[i] != 0.0:
+            payment = side * quantity * bar_open * funding[i]
+            cash -= payment
+            trade_funding += payment
+
+        # 2️⃣ Bekleyen giriş emri (ters pozisyon varsa önce açılışta piyasa emriyle kapatılır)
+        if pending_side != 0.0:
+            if side != 0.0 and side != pending_side:
+                exit_price = bar_open * (1.0 - side * slippage)
+                fee = quantity * exit_price * taker_fee
+                gross = side * quantity * (exit_price - entry_price)
+                cash += gross - fee
+                trades_out[trade_count, T_ENTRY_BAR] = entry_bar
+                trades_out[trade_count, T_EXIT_BAR] = i
+                trades_out[trade_count, T_SIDE] = side
+                trades_out[trade_count, T_ENTRY_PRICE] = entry_price
+                trades_out[trade_count, T_EXIT_PRICE] = exit_price
+                trades_out[trade_count, T_QUANTITY] = quantity
+                trades_out[trade_count, T_GROSS_PNL] = gross
+                trades_out[trade_count, T_FEES] = trade_fees + fee
+                trades_out[trade_count, T_FUNDING] = trade_funding
+                trades_out[trade_count, T_EXIT_REASON] = MARKET
+                trade_count += 1
+                side = 0.0
+
+            filled = False
+            fill_price = 0.0
+            fee_rate = taker_fee
+            if entry_type == MARKET:
+                fill_price = bar_open * (1.0 + pending_side * slippage)
+                filled = True
+            elif pending_side > 0.0 and low[i] <= pending_price:
+                fill_price = min(bar_open, pending_price)
+                fee_rate = maker_fee
+                filled = True
+            elif pending_side < 0.0 and high[i] >= pending_price:
+                fill_price = max(bar_open, pending_price)
+                fee_rate = maker_fee
+                filled = True
+
+            if filled:
+                side = pending_side
+                entry_price = fill_price
+                entry_bar = i
+                trade_fees = quantity * fill_price * fee_rate
+                trade_funding = 0.0
+                cash -= trade_fees
+                stop_price = fill_price * (1.0 - side * stop_loss_pct)
+                take_profit_price = fill_price * (1.0 + side * take_profit_pct)
+                trail_activation = fill_price * (1.0 + side * trailing_activation_pct)
+                trail_active = trailing_activation_pct == 0.0
+                trail_extreme = fill_price
+                pending_side = 0.0
+            elif limit_ttl > 0 and i - pending_bar >= limit_ttl:
+                pending_side = 0.0
+
+        # 3️⃣ Koruma emirleri (STOP_MARKET / TRAILING_STOP_MARKET / TAKE_PROFIT_MARKET)
+        if side != 0.0:
+            reason = -1
+            level = 0.0
+            # Boşluk referansı: giriş bu mumda dolduysa açılış değil giriş fiyatı
+            reference = entry_price if entry_bar == i else bar_open
+            if side > 0.0:
+                # Aşağı yönlü tetikler: fiyat düşerken önce en yüksek seviyeye değer
+                if stop_loss_pct > 0.0 and low[i] <= stop_price:
+                    reason = STOP_MARKET
+                    level = stop_price
+                if trailing_callback > 0.0 and trail_active:
+                    trail_stop = trail_extreme * (1.0 - trailing_callback)
+                    if low[i] <= trail_stop and (reason < 0 or trail_stop > level):
+                        reason = TRAILING_STOP_MARKET
+                        level = trail_stop
+                if reason >= 0:
+                    level = min(reference, level)
+                elif take_profit_pct > 0.0 and high[i] >= take_profit_price:
+                    reason = TAKE_PROFIT_MARKET
+                    level = max(reference, take_profit_price)
+            else:
+                if stop_loss_pct > 0.0 and high[i] >= stop_price:
+                    reason = STOP_MARKET
+                    level = stop_price
+                if trailing_callback > 0.0 and trail_active:
+                    trail_stop = trail_extreme * (1.0 + trailing_callback)
+                    if high[i] >= trail_stop and (reason < 0 or trail_stop < level):
+                        reason = TRAILING_STOP_MARKET
+                        level = trail_stop
+                if reason >= 0:
+                    level = max(reference, level)
+                elif take_profit_pct > 0.0 and low[i] <= take_profit_price:
+                    reason = TAKE_PROFIT_MARKET
+                    level = min(reference, take_profit_price)
+
+            if reason >= 0:
+                exit_price = level * (1.0 - side * slippage)
+                fee = quantity * exit_price * taker_fee
+                gross = side * quantity * (exit_price - entry_price)
+                cash += gross - fee
+                trades_out[trade_count, T_ENTRY_BAR] = entry_bar
+                trades_out[trade_count, T_EXIT_BAR] = i
+                trades_out[trade_count, T_SIDE] = side
+                trades_out[trade_count, T_ENTRY_PRICE] = entry_price
+                trades_out[trade_count, T_EXIT_PRICE] = exit_price
+                trades_out[trade_count, T_QUANTITY] = quantity
+                trades_out[trade_count, T_GROSS_PNL] = gross
+                trades_out[trade_count, T_FEES] = trade_fees + fee
+                trades_out[trade_count, T_FUNDING] = trade_funding
+                trades_out[trade_count, T_EXIT_REASON] = reason
+                trade_count += 1
+                side = 0.0
+
+        # 4️⃣ İz süren stop: aktivasyon ve tepe/dip güncellemesi
+        if side != 0.0 and trailing_callback > 0.0:
+            if side > 0.0:
+                if not trail_active and high[i] >= trail_activation:
+                    trail_active = True
+                if trail_active and high[i] > trail_extreme:
+                    trail_extreme = high[i]
+            else:
+                if not trail_active and low[i] <= trail_activation:
+                    trail_active = True
+                if trail_active and low[i] < trail_extreme:
+                    trail_extreme = low[i]
+
+        # 5️⃣ Kapanıştaki sinyal -> bir sonraki mum için giriş emri
+        decision = signal[i]
+        if decision != 0:
+            if decision != side:
+                pending_side = float(decision)
+                pending_price = close[i] * (1.0 - pending_side * limit_offset)
+                pending_bar = i
+            else:
+                pending_side = 0.0  # Aynı yönde pozisyon zaten açık; bekleyen ters emir iptal
+
+        # Mum sonu hesap değeri (gerçekleşmemiş kâr/zarar dahil)
+        equity_out[i] = cash + side * quantity * (close[i] - entry_price) if side != 0.0 else cash
+        position_out[i] = side * quantity
+
+    # Veri bitti: açık pozisyon son kapanıştan kapatılır
+    if side != 0.0 and n > 0:
+        exit_price = close[n - 1] * (1.0 - side * slippage)
+        fee = quantity * exit_price * taker_fee
+        gross = side * quantity * (exit_price - entry_price)
+        cash += gross - fee
+        trades_out[trade_count, T_ENTRY_BAR] = entry_bar
+        trades_out[trade_count, T_EXIT_BAR] = n - 1
+        trades_out[trade_count, T_SIDE] = side
+        trades_out[trade_count, T_ENTRY_PRICE] = entry_price
+        trades_out[trade_count, T_EXIT_PRICE] = exit_price
+        trades_out[trade_count, T_QUANTITY] = quantity
+        trades_out[trade_count, T_GROSS_PNL] = gross
+        trades_out[trade_count, T_FEES] = trade_fees + fee
+        trades_out[trade_count, T_FUNDING] = trade_funding
+        trades_out[trade_count, T_EXIT_REASON] = END_OF_DATA
+        trade_count += 1
+        equity_out[n - 1] = cash
+
+    return trade_count
+
+# **📌 Çekirdeği Derle (numba varsa)**
+_kernel = None
+_kernel_lock = threading.Lock()
+
+def get_kernel():
+    """
+    numba kuruluysa _simulate fonksiyonunu ilk çağrıda njit(cache=True) ile derler;
+    değilse aynı fonksiyon yorumlayıcıda çalışır (sonuçlar aynı, hız daha düşük).
+    """
+    global _kernel
+    if _kernel is None:
+        with _kernel_lock:
+            if _kernel is None:
+                if importlib.util.find_spec("numba") is not None:
+                    import numba
+                    _kernel = numba.njit(cache=True, nogil=True)(_simulate)
+                else:
+                    print("⚠️ numba bulunamadı! Backtest çekirdeği yorumlayıcıda (yavaş) çalışacak.")
+                    _kernel = _simulate
+    return _kernel
+
+def kernel_is_compiled():
+    """Çekirdeğin numba ile derlenip derlenmediği."""
+    return get_kernel() is not _simulate
+
+# **📌 Simüle Broker**
+def simulate_orders(open_, high, low, close, signal, funding=None, config=None):
+    """
+    Sinyal dizisini simüle broker ile işletir.
+    :param signal: int8 dizi (SIGNAL_LONG / SIGNAL_SHORT / SIGNAL_NONE), kapanışta verilen karar
+    :param funding: Mum açılışında uygulanacak fonlama oranları (None = fonlama yok)
+    :return: (equity, position, trades) — trades satırları TRADE_FIELDS sırasındadır
+    """
+    config = config or BrokerConfig()
+    if config.entry_type not in ("MARKET", "LIMIT"):
+        raise ValueError(f"Giriş emri MARKET veya LIMIT olmalıdır: {config.entry_type}")
+
+    columns = [np.ascontiguousarray(column, dtype=np.float64) for column in (open_, high, low, close)]
+    n = len(columns[3])
+    signal = np.ascontiguousarray(signal, dtype=np.int8)
+    funding = np.zeros(n) if funding is None else np.ascontiguousarray(funding, dtype=np.float64)
+    if len(signal) != n or len(funding) != n:
+        raise ValueError("Sinyal ve fonlama dizileri mum sayısı ile aynı uzunlukta olmalıdır.")
+
+    equity = np.empty(n, dtype=np.float64)
+    position = np.empty(n, dtype=np.float64)
+    # Her işlem en az bir sinyal gerektirir: üst sınır sıfır olmayan sinyal sayısı + 1
+    trades = np.empty((int(np.count_nonzero(signal)) + 1, len(TRADE_FIELDS)), dtype=np.float64)
+
+    count = get_kernel()(*columns, funding, signal,
+                         float(config.quantity), ORDER_TYPES.index(config.entry_type),
+                         float(config.limit_offset_pct), int(config.limit_ttl_bars),
+                         float(config.stop_loss_pct), float(config.take_profit_pct),
+                         float(config.trailing_activation_pct), float(config.trailing_callback_rate) / 100.0,
+                         float(config.taker_fee), float(config.maker_fee), float(config.slippage_bps) / 10_000.0,
+                         float(config.initial_balance), equity, position, trades)
+    return equity, position, trades[:count]
@@ -0,0 +1,90 @@
+import threading
+
+# **📌 Uygulama Bağlamı (Application Context)**
+class AppContext:
+    """
+    Pahalı nesneleri (Binance istemcisi, RL ortamı, WebSocket thread'i ...) ilk
+    kullanımda ve sadece bir kez oluşturan merkezi bağlam. Modüller içe
+    aktarıldığında ağ bağlantısı açılmaz; testler ve benchmark'lar override()
+    ile sahte nesneler yerleştirebilir.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances = {}
+        self._threads = {}
+
+    def get_or_create(self, name, factory):
+        """`name` için nesne yoksa factory() ile bir kez oluşturur ve döndürür."""
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    def get(self, name):
+        """`name` için oluşturulmuş nesneyi döndürür; yoksa oluşturmadan None."""
+        return self._instances.get(name)
+
+    def override(self, name, instance):
+        """Test/benchmark için hazır bir nesne yerleştirir."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self, name=None):
+        """Önbelleğe alınmış nesneleri (veya sadece birini) temizler."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    @property
+    def binance_transport(self):
+        """Paylaşılan, keep-alive bağlantı havuzlu Binance REST taşıma katmanı."""
+        return self.get_or_create("binance_transport", _create_binance_transport)
+
+    @property
+    def binance_client(self):
+        """Paylaşılan Binance istemcisi (oluşturulurken ağ ping'i yapar)."""
+        return self.get_or_create("binance_client", lambda: _create_binance_client(self.binance_transport))
+
+    def start_thread(self, name, target, *args):
+        """Arka plan thread'ini sadece bir kez başlatır; zaten çalışıyorsa onu döndürür."""
+        with self._lock:
+            thread = self._threads.get(name)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+                thread.start()
+                self._threads[name] = thread
+            return thread
+
+def _create_binance_transport():
+    from data_fetch.binance_transport import BinanceTransport
+
+    return BinanceTransport()
+
+def _create_binance_client(transport):
+    from binance.client import Client
+    from config.config import BINANCE_API_KEY, BINANCE_API_SECRET, BINANCE_TESTNET
+
+    client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=BINANCE_TESTNET,
+                    requests_params={"timeout": transport.timeout})
+    return transport.attach(client)
+
+_app_context = AppContext()
+
+def get_app_context():
+    """Süreç genelinde tek AppContext örneğini döndürür."""
+    return _app_context
+
+def get_binance_transport():
+    """Paylaşılan Binance REST taşıma katmanını döndürür."""
+    return _app_context.binance_transport
+
+def get_binance_client():
+    """Paylaşılan Binance istemcisini döndürür (ilk çağrıda oluşturulur)."""
+    return _app_context.binance_client
@@ -13,12 +13,19 @@ BINANCE_TESTNET = os.getenv("BINANCE_TESTNET", "True").strip().lower() == "true"
 # 📌 **Telegram API Bilgileri**
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+try:
+    TELEGRAM_QUEUE_MAXSIZE = int(os.getenv("TELEGRAM_QUEUE_MAXSIZE", 500))  # Öncelik şeridi başına
+    TELEGRAM_DIGEST_INTERVAL_SECONDS = float(os.getenv("TELEGRAM_DIGEST_INTERVAL_SECONDS", 60))
+except ValueError:
+    print("⚠️ Telegram gönderici ayarları geçersiz! Varsayılan değerler kullanılıyor.")
+    TELEGRAM_QUEUE_MAXSIZE, TELEGRAM_DIGEST_INTERVAL_SECONDS = 500, 60.0
 
 # 📌 **API Servisleri**
 CRYPTOCOMPARE_API_KEY = os.getenv("CRYPTOCOMPARE_API_KEY")
 COINMARKETCAP_API_KEY = os.getenv("COINMARKETCAP_API_KEY")
 ETHERSCAN_API_KEY = os.getenv("ETHERSCAN_API_KEY")
 SANTIMENT_API_KEY = os.getenv("SANTIMENT_API_KEY")
+CRYPTOQUANT_API_KEY = os.getenv("CRYPTOQUANT_API_KEY")
 
 # 📌 **Varsayılan İşlem Ayarları**
 try:
@@ -39,6 +46,101 @@ except ValueError:
     print("⚠️ TAKE_PROFIT_PERCENT değeri geçersiz! Varsayılan olarak 0.05 ayarlandı.")
     TAKE_PROFIT_PERCENT = 0.05
 
+# 📌 **Binance HTTP Bağlantı Havuzu Ayarları**
+try:
+    BINANCE_HTTP_POOL_CONNECTIONS = int(os.getenv("BINANCE_HTTP_POOL_CONNECTIONS", 4))
+    BINANCE_HTTP_POOL_MAXSIZE = int(os.getenv("BINANCE_HTTP_POOL_MAXSIZE", 20))
+    BINANCE_HTTP_CONNECT_TIMEOUT = float(os.getenv("BINANCE_HTTP_CONNECT_TIMEOUT", 3.05))
+    BINANCE_HTTP_READ_TIMEOUT = float(os.getenv("BINANCE_HTTP_READ_TIMEOUT", 10))
+except ValueError:
+    print("⚠️ Binance HTTP havuz ayarları geçersiz! Varsayılan değerler kullanılıyor.")
+    BINANCE_HTTP_POOL_CONNECTIONS, BINANCE_HTTP_POOL_MAXSIZE = 4, 20
+    BINANCE_HTTP_CONNECT_TIMEOUT, BINANCE_HTTP_READ_TIMEOUT = 3.05, 10.0
+
+# 📌 **Binance İstek Ağırlığı Limiti** (USDⓈ-M Futures: dakikada 2400)
+try:
+    BINANCE_WEIGHT_LIMIT_PER_MINUTE = int(os.getenv("BINANCE_WEIGHT_LIMIT_PER_MINUTE", 2400))
+except ValueError:
+    print("⚠️ BINANCE_WEIGHT_LIMIT_PER_MINUTE değeri geçersiz! Varsayılan olarak 2400 ayarlandı.")
+    BINANCE_WEIGHT_LIMIT_PER_MINUTE = 2400
+
+# 📌 **WebSocket Mesaj Hattı** (alma thread'i ile strateji işçileri arasındaki kuyruk)
+try:
+    WS_PIPELINE_WORKERS = int(os.getenv("WS_PIPELINE_WORKERS", 2))
+    WS_PIPELINE_MAXSIZE = int(os.getenv("WS_PIPELINE_MAXSIZE", 1000))
+except ValueError:
+    print("⚠️ WebSocket mesaj hattı ayarları geçersiz! Varsayılan değerler kullanılıyor.")
+    WS_PIPELINE_WORKERS, WS_PIPELINE_MAXSIZE = 2, 1000
+WS_COALESCE_MODE = os.getenv("WS_COALESCE_MODE", "latest")  # latest | bar | none
+
+# 📌 **Birleşik Akış Sembolleri** (tek bağlantı üzerinden dinlenen semboller; ilki işlem sembolüdür)
+WS_SYMBOLS = [s.strip().upper() for s in os.getenv("WS_SYMBOLS", "BTCUSDT,ETHUSDT").split(",") if s.strip()]
+try:
+    WS_MAX_STREAMS_PER_CONNECTION = int(os.getenv("WS_MAX_STREAMS_PER_CONNECTION", 200))
+except ValueError:
+    print("⚠️ WS_MAX_STREAMS_PER_CONNECTION değeri geçersiz! Varsayılan olarak 200 ayarlandı.")
+    WS_MAX_STREAMS_PER_CONNECTION = 200
+
+# 📌 **WebSocket Bağlantı Yaşam Döngüsü** (saniye)
+try:
+    WS_PING_INTERVAL_SECONDS = float(os.getenv("WS_PING_INTERVAL_SECONDS", 20))
+    WS_PING_TIMEOUT_SECONDS = float(os.getenv("WS_PING_TIMEOUT_SECONDS", 10))
+    WS_STALE_TIMEOUT_SECONDS = float(os.getenv("WS_STALE_TIMEOUT_SECONDS", 120))  # Bu süre mesaj gelmezse bağlantı yenilenir
+    WS_CONNECT_TIMEOUT_SECONDS = float(os.getenv("WS_CONNECT_TIMEOUT_SECONDS", 15))
+    WS_ROTATE_AFTER_SECONDS = float(os.getenv("WS_ROTATE_AFTER_SECONDS", 23 * 3600))  # Binance 24 saatte keser
+    WS_BACKOFF_BASE_SECONDS = float(os.getenv("WS_BACKOFF_BASE_SECONDS", 1))
+    WS_BACKOFF_MAX_SECONDS = float(os.getenv("WS_BACKOFF_MAX_SECONDS", 60))
+    WS_BACKOFF_RESET_SECONDS = float(os.getenv("WS_BACKOFF_RESET_SECONDS", 60))  # Bu kadar açık kalan bağlantıdan sonra bekleme sıfırlanır
+    WS_GAP_BACKFILL_MAX_PAGES = int(os.getenv("WS_GAP_BACKFILL_MAX_PAGES", 20))  # Kopmadan sonra REST ile tamamlanacak en fazla sayfa (1000 işlem/sayfa)
+except ValueError:
+    print("⚠️ WebSocket yaşam döngüsü ayarları geçersiz! Varsayılan değerler kullanılıyor.")
+    WS_PING_INTERVAL_SECONDS, WS_PING_TIMEOUT_SECONDS, WS_STALE_TIMEOUT_SECONDS = 20.0, 10.0, 120.0
+    WS_CONNECT_TIMEOUT_SECONDS, WS_ROTATE_AFTER_SECONDS = 15.0, 23 * 3600.0
+    WS_BACKOFF_BASE_SECONDS, WS_BACKOFF_MAX_SECONDS, WS_BACKOFF_RESET_SECONDS = 1.0, 60.0, 60.0
+    WS_GAP_BACKFILL_MAX_PAGES = 20
+
+# 📌 **Hata Yönetimi** (aynı hata bu pencere içinde tek bildirim + özet)
+ERROR_LOG_FILE = os.getenv("ERROR_LOG_FILE", "logs/error_log.txt")
+try:
+    ERROR_AGGREGATION_WINDOW_SECONDS = float(os.getenv("ERROR_AGGREGATION_WINDOW_SECONDS", 60))
+except ValueError:
+    print("⚠️ ERROR_AGGREGATION_WINDOW_SECONDS değeri geçersiz! Varsayılan olarak 60 ayarlandı.")
+    ERROR_AGGREGATION_WINDOW_SECONDS = 60.0
+
+# 📌 **Yeniden Deneme Motoru ve Devre Kesiciler**
+try:
+    RETRY_MAX_WORKERS = int(os.getenv("RETRY_MAX_WORKERS", 4))
+    CIRCUIT_BREAKER_FAILURES = int(os.getenv("CIRCUIT_BREAKER_FAILURES", 5))  # Art arda bu kadar hatada devre açılır
+    CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", 30))
+except ValueError:
+    print("⚠️ Yeniden deneme ayarları geçersiz! Varsayılan değerler kullanılıyor.")
+    RETRY_MAX_WORKERS, CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_RESET_SECONDS = 4, 5, 30.0
+
+# 📌 **Backtest Simüle Broker Varsayılanları** (USDⓈ-M Futures standart komisyonları)
+try:
+    BACKTEST_TAKER_FEE = float(os.getenv("BACKTEST_TAKER_FEE", 0.0005))
+    BACKTEST_MAKER_FEE = float(os.getenv("BACKTEST_MAKER_FEE", 0.0002))
+    BACKTEST_SLIPPAGE_BPS = float(os.getenv("BACKTEST_SLIPPAGE_BPS", 1))  # Piyasa emirlerinde aleyhe kayma
+    BACKTEST_INITIAL_BALANCE = float(os.getenv("BACKTEST_INITIAL_BALANCE", 10_000))
+except ValueError:
+    print("⚠️ Backtest ayarları geçersiz! Varsayılan değerler kullanılıyor.")
+    BACKTEST_TAKER_FEE, BACKTEST_MAKER_FEE, BACKTEST_SLIPPAGE_BPS, BACKTEST_INITIAL_BALANCE = 0.0005, 0.0002, 1.0, 10_000.0
+
+# 📌 **Geçmiş Mum Verisi Deposu** (symbol/interval/ay bölümlü kolon dosyaları)
+KLINE_DATA_DIR = os.getenv("KLINE_DATA_DIR", "data/klines")
+
+# 📌 **Etkin Stratejiler** (ağır ML kütüphaneleri sadece etkin stratejiler için yüklenir)
+# Örnek: ENABLED_STRATEGIES=lstm,rl,sentiment,garch,monte_carlo
+ENABLED_STRATEGIES = {
+    name.strip().lower()
+    for name in os.getenv("ENABLED_STRATEGIES", "lstm,rl,sentiment").split(",")
+    if name.strip()
+}
+
+def strategy_enabled(name):
+    """Stratejinin ENABLED_STRATEGIES içinde etkin olup olmadığını döndürür."""
+    return name.lower() in ENABLED_STRATEGIES
+
 # 📌 **Boş API Anahtarlarını Kontrol Et**
 missing_keys = []
 
@@ -58,4 +160,5 @@ print(f"""
 🔹 Varsayılan Kaldıraç: {DEFAULT_LEVERAGE}x
 🔹 Stop Loss: %{STOP_LOSS_PERCENT * 100}
 🔹 Take Profit: %{TAKE_PROFIT_PERCENT * 100}
+🔹 Etkin Stratejiler: {', '.join(sorted(ENABLED_STRATEGIES)) or 'Yok'}
 """)
@@ -1,4 +1,7 @@
 import requests
+from utils.lazy_import import lazy_import
+
+aiohttp = lazy_import("aiohttp")  # Sadece async fonksiyonlar kullanıldığında yüklenir
 
 COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
 
@@ -91,6 +94,47 @@ def get_trending_coins():
         print(f"⚠️ CoinGecko Trend Kripto Verisi Alınamadı: {e}")
         return None
 
+# **📌 Async Varyantlar (aiohttp)**
+async def _get_json_async(session, url, params=None, label="CoinGecko"):
+    """aiohttp oturumu ile GET isteği yapar; hata durumunda None döndürür."""
+    try:
+        async with session.get(url, params=params) as response:
+            if response.status != 200:
+                print(f"⚠️ API Hatası: {response.status}")
+                return None
+            return await response.json(content_type=None)
+    except aiohttp.ClientError as e:
+        print(f"⚠️ {label} Verisi Alınamadı: {e}")
+        return None
+
+async def get_coingecko_price_async(session, symbol="bitcoin"):
+    """get_coingecko_price fonksiyonunun async (aiohttp) varyantı."""
+    data = await _get_json_async(session, f"{COINGECKO_API_URL}/simple/price",
+                                 {"ids": symbol, "vs_currencies": "usd"}, "CoinGecko Fiyat")
+    return data.get(symbol, {}).get("usd", None) if data else None
+
+async def get_market_data_async(session, symbol="bitcoin"):
+    """get_market_data fonksiyonunun async (aiohttp) varyantı."""
+    data = await _get_json_async(session, f"{COINGECKO_API_URL}/coins/markets",
+                                 {"vs_currency": "usd", "ids": symbol, "order": "market_cap_desc"},
+                                 "CoinGecko Piyasa")
+    return data[0] if data else None
+
+async def get_historical_prices_async(session, symbol="bitcoin", days=30):
+    """get_historical_prices fonksiyonunun async (aiohttp) varyantı."""
+    data = await _get_json_async(session, f"{COINGECKO_API_URL}/coins/{symbol}/market_chart",
+                                 {"vs_currency": "usd", "days": days, "interval": "daily"},
+                                 "CoinGecko Geçmiş Fiyat")
+    return data.get("prices", None) if data else None
+
+async def get_trending_coins_async(session):
+    """get_trending_coins fonksiyonunun async (aiohttp) varyantı."""
+    data = await _get_json_async(session, f"{COINGECKO_API_URL}/search/trending", label="CoinGecko Trend Kripto")
+    if not data:
+        return None
+    trending_coins = [coin["item"]["name"] for coin in data.get("coins", [])]
+    return trending_coins if trending_coins else None
+
 # 📌 **Test Amaçlı Çalıştırma**
 if __name__ == "__main__":
     # 📌 Bitcoin fiyatını al
@@ -1,31 +1,26 @@
-import requests
-import ccxt
-from binance.client import Client
-from config.config import BINANCE_API_KEY, BINANCE_API_SECRET, BINANCE_TESTNET
-
-# 📌 **Binance API Bağlantısını Kur**
-binance_base_url = "https://testnet.binancefuture.com" if BINANCE_TESTNET else "https://fapi.binance.com"
-client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=BINANCE_TESTNET)
+import asyncio
+import json
+import time
+from config.app_context import get_binance_client, get_binance_transport
+from data_fetch.binance_transport import BINANCE_FUTURES_BASE_URL
+from data_fetch.binance_rate_limiter import request_weight, request_priority
+from data_fetch.candles import Candles
+from Websocket.order_book import find_order_book
+
+# 📌 **Binance API Adresi** (istemci ve bağlantı havuzu ilk kullanımda AppContext tarafından oluşturulur)
+binance_base_url = BINANCE_FUTURES_BASE_URL
 
 # **📌 Binance API'den OHLCV Verisi Çek**
 def get_binance_ohlcv(symbol="BTCUSDT", interval="1h", limit=100):
     """
     Binance API'den OHLCV (Açılış, Yüksek, Düşük, Kapanış, Hacim) verisi al.
+    :return: Candles (kolon tabanlı; modeller `candles.close` dizisini doğrudan kullanır)
     """
     try:
-        url = f"{binance_base_url}/fapi/v1/klines"
         params = {"symbol": symbol, "interval": interval, "limit": limit}
-        response = requests.get(url, params=params)
-        data = response.json()
-
-        if "code" in data:  # API hatası varsa
-            print(f"⚠️ Binance OHLCV Hatası: {data}")
-            return None
+        response = get_binance_transport().request("GET", "/fapi/v1/klines", params=params)
+        return Candles.from_json(response.content)  # API hatası varsa ValueError
 
-        return [{"timestamp": candle[0], "open": float(candle[1]), "high": float(candle[2]), 
-                 "low": float(candle[3]), "close": float(candle[4]), "volume": float(candle[5])} 
-                for candle in data]
-    
     except Exception as e:
         print(f"⚠️ Binance OHLCV Verisi Alınamadı: {e}")
         return None
@@ -36,10 +31,10 @@ def execute_trade(symbol, trade_type, quantity, leverage):
     Binance Futures'ta işlem açar.
     """
     try:
-        client.futures_change_leverage(symbol=symbol, leverage=leverage)
+        get_binance_client().futures_change_leverage(symbol=symbol, leverage=leverage)
         side = "BUY" if trade_type.upper() == "LONG" else "SELL"
 
-        order = client.futures_create_order(
+        order = get_binance_client().futures_create_order(
             symbol=symbol,
             side=side,
             type="MARKET",
@@ -59,7 +54,7 @@ def get_open_positions():
     Binance Futures'taki açık pozisyonları getirir.
     """
     try:
-        positions = client.futures_account().get("positions", [])
+        positions = get_binance_client().futures_account().get("positions", [])
         open_positions = [pos for pos in positions if float(pos["positionAmt"]) != 0]
         return open_positions
     
@@ -73,7 +68,7 @@ def get_binance_price(symbol="BTCUSDT"):
     Binance API'den gerçek zamanlı piyasa fiyatını alır.
     """
     try:
-        ticker = client.futures_symbol_ticker(symbol=symbol)
+        ticker = get_binance_client().futures_symbol_ticker(symbol=symbol)
         return float(ticker.get("price", 0.0))  # Hata durumunda 0.0 döndür
     
     except Exception as e:
@@ -86,7 +81,7 @@ def change_leverage(symbol, leverage):
     Binance Futures kaldıraç oranını değiştirir.
     """
     try:
-        client.futures_change_leverage(symbol=symbol, leverage=leverage)
+        get_binance_client().futures_change_leverage(symbol=symbol, leverage=leverage)
         print(f"🔧 {symbol} için Kaldıraç Değiştirildi: {leverage}x")
     
     except Exception as e:
@@ -95,10 +90,18 @@ def change_leverage(symbol, leverage):
 # **📌 Binance API'den Likidite Derinliği Çek**
 def get_market_depth(symbol="BTCUSDT", limit=10):
     """
-    Binance API'den emir defteri (order book) likidite derinliğini çeker.
+    Emir defteri (order book) likidite derinliğini döndürür. Bu sembol için
+    yerel L2 defter zaten çalışıyor ve senkronizeyse REST çağrısı yapılmaz
+    (yeni akış aboneliği açılmaz); değilse Binance API'den anlık görüntü çekilir.
+    Seviyeler REST yanıtındaki gibi [fiyat, miktar] string çiftleridir.
     """
     try:
-        depth = client.futures_order_book(symbol=symbol, limit=limit)
+        book = find_order_book(symbol)
+        if book is not None and book.synced:
+            top = book.top(limit)
+            return {side: [[str(price), str(qty)] for price, qty in levels] for side, levels in top.items()}
+
+        depth = get_binance_client().futures_order_book(symbol=symbol, limit=limit)
         return {"bids": depth.get("bids", []), "asks": depth.get("asks", [])}
     
     except Exception as e:
@@ -111,13 +114,71 @@ def get_funding_rate(symbol="BTCUSDT"):
     Binance API'den fonlama oranlarını alır.
     """
     try:
-        funding_info = client.futures_funding_rate(symbol=symbol, limit=1)
+        funding_info = get_binance_client().futures_funding_rate(symbol=symbol, limit=1)
         return float(funding_info[0].get("fundingRate", 0.0))  # Hata durumunda 0.0 döndür
     
     except Exception as e:
         print(f"⚠️ Fonlama Oranı Alınamadı: {e}")
         return None
 
+# **📌 Async Varyantlar (aiohttp)**
+async def _binance_get_async(session, path, params):
+    """
+    aiohttp ile Binance'e GET isteği yapar. İstek, senkron çağrılarla aynı
+    ağırlık limitleyicisinden izin alır; böylece async yoklama emir trafiğinin
+    kapasitesini tüketemez. Limitleyici bekletirse asyncio.sleep ile beklenir:
+    event loop bloklanmaz ve zaman aşımıyla iptal edilen istek kapasite harcamaz.
+    """
+    rate_limiter = get_binance_transport().rate_limiter
+    weight = request_weight("GET", path, params)
+    priority = request_priority("GET", path)
+    started = time.monotonic()
+    while True:
+        delay = rate_limiter.try_acquire(weight, priority, waited=time.monotonic() - started)
+        if delay <= 0:
+            break
+        await asyncio.sleep(min(delay, 1.0))
+
+    async with session.get(f"{binance_base_url}{path}", params=params) as response:
+        rate_limiter.update_from_headers(response.headers)
+        if response.status in (418, 429):
+            retry_after = response.headers.get("Retry-After")
+            rate_limiter.block(float(retry_after) if retry_after else 60.0)
+        return await response.read()
+
+async def _binance_get_json_async(session, path, params):
+    return json.loads(await _binance_get_async(session, path, params))
+
+async def get_binance_ohlcv_async(session, symbol="BTCUSDT", interval="1h", limit=100):
+    """get_binance_ohlcv fonksiyonunun async (aiohttp) varyantı."""
+    try:
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        return Candles.from_json(await _binance_get_async(session, "/fapi/v1/klines", params))
+
+    except Exception as e:
+        print(f"⚠️ Binance OHLCV Verisi Alınamadı: {e}")
+        return None
+
+async def get_binance_price_async(session, symbol="BTCUSDT"):
+    """get_binance_price fonksiyonunun async (aiohttp) varyantı."""
+    try:
+        ticker = await _binance_get_json_async(session, "/fapi/v1/ticker/price", {"symbol": symbol})
+        return float(ticker.get("price", 0.0))
+
+    except Exception as e:
+        print(f"⚠️ Binance Fiyat Verisi Alınamadı: {e}")
+        return None
+
+async def get_funding_rate_async(session, symbol="BTCUSDT"):
+    """get_funding_rate fonksiyonunun async (aiohttp) varyantı."""
+    try:
+        funding_info = await _binance_get_json_async(session, "/fapi/v1/fundingRate", {"symbol": symbol, "limit": 1})
+        return float(funding_info[0].get("fundingRate", 0.0))
+
+    except Exception as e:
+        print(f"⚠️ Fonlama Oranı Alınamadı: {e}")
+        return None
+
 # 📌 **Test Amaçlı Çalıştırma**
 if __name__ == "__main__":
     # 📌 Bitcoin fiyatını al
@@ -127,7 +188,7 @@ if __name__ == "__main__":
     # 📌 OHLCV Verilerini al
     ohlcv_data = get_binance_ohlcv("BTCUSDT", "1h", 10)
     if ohlcv_data:
-        print(f"📊 OHLCV İlk 3 Veri: {ohlcv_data[:3]}")
+        print(f"📊 OHLCV İlk 3 Veri: {ohlcv_data[:3].to_dicts()}")
 
     # 📌 Açık pozisyonları al
     positions = get_open_positions()
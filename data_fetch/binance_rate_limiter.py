@@ -0,0 +1,229 @@
+import threading
+import time
+import requests
+from urllib.parse import urlsplit
+
+# 📌 İstek öncelikleri (küçük sayı = yüksek öncelik)
+PRIORITY_ORDER = 0    # Emir açma/kapama, kaldıraç değişimi
+PRIORITY_ACCOUNT = 1  # Hesap, pozisyon, bakiye sorguları
+PRIORITY_DATA = 2     # Piyasa verisi yoklaması (klines, order book, fiyat ...)
+
+PRIORITY_NAMES = {PRIORITY_ORDER: "order", PRIORITY_ACCOUNT: "account", PRIORITY_DATA: "data"}
+
+ORDER_ENDPOINTS = {"/fapi/v1/order", "/fapi/v1/batchOrders", "/fapi/v1/allOpenOrders", "/fapi/v1/leverage",
+                   "/fapi/v1/marginType", "/fapi/v1/positionSide/dual"}
+ACCOUNT_ENDPOINTS = {"/fapi/v2/account", "/fapi/v3/account", "/fapi/v2/balance", "/fapi/v3/balance",
+                     "/fapi/v2/positionRisk", "/fapi/v3/positionRisk", "/fapi/v1/openOrders", "/fapi/v1/userTrades"}
+
+def _limit_weight(params, table, default):
+    """`limit` parametresine bağlı ağırlık tablosundan ağırlık seçer."""
+    try:
+        limit = int((params or {}).get("limit", default))
+    except (TypeError, ValueError, AttributeError):
+        limit = default
+    for max_limit, weight in table:
+        if limit <= max_limit:
+            return weight
+    return table[-1][1]
+
+# **📌 Binance Futures İstek Ağırlıkları**
+def request_weight(method, path, params=None):
+    """Binance USDⓈ-M Futures dokümantasyonundaki istek ağırlığını döndürür."""
+    if path == "/fapi/v1/klines" or path == "/fapi/v1/markPriceKlines" or path == "/fapi/v1/indexPriceKlines":
+        return _limit_weight(params, [(99, 1), (499, 2), (1000, 5), (1500, 10)], 500)
+    if path == "/fapi/v1/depth":
+        return _limit_weight(params, [(50, 2), (100, 5), (500, 10), (1000, 20)], 500)
+    if path == "/fapi/v1/aggTrades":
+        return 20
+    if path in ("/fapi/v1/ticker/price", "/fapi/v2/ticker/price", "/fapi/v1/ticker/bookTicker"):
+        return 1 if params and "symbol" in params else 2
+    if path == "/fapi/v1/ticker/24hr":
+        return 1 if params and "symbol" in params else 40
+    if path == "/fapi/v1/openOrders":
+        return 1 if params and "symbol" in params else 40
+    if path in ACCOUNT_ENDPOINTS:
+        return 5
+    return 1
+
+def request_priority(method, path):
+    """İsteğin emir, hesap veya veri trafiği olduğunu belirler."""
+    if path in ORDER_ENDPOINTS and method.upper() in ("POST", "DELETE", "PUT"):
+        return PRIORITY_ORDER
+    if path in ACCOUNT_ENDPOINTS or path in ORDER_ENDPOINTS:
+        return PRIORITY_ACCOUNT
+    return PRIORITY_DATA
+
+# **📌 Ağırlık Tabanlı Token-Bucket Limitleyici**
+class WeightRateLimiter:
+    """
+    Binance'in dakikalık istek ağırlığı limitinin altında kalmak için istekleri
+    önceden planlayan token-bucket. Veri yoklaması kapasitenin bir kısmını emir
+    trafiğine bırakmak zorundadır; bekleyen yüksek öncelikli istekler varken
+    düşük öncelikliler sıraya girer. Sunucunun `X-MBX-USED-WEIGHT-1M` başlığı
+    ile kova senkronize edilir; 429/418 yanıtlarında Retry-After kadar durulur.
+    """
+
+    def __init__(self, weight_limit_per_minute=2400, safety_margin=0.9, order_reserve=0.2,
+                 account_reserve=0.1, order_limit_per_10s=300):
+        """
+        :param safety_margin: Limitin kullanılacak oranı (sunucu saat kayması payı)
+        :param order_reserve: Veri isteklerinin dokunamayacağı, emirlere ayrılmış kapasite oranı
+        :param account_reserve: Hesap isteklerinin dokunamayacağı kapasite oranı
+        :param order_limit_per_10s: 10 saniyelik emir sayısı limiti
+        """
+        self.capacity = weight_limit_per_minute * safety_margin
+        self.refill_per_second = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.reserves = {
+            PRIORITY_ORDER: 0.0,
+            PRIORITY_ACCOUNT: self.capacity * account_reserve,
+            PRIORITY_DATA: self.capacity * order_reserve,
+        }
+        self.order_capacity = order_limit_per_10s * safety_margin
+        self.order_tokens = self.order_capacity
+        self.order_refill_per_second = self.order_capacity / 10.0
+
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.condition = threading.Condition()
+        self.waiting = {priority: 0 for priority in PRIORITY_NAMES}
+        self.metrics = {
+            "requests": {name: 0 for name in PRIORITY_NAMES.values()},
+            "waits": {name: 0 for name in PRIORITY_NAMES.values()},
+            "wait_seconds": {name: 0.0 for name in PRIORITY_NAMES.values()},
+            "throttled_responses": 0,
+            "server_used_weight": None,
+        }
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.order_tokens = min(self.order_capacity, self.order_tokens + elapsed * self.order_refill_per_second)
+            self.updated_at = now
+
+    def _delay(self, weight, priority, now):
+        """İsteğin gönderilebilmesi için beklenmesi gereken süre (0 = hemen)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if any(self.waiting[p] for p in PRIORITY_NAMES if p < priority):
+            return 0.05  # Daha yüksek öncelikli bekleyenler önce gider
+
+        missing = weight + self.reserves[priority] - self.tokens
+        delay = max(0.0, missing / self.refill_per_second)
+        if priority == PRIORITY_ORDER and self.order_tokens < 1:
+            delay = max(delay, (1 - self.order_tokens) / self.order_refill_per_second)
+        return delay
+
+    def acquire(self, weight=1, priority=PRIORITY_DATA, timeout=None):
+        """
+        Ağırlık kadar token ayırır; gerekirse (sadece bu isteği) limit açılana kadar bekletir.
+        :return: Beklenen süre (saniye)
+        :raises TimeoutError: timeout süresinde kapasite açılmazsa
+        """
+        name = PRIORITY_NAMES[priority]
+        started = time.monotonic()
+        with self.condition:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = self._delay(weight, priority, now)
+                    if delay <= 0:
+                        break
+                    if timeout is not None and now + delay - started > timeout:
+                        raise TimeoutError(f"⚠️ Binance istek limiti: {name} isteği {timeout} sn içinde planlanamadı")
+                    self.condition.wait(delay)
+            finally:
+                self.waiting[priority] -= 1
+
+            waited = time.monotonic() - started
+            self._take(weight, priority, waited)
+            return waited
+
+    def try_acquire(self, weight=1, priority=PRIORITY_DATA, waited=0.0):
+        """
+        Bloklamadan token ayırmayı dener (async çağıranlar için; iptal edilen
+        coroutine hiçbir thread'i bekletmez ve kapasite harcamaz).
+        :param waited: Çağıranın şimdiye kadar beklediği süre (metrikler için)
+        :return: 0 (token ayrıldı) veya tekrar denemeden önce beklenecek süre (saniye)
+        """
+        with self.condition:
+            now = time.monotonic()
+            self._refill(now)
+            delay = self._delay(weight, priority, now)
+            if delay > 0:
+                return delay
+            self._take(weight, priority, waited)
+            return 0.0
+
+    def _take(self, weight, priority, waited):
+        name = PRIORITY_NAMES[priority]
+        self.tokens -= weight
+        if priority == PRIORITY_ORDER:
+            self.order_tokens -= 1
+        self.metrics["requests"][name] += 1
+        if waited > 0.001:
+            self.metrics["waits"][name] += 1
+            self.metrics["wait_seconds"][name] += waited
+        self.condition.notify_all()
+
+    def update_from_headers(self, headers):
+        """Sunucunun bildirdiği kullanılmış ağırlık ile kovayı senkronize eder."""
+        used_weight = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("x-mbx-used-weight-1m")
+        if used_weight is None:
+            return
+        with self.condition:
+            used_weight = float(used_weight)
+            self.metrics["server_used_weight"] = used_weight
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, self.capacity - used_weight)
+
+    def block(self, seconds):
+        """429/418 yanıtından sonra bütün istekleri `seconds` saniye durdurur."""
+        with self.condition:
+            self.metrics["throttled_responses"] += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+            self.condition.notify_all()
+
+    def get_metrics(self):
+        with self.condition:
+            self._refill(time.monotonic())
+            return {
+                **{key: (dict(value) if isinstance(value, dict) else value) for key, value in self.metrics.items()},
+                "available_weight": round(self.tokens, 2),
+                "blocked_for": max(0.0, round(self.blocked_until - time.monotonic(), 2)),
+            }
+
+# **📌 Limitleyiciden Geçen requests Oturumu**
+class RateLimitedSession(requests.Session):
+    """
+    Her isteği göndermeden önce ağırlığını ve önceliğini belirleyip limitleyiciden
+    izin alan oturum. python-binance Client dahil bütün Binance REST çağrıları
+    bu oturumu paylaşır.
+    """
+
+    def __init__(self, rate_limiter):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def request(self, method, url, *args, weight=None, priority=None, **kwargs):
+        path = urlsplit(url).path
+        params = kwargs.get("params")
+        params = params if isinstance(params, dict) else None
+        if weight is None:
+            weight = request_weight(method, path, params)
+        if priority is None:
+            priority = request_priority(method, path)
+
+        self.rate_limiter.acquire(weight, priority)
+        response = super().request(method, url, *args, **kwargs)
+
+        self.rate_limiter.update_from_headers(response.headers)
+        if response.status_code in (418, 429):
+            retry_after = response.headers.get("Retry-After")
+            self.rate_limiter.block(float(retry_after) if retry_after else 60.0)
+            print(f"🚨 Binance istek limiti aşıldı ({response.status_code}), {retry_after or 60} sn bekleniyor.")
+        return response
@@ -0,0 +1,172 @@
+import bisect
+import threading
+import time
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from config.config import (BINANCE_TESTNET, BINANCE_HTTP_POOL_CONNECTIONS, BINANCE_HTTP_POOL_MAXSIZE,
+                           BINANCE_HTTP_CONNECT_TIMEOUT, BINANCE_HTTP_READ_TIMEOUT,
+                           BINANCE_WEIGHT_LIMIT_PER_MINUTE)
+from data_fetch.binance_rate_limiter import WeightRateLimiter, RateLimitedSession
+
+# 📌 **Binance Futures REST Adresi**
+BINANCE_FUTURES_BASE_URL = "https://testnet.binancefuture.com" if BINANCE_TESTNET else "https://fapi.binance.com"
+
+# 📌 Gecikme histogramı kova sınırları (milisaniye)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# **📌 Uç Nokta Başına Gecikme Histogramı**
+class LatencyHistogram:
+    """Sabit kovalı gecikme histogramı (kova sayaçları + toplam + en büyük değer)."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def quantile(self, q):
+        """Kantilin düştüğü kovanın üst sınırını döndürür (yaklaşık)."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip([f"<={b}ms" for b in LATENCY_BUCKETS_MS] + ["inf"], self.counts)),
+        }
+
+# **📌 Paylaşılan, Havuzlu (Keep-Alive) Binance REST Taşıma Katmanı**
+class BinanceTransport:
+    """
+    Bütün Binance REST çağrıları için tek bir requests.Session ve bağlantı havuzu.
+    Bağlantılar keep-alive ile tekrar kullanılır; böylece her çağrıda yeni bir
+    TCP+TLS el sıkışması yapılmaz. Her uç nokta için gecikme histogramı tutulur.
+    Bütün istekler ağırlık tabanlı limitleyiciden (WeightRateLimiter) geçer.
+    """
+
+    def __init__(self, base_url=BINANCE_FUTURES_BASE_URL, pool_connections=BINANCE_HTTP_POOL_CONNECTIONS,
+                 pool_maxsize=BINANCE_HTTP_POOL_MAXSIZE, connect_timeout=BINANCE_HTTP_CONNECT_TIMEOUT,
+                 read_timeout=BINANCE_HTTP_READ_TIMEOUT, rate_limiter=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate_limiter = rate_limiter or WeightRateLimiter(BINANCE_WEIGHT_LIMIT_PER_MINUTE)
+        self.session = self._create_session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.hooks["response"].append(self._record_latency)
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def _create_session(self):
+        return RateLimitedSession(self.rate_limiter)
+
+    def _record_latency(self, response, *args, **kwargs):
+        endpoint = f"{response.request.method} {urlsplit(response.request.url).path}"
+        latency_ms = response.elapsed.total_seconds() * 1000
+        with self.lock:
+            histogram = self.histograms.get(endpoint)
+            if histogram is None:
+                histogram = self.histograms[endpoint] = LatencyHistogram()
+            histogram.observe(latency_ms)
+
+    def request(self, method, path, **kwargs):
+        """
+        Binance'e istek gönderir. `path` tam URL değilse base_url'e eklenir.
+        Varsayılan (bağlantı, okuma) zaman aşımları uygulanır. Ağırlık ve öncelik
+        otomatik belirlenir; `weight=` / `priority=` ile elle verilebilir.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get_json(self, path, params=None, **kwargs):
+        return self.request("GET", path, params=params, **kwargs).json()
+
+    def attach(self, client):
+        """
+        python-binance Client'ının kendi oturumu yerine bu havuzu kullanmasını sağlar.
+        İstemcinin başlıkları (API anahtarı dahil) paylaşılan oturuma taşınır.
+        """
+        self.session.headers.update(client.session.headers)
+        client.session = self.session
+        return client
+
+    def latency_report(self):
+        """{uç nokta: histogram özeti} sözlüğü döndürür."""
+        with self.lock:
+            return {endpoint: histogram.snapshot() for endpoint, histogram in self.histograms.items()}
+
+    def close(self):
+        self.session.close()
+
+# 📌 **Doğrudan çalıştırılırsa yerel sunucu ile keep-alive benchmark'ı yapılır**
+if __name__ == "__main__":
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    connections = {"count": 0}
+    payload = json.dumps([[1700000000000, "50000", "50100", "49900", "50050", "12.5"]] * 100).encode()
+
+    class KlineHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive desteği
+        disable_nagle_algorithm = True  # Başlık ve gövde ayrı paketlerde gecikmesin
+
+        def setup(self):
+            connections["count"] += 1
+            super().setup()
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KlineHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    iterations = 500
+
+    connections["count"] = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        requests.get(f"{base_url}/fapi/v1/klines", params={"symbol": "BTCUSDT"}).json()
+    bare_seconds = time.perf_counter() - started
+    bare_connections = connections["count"]
+
+    # Sadece bağlantı maliyeti ölçülsün diye limitleyici pratikte sınırsız ayarlanır
+    transport = BinanceTransport(base_url=base_url, rate_limiter=WeightRateLimiter(10 ** 9))
+    connections["count"] = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        transport.get_json("/fapi/v1/klines", params={"symbol": "BTCUSDT"})
+    pooled_seconds = time.perf_counter() - started
+
+    print(f"🐢 requests.get: {bare_seconds / iterations * 1000:.3f} ms/istek | {bare_connections} bağlantı")
+    print(f"⚡ BinanceTransport: {pooled_seconds / iterations * 1000:.3f} ms/istek | {connections['count']} bağlantı")
+    print(f"📊 Gecikme histogramı: {transport.latency_report()}")
+    server.shutdown()
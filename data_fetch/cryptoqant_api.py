@@ -1,5 +1,8 @@
 import requests
 from config.config import CRYPTOQUANT_API_KEY
+from utils.lazy_import import lazy_import
+
+aiohttp = lazy_import("aiohttp")  # Sadece async fonksiyonlar kullanıldığında yüklenir
 
 CRYPTOQUANT_API_URL = "https://api.cryptoquant.com/v1"
 
@@ -55,6 +58,44 @@ def get_onchain_indicators(symbol="BTC"):
     data = get_cryptoquant_data("onchain-indicators", symbol)
     return data if data else "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin."
 
+# **📌 Async Varyantlar (aiohttp)**
+async def get_cryptoquant_data_async(session, endpoint, symbol="BTC"):
+    """get_cryptoquant_data fonksiyonunun async (aiohttp) varyantı."""
+    if not CRYPTOQUANT_API_KEY:
+        print("⚠️ API Anahtarı Eksik! Lütfen .env dosyanızı kontrol edin.")
+        return None
+
+    url = f"{CRYPTOQUANT_API_URL}/{endpoint}"
+    headers = {"Authorization": f"Bearer {CRYPTOQUANT_API_KEY}"}
+
+    try:
+        async with session.get(url, params={"symbol": symbol}, headers=headers) as response:
+            if response.status != 200:
+                print(f"⚠️ API Hatası: {response.status} - {await response.text()}")
+                return None
+
+            data = await response.json(content_type=None)
+            return data.get("data", None)
+
+    except aiohttp.ClientError as e:
+        print(f"⚠️ API Bağlantı Hatası: {e}")
+        return None
+
+async def get_whale_transactions_async(session, symbol="BTC"):
+    """get_whale_transactions fonksiyonunun async varyantı."""
+    data = await get_cryptoquant_data_async(session, "whale-transactions", symbol)
+    return data if data else "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin."
+
+async def get_exchange_flows_async(session, symbol="BTC"):
+    """get_exchange_flows fonksiyonunun async varyantı."""
+    data = await get_cryptoquant_data_async(session, "exchange-flows", symbol)
+    return data if data else "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin."
+
+async def get_onchain_indicators_async(session, symbol="BTC"):
+    """get_onchain_indicators fonksiyonunun async varyantı."""
+    data = await get_cryptoquant_data_async(session, "onchain-indicators", symbol)
+    return data if data else "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin."
+
 # 📌 **Test Amaçlı Çalıştırma**
 if __name__ == "__main__":
     # 📌 Balina İşlemlerini Al
@@ -0,0 +1,252 @@
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from config.config import KLINE_DATA_DIR
+from config.app_context import get_binance_transport
+from notifications.telegram_bot import send_telegram_message
+
+# 📌 Binance mum aralıklarının milisaniye karşılıkları
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "8h": 28_800_000,
+    "12h": 43_200_000, "1d": 86_400_000,
+}
+
+# 📌 /fapi/v1/klines yanıtındaki kolonlar ve disk üzerindeki veri tipleri
+KLINE_COLUMNS = {
+    "open_time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "close_time": np.int64,
+    "quote_volume": np.float64,
+    "trades": np.int64,
+    "taker_buy_base": np.float64,
+    "taker_buy_quote": np.float64,
+}
+
+MAX_KLINES_PER_REQUEST = 1500  # Binance Futures sayfa sınırı (ağırlık 10)
+
+# **📌 Yanıtı Kolonlara Dönüştür**
+def parse_klines(rows):
+    """Binance kline satırlarını {kolon: np.ndarray} sözlüğüne dönüştürür."""
+    if not rows:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in KLINE_COLUMNS.items()}
+    raw = np.array([row[:len(KLINE_COLUMNS)] for row in rows], dtype=object)
+    return {name: raw[:, index].astype(dtype) for index, (name, dtype) in enumerate(KLINE_COLUMNS.items())}
+
+def concat_columns(parts):
+    """Kolon sözlüklerini uç uca ekler."""
+    parts = [part for part in parts if len(part["open_time"])]
+    if not parts:
+        return parse_klines([])
+    return {name: np.concatenate([part[name] for part in parts]) for name in KLINE_COLUMNS}
+
+# **📌 symbol/interval/ay Bölümlü Kolon Deposu**
+class KlinePartitionStore:
+    """
+    Mumları <root>/<SYMBOL>/<interval>/<YYYY-MM>/<kolon>.npy düzeninde saklar.
+    Her kolon ayrı bir NumPy dosyasıdır; np.load(mmap_mode="r") ile kopyalanmadan
+    okunabilir. Bir ay bölümü her zaman bütün olarak yeni bir klasöre yazılıp
+    yerine taşınır; yarıda kesilen bir yazma mevcut veriyi bozmaz.
+    """
+
+    def __init__(self, root=KLINE_DATA_DIR):
+        self.root = root
+
+    def series_dir(self, symbol, interval):
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def partition_dir(self, symbol, interval, month):
+        return os.path.join(self.series_dir(symbol, interval), month)
+
+    def _recover(self, path):
+        """Yer değiştirme sırasında kesilmiş bir yazmadan kalan eski bölümü geri yükler."""
+        backup = f"{path}.old"
+        if not os.path.isdir(path) and os.path.isdir(backup):
+            os.replace(backup, path)
+
+    def list_months(self, symbol, interval):
+        """Diskteki ay bölümlerini sıralı döndürür."""
+        series_dir = self.series_dir(symbol, interval)
+        if not os.path.isdir(series_dir):
+            return []
+        for name in os.listdir(series_dir):
+            if name.endswith(".old"):
+                self._recover(os.path.join(series_dir, name[:-len(".old")]))
+        return sorted(name for name in os.listdir(series_dir)
+                      if len(name) == 7 and os.path.isdir(os.path.join(series_dir, name)))
+
+    def load_partition(self, symbol, interval, month, mmap_mode="r"):
+        """Bir ay bölümünü {kolon: dizi} olarak (varsayılan: salt okunur mmap) yükler."""
+        path = self.partition_dir(symbol, interval, month)
+        self._recover(path)
+        return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in KLINE_COLUMNS}
+
+    def load(self, symbol, interval, start_time=None, end_time=None):
+        """Bütün (veya [start_time, end_time) aralığındaki) ayları tek kolon dizilerinde birleştirir."""
+        parts = []
+        for month in self.list_months(symbol, interval):
+            part = self.load_partition(symbol, interval, month)
+            open_time = part["open_time"]
+            lo = np.searchsorted(open_time, start_time) if start_time is not None else 0
+            hi = np.searchsorted(open_time, end_time) if end_time is not None else len(open_time)
+            if hi > lo:
+                parts.append({name: part[name][lo:hi] for name in KLINE_COLUMNS})
+        return concat_columns(parts)
+
+    def last_open_time(self, symbol, interval):
+        """Diskteki en son mumun açılış zamanı (yoksa None)."""
+        months = self.list_months(symbol, interval)
+        if not months:
+            return None
+        open_time = np.load(os.path.join(self.partition_dir(symbol, interval, months[-1]), "open_time.npy"),
+                            mmap_mode="r")
+        return int(open_time[-1]) if len(open_time) else None
+
+    def write_partition(self, symbol, interval, month, columns):
+        """
+        Yeni mumları ay bölümüne birleştirir (open_time'a göre sıralı, tekrarsız)
+        ve bölümü atomik olarak yeniden yazar.
+        """
+        path = self.partition_dir(symbol, interval, month)
+        if os.path.isdir(path) or os.path.isdir(f"{path}.old"):
+            existing = self.load_partition(symbol, interval, month, mmap_mode=None)
+            columns = concat_columns([existing, columns])
+
+        # Aynı açılış zamanına sahip mumlarda en son çekilen kazanır
+        order = np.argsort(columns["open_time"], kind="stable")[::-1]
+        _, first = np.unique(columns["open_time"][order], return_index=True)
+        keep = order[first]
+        columns = {name: np.ascontiguousarray(columns[name][keep]) for name in KLINE_COLUMNS}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_path)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+
+        if os.path.isdir(path):
+            os.replace(path, f"{path}.old")
+        os.replace(tmp_path, path)
+        shutil.rmtree(f"{path}.old", ignore_errors=True)
+        return len(columns["open_time"])
+
+# **📌 Tek Sayfa Mum Çek**
+def fetch_klines_page(symbol, interval, start_time, end_time, limit=MAX_KLINES_PER_REQUEST, transport=None):
+    """[start_time, end_time] aralığındaki en fazla `limit` mumu çeker (ağırlık limitleyicisinden geçer)."""
+    transport = transport or get_binance_transport()
+    params = {"symbol": symbol, "interval": interval, "startTime": int(start_time),
+              "endTime": int(end_time), "limit": limit}
+    data = transport.get_json("/fapi/v1/klines", params=params)
+    if isinstance(data, dict):  # {"code": ..., "msg": ...}
+        raise RuntimeError(f"Binance kline hatası: {data}")
+    return data
+
+def page_windows(start_time, end_time, interval_ms, limit=MAX_KLINES_PER_REQUEST):
+    """[start_time, end_time) aralığını sayfa başına `limit` mumluk pencerelere böler."""
+    span = interval_ms * limit
+    return [(page_start, min(page_start + span, end_time) - 1)
+            for page_start in range(int(start_time), int(end_time), span)]
+
+# **📌 Eksik Geçmişi Eşzamanlı Sayfalayarak İndir**
+def backfill_klines(symbol="BTCUSDT", interval="1h", start_time=None, end_time=None, history_days=365,
+                    max_workers=4, store=None, transport=None):
+    """
+    Diskteki son mumdan (yoksa `start_time` / `history_days` gün öncesinden)
+    itibaren kapanmış bütün mumları indirir. Sayfalar `max_workers` thread ile
+    eşzamanlı çekilir; paylaşılan taşıma katmanının ağırlık limitleyicisi
+    istek hızını Binance limitinin altında tutar. Her grup sırayla diske
+    yazılır; kesilen bir indirme bir sonraki çalıştırmada kaldığı yerden devam eder.
+
+    :return: {"symbol", "interval", "rows", "pages", "failed_pages", "months", "start_time", "end_time", "seconds"}
+    """
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Desteklenmeyen mum aralığı: {interval}")
+    interval_ms = INTERVAL_MS[interval]
+    store = store or KlinePartitionStore()
+    transport = transport or get_binance_transport()
+    now_ms = int(time.time() * 1000)
+
+    last_open_time = store.last_open_time(symbol, interval)
+    if last_open_time is not None:
+        start_time = last_open_time + interval_ms  # Sadece eksik kuyruk çekilir
+    elif start_time is None:
+        start_time = now_ms - history_days * 86_400_000
+    start_time = start_time // interval_ms * interval_ms
+    end_time = min(end_time or now_ms, now_ms) // interval_ms * interval_ms  # Açık mum hariç
+
+    report = {"symbol": symbol, "interval": interval, "rows": 0, "pages": 0, "failed_pages": 0,
+              "months": set(), "start_time": start_time, "end_time": end_time, "seconds": 0.0}
+    windows = page_windows(start_time, end_time, interval_ms)
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kline-backfill") as executor:
+        batch_size = max_workers * 4
+        for batch_start in range(0, len(windows), batch_size):
+            batch = windows[batch_start:batch_start + batch_size]
+            futures = [executor.submit(fetch_klines_page, symbol, interval, page_start, page_end,
+                                       MAX_KLINES_PER_REQUEST, transport)
+                       for page_start, page_end in batch]
+
+            # Sadece kesintisiz başarılı önek yazılır; böylece diskte boşluk oluşmaz
+            pages = []
+            for future in futures:
+                try:
+                    pages.append(parse_klines(future.result()))
+                except Exception as e:
+                    report["failed_pages"] += 1
+                    print(f"⚠️ {symbol} {interval} mum sayfası alınamadı: {e}")
+                    break
+
+            columns = concat_columns(pages)
+            closed = columns["close_time"] < now_ms
+            columns = {name: values[closed] for name, values in columns.items()}
+            if len(columns["open_time"]):
+                months = columns["open_time"].astype("datetime64[ms]").astype("datetime64[M]")
+                for month in np.unique(months):
+                    mask = months == month
+                    store.write_partition(symbol, interval, str(month),
+                                          {name: values[mask] for name, values in columns.items()})
+                    report["months"].add(str(month))
+            report["rows"] += len(columns["open_time"])
+            report["pages"] += len(pages)
+
+            if report["failed_pages"]:
+                for future in futures:
+                    future.cancel()
+                send_telegram_message(f"⚠️ {symbol} {interval} geçmiş indirmesi yarıda kaldı; "
+                                      f"sonraki çalıştırmada devam edilecek.")
+                break
+
+    report["months"] = sorted(report["months"])
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    return report
+
+def load_klines(symbol="BTCUSDT", interval="1h", start_time=None, end_time=None, store=None):
+    """Diskteki mumları {kolon: np.ndarray} olarak döndürür."""
+    return (store or KlinePartitionStore()).load(symbol, interval, start_time, end_time)
+
+# 📌 **Doğrudan çalıştırılırsa geçmiş indirilir**
+# Kullanım: python -m data_fetch.kline_backfill BTCUSDT ETHUSDT --interval 1h --days 365 --workers 4
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Binance Futures geçmiş mum indirici")
+    parser.add_argument("symbols", nargs="*", default=["BTCUSDT"])
+    parser.add_argument("--interval", default="1h", choices=sorted(INTERVAL_MS))
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    for symbol in args.symbols:
+        result = backfill_klines(symbol, args.interval, history_days=args.days, max_workers=args.workers)
+        print(f"📥 {symbol} {args.interval}: {result['rows']} mum, {result['pages']} sayfa, "
+              f"{len(result['months'])} ay, {result['seconds']} sn"
+              + (f" | ⚠️ {result['failed_pages']} başarısız sayfa" if result["failed_pages"] else ""))
+    print(f"📊 İstek limitleyici: {get_binance_transport().rate_limiter.get_metrics()}")
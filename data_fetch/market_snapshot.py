@@ -0,0 +1,110 @@
+import asyncio
+import time
+import aiohttp
+from data_fetch.binance_api import get_binance_price_async, get_binance_ohlcv_async, get_funding_rate_async
+from data_fetch.CoinGecko_api import get_coingecko_price_async, get_market_data_async
+from data_fetch.cryptoqant_api import get_cryptoquant_data_async
+from data_fetch.santiment_api import get_social_sentiment_async, get_whale_transactions_async
+
+# 📌 Kaynak başına zaman aşımı (saniye); yavaş bir API bütün anlık görüntüyü bekletmez
+DEFAULT_SOURCE_TIMEOUTS = {
+    "binance_price": 2.0,
+    "binance_ohlcv": 3.0,
+    "binance_funding_rate": 3.0,
+    "coingecko_price": 5.0,
+    "coingecko_market": 5.0,
+    "cryptoquant_exchange_flows": 8.0,
+    "santiment_social_sentiment": 8.0,
+    "santiment_whale_transactions": 8.0,
+}
+
+# 📌 Eşzamanlı açık bağlantı sınırı (bütün kaynaklar için toplam)
+SNAPSHOT_CONNECTION_LIMIT = 20
+
+def _source_coroutines(session, symbol, coin_id, interval, limit):
+    """{kaynak adı: coroutine} sözlüğü oluşturur."""
+    base_asset = symbol.replace("USDT", "")
+    return {
+        "binance_price": get_binance_price_async(session, symbol),
+        "binance_ohlcv": get_binance_ohlcv_async(session, symbol, interval, limit),
+        "binance_funding_rate": get_funding_rate_async(session, symbol),
+        "coingecko_price": get_coingecko_price_async(session, coin_id),
+        "coingecko_market": get_market_data_async(session, coin_id),
+        "cryptoquant_exchange_flows": get_cryptoquant_data_async(session, "exchange-flows", base_asset),
+        "santiment_social_sentiment": get_social_sentiment_async(session, coin_id),
+        "santiment_whale_transactions": get_whale_transactions_async(session, coin_id),
+    }
+
+async def _timed(name, coroutine, timeout):
+    """Kaynağı zaman aşımı ile çalıştırır; (ad, sonuç, hata, gecikme_ms) döndürür."""
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(coroutine, timeout)
+        error = None if result is not None else "veri yok"
+    except asyncio.TimeoutError:
+        result, error = None, f"zaman aşımı ({timeout} sn)"
+    except Exception as e:
+        result, error = None, f"{type(e).__name__}: {e}"
+    return name, result, error, (time.perf_counter() - started) * 1000
+
+# **📌 Bütün Piyasa Verilerini Eşzamanlı Çek**
+async def fetch_market_snapshot_async(symbol="BTCUSDT", coin_id="bitcoin", interval="1h", limit=100,
+                                      sources=None, timeouts=None, session=None):
+    """
+    Binance, CoinGecko, CryptoQuant ve Santiment verilerini tek bir event loop
+    üzerinde eşzamanlı çeker. Toplam süre en yavaş kaynak kadardır (toplamları
+    değil). Zaman aşımına uğrayan veya hata veren kaynaklar anlık görüntüyü
+    düşürmez; kısmi sonuç döner ve hata `errors` altında raporlanır.
+
+    :param sources: Çekilecek kaynak adları (None = hepsi)
+    :param timeouts: Kaynak başına zaman aşımı (DEFAULT_SOURCE_TIMEOUTS'u ezer)
+    :param session: Tekrar kullanılacak aiohttp.ClientSession (keep-alive için)
+    :return: {"data": {...}, "errors": {...}, "latency_ms": {...}, "total_ms": float}
+    """
+    timeouts = {**DEFAULT_SOURCE_TIMEOUTS, **(timeouts or {})}
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=SNAPSHOT_CONNECTION_LIMIT))
+
+    started = time.perf_counter()
+    try:
+        coroutines = _source_coroutines(session, symbol, coin_id, interval, limit)
+        selected = set(sources) if sources is not None else set(coroutines)
+        tasks = []
+        for name, coroutine in coroutines.items():
+            if name in selected:
+                tasks.append(_timed(name, coroutine, timeouts.get(name, 10.0)))
+            else:
+                coroutine.close()  # Başlatılmayan coroutine için uyarı üretilmesin
+        results = await asyncio.gather(*tasks)
+    finally:
+        if own_session:
+            await session.close()
+
+    snapshot = {"data": {}, "errors": {}, "latency_ms": {}, "total_ms": (time.perf_counter() - started) * 1000}
+    for name, result, error, latency_ms in results:
+        snapshot["latency_ms"][name] = round(latency_ms, 2)
+        if error is None:
+            snapshot["data"][name] = result
+        else:
+            snapshot["errors"][name] = error
+    return snapshot
+
+def fetch_market_snapshot(symbol="BTCUSDT", coin_id="bitcoin", interval="1h", limit=100, sources=None, timeouts=None):
+    """
+    Senkron kod (örn. main.py döngüsü) için fetch_market_snapshot_async sarmalayıcısı.
+    Çalışan bir event loop içinden çağrılmamalıdır; orada async sürümü await edilir.
+    """
+    return asyncio.run(fetch_market_snapshot_async(symbol, coin_id, interval, limit, sources, timeouts))
+
+# 📌 **Doğrudan çalıştırılırsa anlık görüntü alınır ve sıralı çekim ile karşılaştırılır**
+if __name__ == "__main__":
+    snapshot = fetch_market_snapshot("BTCUSDT", "bitcoin")
+    sequential_ms = sum(snapshot["latency_ms"].values())
+
+    print(f"✅ Gelen kaynaklar: {', '.join(snapshot['data']) or '-'}")
+    for name, error in snapshot["errors"].items():
+        print(f"⚠️ {name}: {error}")
+    for name, latency_ms in sorted(snapshot["latency_ms"].items(), key=lambda item: item[1], reverse=True):
+        print(f"   {latency_ms:9.1f} ms  {name}")
+    print(f"⚡ Eşzamanlı toplam: {snapshot['total_ms']:.1f} ms | Sıralı çekim tahmini: {sequential_ms:.1f} ms")
@@ -0,0 +1,203 @@
+import os
+import shutil
+import threading
+import uuid
+import numpy as np
+from config.config import KLINE_DATA_DIR
+from data_fetch.kline_backfill import KLINE_COLUMNS, KlinePartitionStore, parse_klines
+
+CONSOLIDATED_DIR = "all"  # Bütün ayların tek parça kolon dosyaları
+
+# **📌 Kopyasız OHLCV Görünümü**
+class OHLCVView:
+    """
+    Bellek eşlemli (mmap) kolon dizileri üzerinde salt okunur görünüm.
+    Zaman aralığı ve kuyruk kesitleri yeni dizi kopyalamaz; aynı sayfa
+    önbelleğini paylaşan NumPy görünümleri döndürür. Kolonlara
+    `view.close` veya `view["close"]` ile erişilir.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["open_time"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __getattr__(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def _slice(self, lo, hi):
+        return OHLCVView({name: values[lo:hi] for name, values in self.columns.items()})
+
+    def between(self, start_time=None, end_time=None):
+        """[start_time, end_time) aralığındaki mumlar (ikili arama, kopyasız)."""
+        open_time = self.columns["open_time"]
+        lo = int(np.searchsorted(open_time, start_time)) if start_time is not None else 0
+        hi = int(np.searchsorted(open_time, end_time)) if end_time is not None else len(open_time)
+        return self._slice(lo, max(lo, hi))
+
+    def tail(self, count):
+        """Son `count` mum (kopyasız)."""
+        return self._slice(max(0, len(self) - count), len(self))
+
+# **📌 Bellek Eşlemli OHLCV Deposu**
+class OHLCVStore:
+    """
+    Ay bölümlerini (bkz. kline_backfill) sembol/aralık başına tek parça
+    kolon dosyalarında birleştirir ve bunları np.load(mmap_mode="r") ile açar.
+    Eğitici, risk motoru ve canlı döngü aynı dosyaları eşlediğinde geçmiş veri
+    işletim sisteminin sayfa önbelleğinde tek kopya olarak paylaşılır.
+    """
+
+    def __init__(self, root=KLINE_DATA_DIR, partition_store=None):
+        self.partitions = partition_store or KlinePartitionStore(root)
+        self.lock = threading.Lock()
+        self.views = {}  # (symbol, interval) -> (dosya mtime, OHLCVView)
+
+    def consolidated_dir(self, symbol, interval):
+        return os.path.join(self.partitions.series_dir(symbol, interval), CONSOLIDATED_DIR)
+
+    def _consolidated_last_open_time(self, path):
+        try:
+            open_time = np.load(os.path.join(path, "open_time.npy"), mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+        return int(open_time[-1]) if len(open_time) else None
+
+    def consolidate(self, symbol, interval, force=False):
+        """
+        Ay bölümlerini tek parça kolon dosyalarına yazar (bölümlerde yeni mum
+        yoksa bir şey yapmaz). Dosyalar geçici klasöre yazılıp atomik olarak
+        yerine taşınır; açık mmap'ler eski dosyaları okumaya devam eder.
+        :return: Birleştirilmiş mum sayısı veya (güncelse) None
+        """
+        path = self.consolidated_dir(symbol, interval)
+        latest = self.partitions.last_open_time(symbol, interval)
+        if latest is None:
+            return None
+        if not force and self._consolidated_last_open_time(path) == latest:
+            return None
+
+        columns = self.partitions.load(symbol, interval)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_path)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(values))
+
+        if os.path.isdir(path):
+            os.replace(path, f"{path}.old")
+        os.replace(tmp_path, path)
+        shutil.rmtree(f"{path}.old", ignore_errors=True)
+        return len(columns["open_time"])
+
+    def open(self, symbol="BTCUSDT", interval="1h", refresh=True):
+        """
+        Sembolün bütün geçmişini mmap olarak açar. Aynı süreçte tekrar çağrıldığında
+        dosya değişmediyse aynı görünüm döndürülür.
+        :param refresh: Önce ay bölümlerindeki yeni mumları birleştir
+        """
+        if refresh:
+            self.consolidate(symbol, interval)
+        path = self.consolidated_dir(symbol, interval)
+        mtime = os.stat(os.path.join(path, "open_time.npy")).st_mtime_ns
+
+        key = (symbol.upper(), interval)
+        with self.lock:
+            cached = self.views.get(key)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            view = OHLCVView({name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                              for name in KLINE_COLUMNS})
+            self.views[key] = (mtime, view)
+            return view
+
+_default_store = None
+
+def get_ohlcv_store():
+    """Süreç genelinde paylaşılan OHLCVStore örneği."""
+    global _default_store
+    if _default_store is None:
+        _default_store = OHLCVStore()
+    return _default_store
+
+def load_close_prices(symbol="BTCUSDT", interval="1h", start_time=None, end_time=None, last=None):
+    """
+    Modeller için kapanış fiyatlarını float64 mmap görünümü olarak döndürür.
+    train_lstm_model, train_garch_model, monte_carlo_* ve calculate_* bu diziyi
+    kopyalamadan kullanır.
+    """
+    view = get_ohlcv_store().open(symbol, interval).between(start_time, end_time)
+    if last is not None:
+        view = view.tail(last)
+    return view.close
+
+# 📌 **Doğrudan çalıştırılırsa yükleme süresi ve bellek (RSS) karşılaştırması yapılır**
+# Kullanım: python -m data_fetch.ohlcv_store [mum_sayısı]
+if __name__ == "__main__":
+    import json
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        import resource
+
+        mode, root = sys.argv[2], sys.argv[3]
+        started = time.perf_counter()
+        if mode == "dicts":
+            # Eski get_binance_ohlcv ile aynı: her mum için bir sözlük, sonra kapanış listesi
+            with open(os.path.join(root, "klines.json")) as file:
+                rows = json.load(file)
+            candles = [{"timestamp": c[0], "open": float(c[1]), "high": float(c[2]),
+                        "low": float(c[3]), "close": float(c[4]), "volume": float(c[5])} for c in rows]
+            closes = np.array([candle["close"] for candle in candles])
+        else:
+            closes = OHLCVStore(root).open("BTCUSDT", "1m", refresh=False).close
+        last_year_mean = float(np.mean(closes[-525_600:]))
+        seconds = time.perf_counter() - started
+        # ru_maxrss Linux'ta fork eden ebeveynin tepe değerini de içerir; VmHWM sadece bu süreci ölçer
+        try:
+            with open("/proc/self/status") as status:
+                rss_mb = next(int(line.split()[1]) for line in status if line.startswith("VmHWM")) / 1024
+        except (OSError, StopIteration):
+            rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(json.dumps({"seconds": seconds, "rss_mb": rss_mb, "mean": last_year_mean}))
+        sys.exit(0)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    root = tempfile.mkdtemp(prefix="ohlcv-bench-")
+    rng = np.random.default_rng(0)
+    open_time = 1_600_000_000_000 + np.arange(count, dtype=np.int64) * 60_000
+    close = 50_000 * np.exp(np.cumsum(rng.normal(0, 0.0005, count)))
+    rows = [[int(t), f"{c:.2f}", f"{c * 1.001:.2f}", f"{c * 0.999:.2f}", f"{c:.2f}", "12.5",
+             int(t) + 59_999, "625000.0", 100, "6.2", "310000.0", "0"] for t, c in zip(open_time, close)]
+
+    with open(os.path.join(root, "klines.json"), "w") as file:
+        json.dump(rows, file)
+    partitions = KlinePartitionStore(root)
+    months = open_time.astype("datetime64[ms]").astype("datetime64[M]")
+    for month in np.unique(months):
+        index = np.flatnonzero(months == month)
+        partitions.write_partition("BTCUSDT", "1m", str(month), parse_klines(rows[index[0]:index[-1] + 1]))
+    OHLCVStore(root).consolidate("BTCUSDT", "1m")
+    del rows
+
+    results = {}
+    for mode in ("dicts", "mmap"):
+        output = subprocess.run([sys.executable, "-m", "data_fetch.ohlcv_store", "--child", mode, root],
+                                capture_output=True, text=True, check=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"📦 {count} mum")
+    print(f"🐢 list-of-dicts: {results['dicts']['seconds'] * 1000:.1f} ms | RSS {results['dicts']['rss_mb']:.1f} MB")
+    print(f"⚡ mmap görünüm : {results['mmap']['seconds'] * 1000:.1f} ms | RSS {results['mmap']['rss_mb']:.1f} MB")
+    shutil.rmtree(root, ignore_errors=True)
@@ -1,6 +1,9 @@
 import requests
 import datetime
 from config.config import SANTIMENT_API_KEY
+from utils.lazy_import import lazy_import
+
+aiohttp = lazy_import("aiohttp")  # Sadece async fonksiyonlar kullanıldığında yüklenir
 
 SANTIMENT_API_URL = "https://api.santiment.net/graphql"
 
@@ -30,11 +33,8 @@ def get_santiment_data(query):
         print(f"⚠️ API Bağlantı Hatası: {e}")
         return None
 
-# **📌 Santiment API ile Büyük Kripto İşlemlerini Takip Et**
-def get_whale_transactions(symbol="bitcoin"):
-    """
-    Santiment API ile büyük kripto işlemlerini takip et.
-    """
+def build_whale_transactions_query(symbol="bitcoin"):
+    """Büyük kripto işlemleri için son 7 günlük GraphQL sorgusunu oluşturur."""
     from_date = (datetime.datetime.utcnow() - datetime.timedelta(days=7)).isoformat()
     to_date = datetime.datetime.utcnow().isoformat()
 
@@ -53,15 +53,20 @@ def get_whale_transactions(symbol="bitcoin"):
         }}
         """
     }
+    return query
+
+# **📌 Santiment API ile Büyük Kripto İşlemlerini Takip Et**
+def get_whale_transactions(symbol="bitcoin"):
+    """
+    Santiment API ile büyük kripto işlemlerini takip et.
+    """
+    query = build_whale_transactions_query(symbol)
 
     data = get_santiment_data(query)
     return data.get("whaleTransactions", "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin.") if data else None
 
-# **📌 Santiment API ile Sosyal Medya Duyarlılığını Ölç**
-def get_social_sentiment(symbol="bitcoin"):
-    """
-    Santiment API ile sosyal medya duyarlılığını ölç.
-    """
+def build_social_sentiment_query(symbol="bitcoin"):
+    """Sosyal medya duyarlılığı için son 7 günlük GraphQL sorgusunu oluşturur."""
     from_date = (datetime.datetime.utcnow() - datetime.timedelta(days=7)).isoformat()
     to_date = datetime.datetime.utcnow().isoformat()
 
@@ -81,15 +86,20 @@ def get_social_sentiment(symbol="bitcoin"):
         }}
         """
     }
+    return query
+
+# **📌 Santiment API ile Sosyal Medya Duyarlılığını Ölç**
+def get_social_sentiment(symbol="bitcoin"):
+    """
+    Santiment API ile sosyal medya duyarlılığını ölç.
+    """
+    query = build_social_sentiment_query(symbol)
 
     data = get_santiment_data(query)
     return data.get("sentimentVolumeConsumed", "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin.") if data else None
 
-# **📌 Santiment API ile Borsalara Giriş-Çıkış Verilerini Takip Et**
-def get_exchange_flows(symbol="bitcoin"):
-    """
-    Santiment API ile borsalara giriş-çıkış verilerini takip et.
-    """
+def build_exchange_flows_query(symbol="bitcoin"):
+    """Borsalara giriş-çıkış için son 7 günlük GraphQL sorgusunu oluşturur."""
     from_date = (datetime.datetime.utcnow() - datetime.timedelta(days=7)).isoformat()
     to_date = datetime.datetime.utcnow().isoformat()
 
@@ -109,10 +119,55 @@ def get_exchange_flows(symbol="bitcoin"):
         }}
         """
     }
+    return query
+
+# **📌 Santiment API ile Borsalara Giriş-Çıkış Verilerini Takip Et**
+def get_exchange_flows(symbol="bitcoin"):
+    """
+    Santiment API ile borsalara giriş-çıkış verilerini takip et.
+    """
+    query = build_exchange_flows_query(symbol)
 
     data = get_santiment_data(query)
     return data.get("exchangeFundsFlow", "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin.") if data else None
 
+# **📌 Async Varyantlar (aiohttp)**
+async def get_santiment_data_async(session, query):
+    """get_santiment_data fonksiyonunun async (aiohttp) varyantı."""
+    if not SANTIMENT_API_KEY:
+        print("⚠️ API Anahtarı Eksik! Lütfen .env dosyanızı kontrol edin.")
+        return None
+
+    headers = {"Authorization": f"Bearer {SANTIMENT_API_KEY}"}
+
+    try:
+        async with session.post(SANTIMENT_API_URL, json=query, headers=headers) as response:
+            if response.status != 200:
+                print(f"⚠️ API Hatası: {response.status} - {await response.text()}")
+                return None
+
+            data = await response.json(content_type=None)
+            return data.get("data", None)
+
+    except aiohttp.ClientError as e:
+        print(f"⚠️ API Bağlantı Hatası: {e}")
+        return None
+
+async def get_whale_transactions_async(session, symbol="bitcoin"):
+    """get_whale_transactions fonksiyonunun async varyantı."""
+    data = await get_santiment_data_async(session, build_whale_transactions_query(symbol))
+    return data.get("whaleTransactions", "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin.") if data else None
+
+async def get_social_sentiment_async(session, symbol="bitcoin"):
+    """get_social_sentiment fonksiyonunun async varyantı."""
+    data = await get_santiment_data_async(session, build_social_sentiment_query(symbol))
+    return data.get("sentimentVolumeConsumed", "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin.") if data else None
+
+async def get_exchange_flows_async(session, symbol="bitcoin"):
+    """get_exchange_flows fonksiyonunun async varyantı."""
+    data = await get_santiment_data_async(session, build_exchange_flows_query(symbol))
+    return data.get("exchangeFundsFlow", "⚠️ Veri çekilemedi, API anahtarınızı kontrol edin.") if data else None
+
 # 📌 **Test Amaçlı Çalıştırma**
 if __name__ == "__main__":
     # 📌 Balina İşlemlerini Al
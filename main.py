@@ -1,10 +1,6 @@
-import threading
 import numpy as np
-from websocket.websocket_handler import start_websocket
+from websocket.websocket_handler import start_websocket_thread
 from data_fetch.binance_api import get_binance_ta
-from ai_models.lstm_model import train_lstm_model, predict_price_lstm
-from ai_models.reinforcement_trading import reinforcement_trade
-from ai_models.sentiment_analysis import get_news_sentiment
 from risk_management.stop_loss import calculate_stop_loss
 from risk_management.take_profit import calculate_take_profit
 from risk_management.leverage_manager import dynamic_leverage
@@ -12,13 +8,13 @@ from risk_management.hedging_strategies import optimized_hedging
 from trading.binance_futures import execute_trade_safe
 from notifications.telegram_bot import send_telegram_message
 from error_handler import handle_error
+from config.config import strategy_enabled
 
 if __name__ == "__main__":
     print("🚀 AI Destekli Binance Futures Botu Başlatılıyor...")
 
     # WebSocket işlemini başlat
-    ws_thread = threading.Thread(target=start_websocket, daemon=True)
-    ws_thread.start()
+    ws_thread = start_websocket_thread()
 
     try:
         # 📌 Binance API'den piyasa verilerini al
@@ -30,23 +26,39 @@ if __name__ == "__main__":
         market_volatility = np.random.uniform(0.01, 0.05)  # Simüle edilen volatilite
 
         # 📌 AI destekli fiyat tahmini
+        predicted_price = None
         try:
-            lstm_model, lstm_scaler = train_lstm_model(prices)
-            predicted_price = predict_price_lstm(lstm_model, lstm_scaler, prices[-60:])
+            # TensorFlow sadece LSTM stratejisi etkinse içe aktarılır
+            if strategy_enabled("lstm"):
+                from ai_models.lstm_model import get_or_train_lstm_model, LSTMPredictor
+
+                # Veri değişmediyse kayıtlı model yüklenir, değiştiyse fine-tune edilir
+                lstm_model, lstm_scaler, lstm_status = get_or_train_lstm_model(prices)
+                print(f"🧠 LSTM modeli hazır ({lstm_status})")
+                lstm_predictor = LSTMPredictor(lstm_model, lstm_scaler)
+                lstm_predictor.extend(prices)
+                predicted_price = lstm_predictor.predict()
         except Exception as e:
             predicted_price = None
             print(f"⚠️ LSTM fiyat tahmini başarısız: {str(e)}")
 
         # 📌 AI destekli piyasa analizi (Reinforcement Learning)
+        ai_trade_decision = "NEUTRAL"
         try:
-            ai_trade_decision = reinforcement_trade()
+            # stable-baselines3 / torch sadece RL stratejisi etkinse içe aktarılır
+            if strategy_enabled("rl"):
+                from ai_models.reinforcement_trading import reinforcement_trade
+                ai_trade_decision = reinforcement_trade()
         except Exception as e:
             ai_trade_decision = "NEUTRAL"
             print(f"⚠️ AI trade kararı alınamadı: {str(e)}")
 
         # 📌 Piyasa duyarlılığı analizi (Sentiment Analysis)
+        sentiment = "UNKNOWN"
         try:
-            sentiment = get_news_sentiment()
+            if strategy_enabled("sentiment"):
+                from ai_models.sentiment_analysis import get_news_sentiment
+                sentiment = get_news_sentiment()
         except Exception as e:
             sentiment = "UNKNOWN"
             print(f"⚠️ Sentiment analizi alınamadı: {str(e)}")
@@ -1,77 +1,219 @@
-import traceback
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import threading
 import time
-from datetime import datetime
-from notifications.telegram_bot import send_telegram_error_alert, send_telegram_message
+import traceback
+from config.config import ERROR_LOG_FILE, ERROR_AGGREGATION_WINDOW_SECONDS
+from notifications.telegram_bot import send_telegram_message, PRIORITY_CRITICAL
+from notifications.telegram_dispatcher import get_telegram_dispatcher
 
 # Hata loglarını saklamak için dosya belirleme
-LOG_FILE = "logs/error_log.txt"
+LOG_FILE = ERROR_LOG_FILE
+
+logger = logging.getLogger("trading_bot.errors")
+_log_listener = None
+_log_setup_lock = threading.Lock()
+
+def _setup_logging():
+    """
+    Kuyruklu loglama: çağıran thread sadece QueueHandler'a kayıt bırakır;
+    QueueListener thread'i kalıcı (her çağrıda yeniden açılmayan), tamponlu
+    döner dosyaya yazar. İlk hatada kurulur.
+    """
+    global _log_listener
+    with _log_setup_lock:
+        if _log_listener is not None:
+            return
+        os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=10 * 2 ** 20, backupCount=5,
+                                                            encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s",
+                                                    datefmt="%Y-%m-%d %H:%M:%S"))
+        log_queue = queue.Queue(-1)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)  # Kuyrukta kalan kayıtlar kapanışta diske yazılır
+
+# **📌 Parmak İzi ile Hata Birleştirme**
+class ErrorAggregator:
+    """
+    Aynı hata tipi + aynı konum (fonksiyon ve hatanın oluştuğu satır) bir
+    pencere içinde tek hata sayılır: ilk olay tam olarak loglanıp bildirilir,
+    tekrarlar sadece sayılır. Pencere bitince tekrar sayısı tek bir özet
+    kaydı / bildirimi olarak gönderilir.
+    """
+
+    def __init__(self, window_seconds=ERROR_AGGREGATION_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.lock = threading.Lock()
+        self.entries = {}  # parmak izi -> {"first_seen", "count", "suppressed", "message", "function_name"}
+        self.metrics = {"errors": 0, "unique": 0, "suppressed": 0, "summaries": 0}
+        self.thread = None
+
+    @staticmethod
+    def fingerprint(exception, function_name=""):
+        """(hata tipi, fonksiyon, hatanın oluştuğu dosya:satır)"""
+        frames = traceback.extract_tb(exception.__traceback__) if exception.__traceback__ else None
+        location = f"{os.path.basename(frames[-1].filename)}:{frames[-1].lineno}" if frames else ""
+        return f"{type(exception).__name__}@{function_name}@{location}"
+
+    def record(self, exception, function_name=""):
+        """
+        :return: (parmak izi, pencerede ilk olay mı, penceredeki olay sayısı)
+        """
+        key = self.fingerprint(exception, function_name)
+        now = time.monotonic()
+        summary = None
+        with self.lock:
+            self.metrics["errors"] += 1
+            entry = self.entries.get(key)
+            if entry is not None and now - entry["first_seen"] >= self.window_seconds:
+                summary = self._close_window(key, entry)
+                entry = None
+            if entry is None:
+                entry = self.entries[key] = {"first_seen": now, "count": 1, "suppressed": 0,
+                                             "message": str(exception), "function_name": function_name}
+                self.metrics["unique"] += 1
+                is_first = True
+            else:
+                entry["count"] += 1
+                entry["suppressed"] += 1
+                entry["message"] = str(exception)
+                self.metrics["suppressed"] += 1
+                is_first = False
+            count = entry["count"]
+        self._ensure_flusher()
+        if summary is not None:
+            _report_summary(*summary)
+        return key, is_first, count
 
-# Logger yapılandırması
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.ERROR,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+    def _close_window(self, key, entry):
+        del self.entries[key]
+        if entry["suppressed"] == 0:
+            return None
+        self.metrics["summaries"] += 1
+        return key, entry, self.window_seconds
+
+    def flush(self, force=False):
+        """Süresi dolan pencerelerin tekrar özetlerini gönderir."""
+        now = time.monotonic()
+        with self.lock:
+            summaries = [self._close_window(key, entry) for key, entry in list(self.entries.items())
+                         if force or now - entry["first_seen"] >= self.window_seconds]
+        for summary in summaries:
+            if summary is not None:
+                _report_summary(*summary)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(max(1.0, self.window_seconds / 4))
+            self.flush()
+
+    def _ensure_flusher(self):
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._flush_loop, name="error-aggregator", daemon=True)
+                    self.thread.start()
+                    # atexit ters sırada çalışır: son özetler, log dinleyicisi ve Telegram
+                    # göndericisi durdurulmadan önce yazılsın diye kayıt onlardan sonra yapılır
+                    _setup_logging()
+                    get_telegram_dispatcher()
+                    atexit.register(self.flush, True)
+
+    def get_stats(self):
+        with self.lock:
+            return {**self.metrics, "open_windows": {key: entry["count"] for key, entry in self.entries.items()}}
+
+_aggregator = ErrorAggregator()
+
+def _report_summary(key, entry, window_seconds):
+    """Pencere boyunca bastırılan tekrarları tek kayıt + tek bildirim olarak raporlar."""
+    _setup_logging()
+    message = (f"{entry['function_name']}: aynı hata son {window_seconds:.0f} sn içinde "
+               f"{entry['count']} kez oluştu (son: {entry['message']})")
+    logger.error(f"REPEATED [{key}] {message}")
+    send_telegram_message(f"🔁 Tekrarlayan Hata: {message}", priority=PRIORITY_CRITICAL, key=f"error-summary:{key}")
+
+def get_error_stats():
+    """Hata birleştirme metrikleri (toplam, benzersiz, bastırılan, açık pencereler)."""
+    return _aggregator.get_stats()
 
 def log_error(exception, function_name=""):
     """
-    ⚠️ Hataları log dosyasına ve terminale detaylı şekilde kaydeder.
+    ⚠️ Hataları log dosyasına ve terminale detaylı şekilde kaydeder ve Telegram'a bildirir.
+    Aynı parmak izli tekrarlar pencere boyunca sadece sayılır (bkz. ErrorAggregator).
+    :return: Pencerede ilk olaysa True
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    error_trace = traceback.format_exc()
-    formatted_error = f"{timestamp} - ERROR in {function_name}:\n{str(exception)}\n{error_trace}\n"
+    key, is_first, count = _aggregator.record(exception, function_name)
+    if not is_first:
+        return False
+
+    _setup_logging()
+    error_trace = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+    formatted_error = f"ERROR in {function_name} [{key}]:\n{str(exception)}\n{error_trace}"
 
-    # Hata logunu kaydet
-    with open(LOG_FILE, "a") as log_file:
-        log_file.write(formatted_error)
+    # Hata logunu kaydet (dosyaya yazma QueueListener thread'inde yapılır)
+    logger.error(formatted_error)
 
     # Hata logunu terminale yazdır
     print(formatted_error)
 
-    # Logları Telegram'a gönderme seçeneği
-    send_telegram_message(f"🚨 Hata Tespit Edildi: {function_name}\n{str(exception)}")
+    # Hata bildirimi (arka plan göndericisi; çağıranı bloklamaz)
+    send_telegram_message(f"🚨 <b>{function_name} Hatası:</b>\n{str(exception)}", priority=PRIORITY_CRITICAL,
+                          key=f"error:{key}")
+    return True
 
 def handle_error(exception, function_name=""):
     """
-    ⚠️ Hataları yönetir, log dosyasına kaydeder ve Telegram bildirimi gönderir.
+    ⚠️ Hataları yönetir, log dosyasına kaydeder ve Telegram bildirimi gönderir
+    (hata başına tek bildirim; tekrarlar özetlenir).
     """
-    log_error(exception, function_name)
-
-    # Telegram hata bildirimini gönder
-    send_telegram_error_alert(f"🚨 {function_name} Hatası:\n{str(exception)}")
-
-    # Hata çözüm mekanizmasını tetikle
-    auto_fix_error(exception, function_name)
+    # Hata çözüm mekanizması sadece penceredeki ilk olayda tetiklenir (tekrarlar özetlenir)
+    if log_error(exception, function_name):
+        auto_fix_error(exception, function_name)
 
 def auto_fix_error(exception, function_name):
     """
-    🤖 AI destekli hata düzeltme mekanizması.
-    - Yetersiz bakiye hatasında kaldıraç düşürerek işlemi tekrar dener.
-    - Bağlantı hatalarında işlemi tekrar dener.
-    - API sınırına ulaşıldığında bekleyerek tekrar dener.
-    - Tekrar eden hatalarda işlemi durdurur.
+    🤖 Hata sınıfına göre kurtarma önerisi / bildirimi (çağıran thread'i asla uyutmaz).
+    - RetryEngine üzerinden gönderilmiş istekler (exception.retry_attempts): geçici
+      hatalar motorda zaten jitter'lı bekleme ile yeniden denenmiş ve etkilenen
+      sembol/uç nokta devre kesiciyle duraklatılmıştır; burada tekrar denenmez.
+    - Yetersiz bakiye: otomatik yeni emir açılmaz (önceki kör market emri kaldırıldı); bildirim yapılır.
+    - Diğer hatalar (motordan geçmeyen çağrılar dahil): manuel müdahale bildirimi.
+    :return: Hata sınıfı (bkz. trading.retry_engine.RETRY_POLICIES)
     """
-    error_message = str(exception).lower()
+    from trading.retry_engine import (classify_error, RETRY_POLICIES, ERROR_INSUFFICIENT_BALANCE,
+                                      ERROR_RATE_LIMIT)
+
+    category = classify_error(exception)
+    policy = RETRY_POLICIES[category]
 
-    if "insufficient balance" in error_message:
-        send_telegram_message("💡 Çözüm: Kaldıraç düşürülerek işlem tekrar deneniyor...")
-        from trading.binance_futures import execute_trade
-        execute_trade(symbol="BTCUSDT", trade_type="LONG", quantity=0.005, leverage=2)
+    if category == ERROR_INSUFFICIENT_BALANCE:
+        send_telegram_message(f"💡 {function_name}: yetersiz bakiye/marjin. Yeni emir açılmadı; "
+                              f"kaldıraç veya pozisyon büyüklüğü azaltılmalı.", priority=PRIORITY_CRITICAL,
+                              key=f"autofix:{category}")
 
-    elif "network issue" in error_message or "connection" in error_message:
-        send_telegram_message("🔄 Ağ bağlantı sorunu tespit edildi, işlem tekrar edilecek...")
-        time.sleep(10)  # 10 saniye bekleyip tekrar dene
-        return
+    elif category == ERROR_RATE_LIMIT:
+        # 429/418 yanıtları WeightRateLimiter tarafından zaten işlenir; sonraki
+        # Binance istekleri Retry-After süresine göre planlanır, burada uyunmaz.
+        send_telegram_message("⏳ API sınırı aşıldı, istekler limitleyici tarafından yavaşlatılıyor...",
+                              key=f"autofix:{category}")
 
-    elif "rate limit" in error_message:
-        send_telegram_message("⏳ API sınırı aşıldı, 60 saniye bekleniyor...")
-        time.sleep(60)  # 60 saniye bekleyip tekrar dene
-        return
+    elif policy.retry and getattr(exception, "retry_attempts", None) is not None:
+        send_telegram_message(f"🔄 {function_name}: geçici hata ({category}) yeniden deneme motorunda "
+                              f"{exception.retry_attempts} denemeden sonra da sürdü; devre kesiciler etkilenen "
+                              f"sembolü duraklatıyor.", key=f"autofix:{category}")
 
     else:
-        send_telegram_message(f"🚨 {function_name} için bilinmeyen hata, manuel müdahale gerekebilir.")
+        send_telegram_message(f"🚨 {function_name} için kurtarılamayan hata ({category}), manuel müdahale gerekebilir.",
+                              priority=PRIORITY_CRITICAL, key=f"autofix:{category}:{function_name}")
         print(f"⚠️ Manuel müdahale gerekebilir: {function_name}")
 
-    print(f"⚠️ Hata Yönetimi: {function_name} için hata çözümlendi veya işlem tekrar edilecek.")
+    return category
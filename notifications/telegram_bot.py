@@ -1,21 +1,13 @@
-import requests
-from config.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from notifications.telegram_dispatcher import (get_telegram_dispatcher, PRIORITY_CRITICAL, PRIORITY_TRADE,
+                                               PRIORITY_INFO, PRIORITY_DIGEST)
 
-TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-
-def send_telegram_message(message):
+def send_telegram_message(message, priority=PRIORITY_INFO, key=None):
     """
-    📢 Telegram API ile mesaj gönderir.
+    📢 Mesajı arka plandaki Telegram göndericisine bırakır (çağıranı bloklamaz).
+    :param priority: PRIORITY_CRITICAL / PRIORITY_TRADE / PRIORITY_INFO / PRIORITY_DIGEST
+    :param key: Aynı anahtarla kuyrukta bekleyen mesaj varsa en yenisiyle birleştirilir
     """
-    try:
-        data = {"chat_id": TELEGRAM_CHAT_ID, "text": message, "parse_mode": "HTML"}
-        response = requests.post(TELEGRAM_API_URL, data=data)
-
-        if response.status_code != 200:
-            print(f"⚠️ Telegram mesajı gönderilemedi: {response.text}")
-
-    except requests.exceptions.RequestException as e:
-        print(f"⚠️ Telegram bağlantı hatası: {str(e)}")
+    get_telegram_dispatcher().submit(message, priority=priority, key=key)
 
 
 def send_telegram_trade_alert(symbol, trade_type, quantity, leverage, price, stop_loss, take_profit):
@@ -32,7 +24,7 @@ def send_telegram_trade_alert(symbol, trade_type, quantity, leverage, price, sto
         f"🛑 <b>Stop-Loss:</b> {stop_loss} USDT\n"
         f"🎯 <b>Take-Profit:</b> {take_profit} USDT"
     )
-    send_telegram_message(message)
+    send_telegram_message(message, priority=PRIORITY_TRADE)
 
 
 def send_telegram_error_alert(error_message):
@@ -40,7 +32,7 @@ def send_telegram_error_alert(error_message):
     ⚠️ Bot hata aldığında Telegram'a bildirim gönderir.
     """
     message = f"⚠️ <b>BOT HATASI:</b>\n{error_message}"
-    send_telegram_message(message)
+    send_telegram_message(message, priority=PRIORITY_CRITICAL)
 
 
 def send_telegram_confirmation_request(action_type):
@@ -115,3 +107,6 @@ if __name__ == "__main__":
 
     # 📌 Haftalık rapor testi
     send_telegram_weekly_report(profit=1500, loss=800, trade_count=25)
+
+    # 📌 Kuyruktaki mesajların gönderilmesini bekle
+    get_telegram_dispatcher().flush(timeout=15)
@@ -0,0 +1,375 @@
+import atexit
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from config.config import (TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_QUEUE_MAXSIZE,
+                           TELEGRAM_DIGEST_INTERVAL_SECONDS)
+from utils.lazy_import import lazy_import
+
+requests = lazy_import("requests")
+
+TELEGRAM_API_BASE_URL = "https://api.telegram.org"
+
+# 📌 Öncelik şeritleri (küçük sayı önce gönderilir)
+PRIORITY_CRITICAL = 0  # Hatalar, acil uyarılar
+PRIORITY_TRADE = 1     # Emir / dolum bildirimleri
+PRIORITY_INFO = 2      # Genel bilgi mesajları
+PRIORITY_DIGEST = 3    # Sık tekrarlanan bilgi (kaldıraç, sinyal ...): özet mesajda toplanır
+
+PRIORITY_NAMES = {PRIORITY_CRITICAL: "critical", PRIORITY_TRADE: "trade", PRIORITY_INFO: "info",
+                  PRIORITY_DIGEST: "digest"}
+
+# 📌 Telegram sınırları: bot başına ~30 mesaj/sn, özel sohbet ~1 mesaj/sn, grup 20 mesaj/dk
+GLOBAL_MESSAGES_PER_SECOND = 30.0
+CHAT_MESSAGES_PER_SECOND = 1.0
+GROUP_MESSAGES_PER_SECOND = 20 / 60
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+class _TokenBucket:
+    """Basit jeton kovası (saniyede `rate` jeton, en fazla `burst`)."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated_at", "blocked_until")
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0  # 429 retry_after süresince gönderim yok
+
+    def wait_time(self, now):
+        """Bir jeton için beklenecek süre (0: hemen gönderilebilir)."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+# **📌 Arka Plan Telegram Gönderici**
+class TelegramDispatcher:
+    """
+    send_telegram_message çağıranı bloklamaz: mesaj öncelik şeridine eklenir ve
+    tek bir arka plan thread'i Telegram'a gönderir.
+
+    - Öncelik şeritleri: critical > trade > info; hatalar ve dolumlar kuyrukta
+      bekleyen bilgi mesajlarının önüne geçer.
+    - Birleştirme: aynı `key` ile kuyrukta bekleyen mesaj en yenisiyle değiştirilir
+      (ör. her işlemde gönderilen durum mesajları).
+    - Özet: PRIORITY_DIGEST mesajları `digest_interval` saniye toplanıp tek mesaj olarak gider.
+    - Hız sınırı: sohbet başına ve bot geneli jeton kovaları; 429 yanıtında
+      retry_after süresince o sohbete gönderim durur.
+    - Şerit doluysa en eski mesaj atılır ve sayılır (çağıran asla beklemez).
+    """
+
+    def __init__(self, bot_token=TELEGRAM_BOT_TOKEN, default_chat_id=TELEGRAM_CHAT_ID,
+                 api_base_url=TELEGRAM_API_BASE_URL, maxsize=TELEGRAM_QUEUE_MAXSIZE,
+                 digest_interval=TELEGRAM_DIGEST_INTERVAL_SECONDS, rate_limit=True, max_retries=3,
+                 timeout=(3.05, 10)):
+        self.api_url = f"{api_base_url}/bot{bot_token}/sendMessage"
+        self.default_chat_id = default_chat_id
+        self.digest_interval = digest_interval
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.lanes = {priority: OrderedDict() for priority in (PRIORITY_CRITICAL, PRIORITY_TRADE, PRIORITY_INFO)}
+        self.lane_maxsize = maxsize
+        self.digests = {}  # chat_id -> (ilk mesaj zamanı, OrderedDict(key -> [metin, adet]))
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.global_bucket = _TokenBucket(GLOBAL_MESSAGES_PER_SECOND, GLOBAL_MESSAGES_PER_SECOND)
+        self.chat_buckets = {}
+        self.session = None
+        self.thread = None
+        self.running = False
+        self.sending = 0  # Gönderilmekte olan mesaj (flush için)
+        self.metrics = {"submitted": 0, "sent": 0, "failed": 0, "retries": 0, "rate_limited": 0,
+                        "coalesced": 0, "digested": 0, "digests_sent": 0,
+                        "dropped": {name: 0 for name in PRIORITY_NAMES.values()}}
+
+    # 📌 Çağıran tarafı (bloklamaz)
+    def submit(self, text, priority=PRIORITY_INFO, key=None, chat_id=None, parse_mode="HTML"):
+        """Mesajı kuyruğa bırakır; O(1), ağ çağrısı yapmaz."""
+        chat_id = chat_id or self.default_chat_id
+        with self.condition:
+            self.metrics["submitted"] += 1
+            if priority == PRIORITY_DIGEST:
+                self._add_to_digest(chat_id, text, key)
+            else:
+                lane = self.lanes.get(priority, self.lanes[PRIORITY_INFO])
+                lane_key = (chat_id, key) if key is not None else (chat_id, next(self.sequence))
+                pending = lane.get(lane_key)
+                if pending is not None:
+                    # Sırası korunur, içerik en yeni mesajla değiştirilir
+                    pending["text"] = text
+                    pending["count"] += 1
+                    self.metrics["coalesced"] += 1
+                else:
+                    if len(lane) >= self.lane_maxsize:
+                        lane.popitem(last=False)
+                        self.metrics["dropped"][PRIORITY_NAMES[priority]] += 1
+                    lane[lane_key] = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode, "count": 1,
+                                      "attempts": 0}
+            self.condition.notify()
+
+    def _add_to_digest(self, chat_id, text, key):
+        started_at, lines = self.digests.get(chat_id, (time.monotonic(), OrderedDict()))
+        line = lines.get(key if key is not None else text)
+        if line is not None:
+            line[0] = text
+            line[1] += 1
+        elif len(lines) >= self.lane_maxsize:
+            self.metrics["dropped"]["digest"] += 1
+        else:
+            lines[key if key is not None else text] = [text, 1]
+        self.metrics["digested"] += 1
+        self.digests[chat_id] = (started_at, lines)
+
+    # 📌 Gönderici thread'i
+    def _flush_due_digests(self, now, force=False):
+        """Süresi dolan özetleri info şeridine tek mesaj olarak taşır."""
+        for chat_id, (started_at, lines) in list(self.digests.items()):
+            if not force and now - started_at < self.digest_interval:
+                continue
+            del self.digests[chat_id]
+            body = "\n".join(text if count == 1 else f"{text} (×{count})" for text, count in lines.values())
+            text = f"🗒️ <b>Özet ({len(lines)} bildirim)</b>\n{body}"
+            if len(text) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                text = text[:TELEGRAM_MAX_MESSAGE_LENGTH - 20] + "\n… (kısaltıldı)"
+            self.lanes[PRIORITY_INFO][(chat_id, next(self.sequence))] = {
+                "chat_id": chat_id, "text": text, "parse_mode": "HTML", "count": 1, "attempts": 0}
+            self.metrics["digests_sent"] += 1
+
+    def _chat_bucket(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            is_group = str(chat_id).startswith("-")
+            rate = GROUP_MESSAGES_PER_SECOND if is_group else CHAT_MESSAGES_PER_SECOND
+            bucket = self.chat_buckets[chat_id] = _TokenBucket(rate, 3 if not is_group else 5)
+        return bucket
+
+    def _next_message(self, now):
+        """
+        Gönderilebilecek en yüksek öncelikli mesajı kuyruktan alır.
+        :return: (öncelik, anahtar, mesaj) veya (None, bekleme süresi)
+        """
+        wait = None
+        for priority, lane in self.lanes.items():
+            for lane_key, item in lane.items():
+                if not self.rate_limit:
+                    del lane[lane_key]
+                    return priority, lane_key, item
+                delay = max(self._chat_bucket(item["chat_id"]).wait_time(now), self.global_bucket.wait_time(now))
+                if delay == 0.0:
+                    self._chat_bucket(item["chat_id"]).take()
+                    self.global_bucket.take()
+                    del lane[lane_key]
+                    return priority, lane_key, item
+                wait = delay if wait is None else min(wait, delay)
+                break  # Şerit içinde sıra korunur; baş mesaj bekliyorsa sonraki şerit denenir
+        return None, wait
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while True:
+                    now = time.monotonic()
+                    self._flush_due_digests(now, force=not self.running)
+                    result = self._next_message(now)
+                    if result[0] is not None:
+                        priority, lane_key, item = result
+                        self.sending += 1
+                        break
+                    if not self.running and not any(self.lanes.values()):
+                        return
+                    wait = result[1]
+                    if self.digests:
+                        earliest = min(started_at for started_at, _ in self.digests.values())
+                        digest_wait = max(0.0, earliest + self.digest_interval - now)
+                        wait = digest_wait if wait is None else min(wait, digest_wait)
+                    self.condition.wait(wait if wait is not None else 1.0)
+
+            retry_after = self._send(item)
+            with self.condition:
+                self.sending -= 1
+                if retry_after is not None:
+                    item["attempts"] += 1
+                    if item["attempts"] <= self.max_retries:
+                        # Başa geri koy; sohbet retry_after süresince beklesin
+                        lane = self.lanes[priority]
+                        newer = lane.get(lane_key)
+                        if newer is not None:
+                            # Gönderim sırasında aynı anahtarla daha yeni mesaj geldi: yeni metin korunur
+                            newer["count"] += item["count"]
+                            newer["attempts"] = max(newer["attempts"], item["attempts"])
+                        else:
+                            lane[lane_key] = item
+                        lane.move_to_end(lane_key, last=False)
+                        bucket = self._chat_bucket(item["chat_id"])
+                        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+                        self.metrics["retries"] += 1
+                    else:
+                        self.metrics["failed"] += 1
+                self.condition.notify_all()
+
+    def _send(self, item):
+        """
+        Mesajı gönderir.
+        :return: Tekrar denenmesi gerekiyorsa bekleme süresi (sn), aksi halde None
+        """
+        text = item["text"] if item["count"] == 1 else f"{item['text']}\n🔁 (son {item['count']} bildirim birleştirildi)"
+        data = {"chat_id": item["chat_id"], "text": text}
+        if item["parse_mode"]:
+            data["parse_mode"] = item["parse_mode"]
+        try:
+            response = self.session.post(self.api_url, data=data, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Telegram bağlantı hatası: {str(e)}")
+            return min(2 ** item["attempts"], 30)
+
+        if response.status_code == 200:
+            with self.condition:
+                self.metrics["sent"] += 1
+            return None
+        if response.status_code == 429:
+            with self.condition:
+                self.metrics["rate_limited"] += 1
+            try:
+                return float(response.json().get("parameters", {}).get("retry_after", 1))
+            except ValueError:
+                return 1.0
+        if response.status_code >= 500:
+            return min(2 ** item["attempts"], 30)
+
+        print(f"⚠️ Telegram mesajı gönderilemedi: {response.text}")
+        with self.condition:
+            self.metrics["failed"] += 1
+        return None
+
+    # 📌 Yaşam döngüsü
+    def start(self):
+        if self.running:
+            return self
+        self.session = requests.Session()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="telegram-dispatcher", daemon=True)
+        self.thread.start()
+        return self
+
+    def flush(self, timeout=5.0):
+        """Özetler dahil kuyruk boşalana kadar (en fazla `timeout` sn) bekler."""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            self._flush_due_digests(time.monotonic(), force=True)
+            self.condition.notify_all()
+            while (any(self.lanes.values()) or self.sending) and time.monotonic() < deadline:
+                self.condition.wait(min(0.1, max(0.0, deadline - time.monotonic())))
+            return not any(self.lanes.values()) and not self.sending
+
+    def stop(self, timeout=5.0):
+        """Kalan mesajları göndermeye çalışır ve thread'i durdurur."""
+        if not self.running:
+            return
+        self.flush(timeout)
+        with self.condition:
+            self.running = False
+            for lane in self.lanes.values():
+                lane.clear()
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+    def depth(self):
+        with self.condition:
+            return {PRIORITY_NAMES[priority]: len(lane) for priority, lane in self.lanes.items()}
+
+    def get_metrics(self):
+        with self.condition:
+            return {**self.metrics, "dropped": dict(self.metrics["dropped"]),
+                    "depth": {PRIORITY_NAMES[priority]: len(lane) for priority, lane in self.lanes.items()},
+                    "digest_pending": sum(len(lines) for _, lines in self.digests.values())}
+
+def _create_dispatcher():
+    dispatcher = TelegramDispatcher().start()
+    atexit.register(dispatcher.stop, 3.0)  # Süreç kapanırken bekleyen uyarılar gönderilsin
+    return dispatcher
+
+def get_telegram_dispatcher():
+    """Süreç genelinde paylaşılan gönderici (ilk kullanımda başlatılır)."""
+    from config.app_context import get_app_context
+
+    return get_app_context().get_or_create("telegram_dispatcher", _create_dispatcher)
+
+# 📌 **Doğrudan çalıştırılırsa yerel sahte Telegram sunucusu ile benchmark yapılır**
+if __name__ == "__main__":
+    import json
+    from urllib.parse import parse_qs
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StubTelegramHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        latency = 0.05  # Telegram API gidiş-dönüş süresi benzetimi
+        received = []
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(self.latency)
+            StubTelegramHandler.received.append(body)
+            payload = json.dumps({"ok": True, "result": {}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTelegramHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    calls = 200
+
+    # 🐢 Eski yöntem: her çağrıda bloklayan requests.post
+    started = time.perf_counter()
+    for index in range(20):
+        requests.post(f"{base_url}/botTOKEN/sendMessage", data={"chat_id": "1", "text": f"mesaj {index}"})
+    blocking_ms = (time.perf_counter() - started) / 20 * 1000
+
+    # ⚡ Gönderici: çağıranın ödediği süre ve bütün mesajların gönderilme süresi (hız sınırı kapalı)
+    dispatcher = TelegramDispatcher("TOKEN", "1", api_base_url=base_url, digest_interval=0.5, rate_limit=False).start()
+    StubTelegramHandler.received.clear()
+    started = time.perf_counter()
+    for index in range(calls):
+        if index % 4 == 0:
+            dispatcher.submit(f"🔧 Kaldıraç: {index % 10}x", priority=PRIORITY_DIGEST, key="leverage")
+        elif index % 4 == 1:
+            dispatcher.submit(f"📈 AI İşlem Kararı #{index}", key="ws_decision")
+        elif index % 4 == 2:
+            dispatcher.submit(f"✅ Dolum #{index}", priority=PRIORITY_TRADE)
+        else:
+            dispatcher.submit(f"🚨 Hata #{index}", priority=PRIORITY_CRITICAL)
+    submit_us = (time.perf_counter() - started) / calls * 1e6
+    dispatcher.flush(30)
+    drain_seconds = time.perf_counter() - started
+    metrics = dispatcher.get_metrics()
+    dispatcher.stop()
+
+    print(f"🐢 Bloklayan requests.post: {blocking_ms:.1f} ms/çağrı (çağıran bekler)")
+    print(f"⚡ Gönderici submit       : {submit_us:.1f} µs/çağrı")
+    print(f"📨 {calls} çağrı -> {metrics['sent']} HTTP mesajı ({metrics['coalesced']} birleşti, "
+          f"{metrics['digested']} özete girdi), {drain_seconds:.2f} sn'de boşaldı")
+
+    # ⏱️ Hız sınırı açıkken: 1 mesaj/sn/sohbet, kritik mesajlar kuyruktaki bilgi mesajlarını geçer
+    dispatcher = TelegramDispatcher("TOKEN", "1", api_base_url=base_url).start()
+    StubTelegramHandler.received.clear()
+    for index in range(5):
+        dispatcher.submit(f"bilgi {index}")
+    dispatcher.submit("🚨 kritik", priority=PRIORITY_CRITICAL)
+    dispatcher.flush(15)
+    order = [parse_qs(body.decode())["text"][0] for body in StubTelegramHandler.received]
+    print(f"🚦 Hız sınırlı gönderim sırası: {order}")
+    dispatcher.stop()
+    server.shutdown()
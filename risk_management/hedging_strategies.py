@@ -1,6 +1,7 @@
 import numpy as np
-from trading.binance_futures import execute_trade, get_binance_price
+from trading.binance_futures import execute_trade
 from risk_management.leverage_manager import dynamic_leverage
+from Websocket.stream_manager import get_live_price
 
 def delta_hedging(entry_price, volatility):
     """
@@ -76,8 +77,9 @@ def correlation_hedging():
     BTC-ETH fiyat korelasyonuna göre hedge stratejisi.
     """
     try:
-        btc_price = get_binance_price("BTCUSDT")
-        eth_price = get_binance_price("ETHUSDT")
+        # Akış önbelleğinden son fiyatlar (taze değilse REST'e düşer)
+        btc_price = get_live_price("BTCUSDT")
+        eth_price = get_live_price("ETHUSDT")
 
         if btc_price is None or eth_price is None:
             print("⚠️ Fiyat verileri alınamadı, korelasyon hedge uygulanamadı.")
@@ -1,12 +1,8 @@
-from binance.client import Client
-from config.config import BINANCE_API_KEY, BINANCE_API_SECRET, USE_TESTNET
+from config.app_context import get_binance_client
 from risk_management.stop_loss import calculate_stop_loss, calculate_take_profit
 from trading.leverage_manager import determine_leverage
 from notifications.telegram_bot import send_telegram_message
 
-# **🚀 Binance API Bağlantısı**
-client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=USE_TESTNET)
-
 def execute_trade(symbol, trade_type, quantity):
     """Binance Futures'ta işlem açar ve stop-loss/take-profit belirler."""
     try:
@@ -15,10 +11,10 @@ def execute_trade(symbol, trade_type, quantity):
 
         # **📌 AI Destekli Kaldıraç Yönetimi**
         leverage = determine_leverage()
-        client.futures_change_leverage(symbol=symbol, leverage=leverage)
+        get_binance_client().futures_change_leverage(symbol=symbol, leverage=leverage)
 
         # **📌 Piyasa Fiyatı Alma**
-        mark_price_info = client.futures_mark_price(symbol=symbol)
+        mark_price_info = get_binance_client().futures_mark_price(symbol=symbol)
         entry_price = float(mark_price_info["markPrice"]) if mark_price_info else None
 
         if entry_price is None:
@@ -35,7 +31,7 @@ def execute_trade(symbol, trade_type, quantity):
         side = "BUY" if trade_type.upper() == "LONG" else "SELL"
 
         # **📌 Market Order Aç**
-        order = client.futures_create_order(
+        order = get_binance_client().futures_create_order(
             symbol=symbol,
             side=side,
             type="MARKET",
@@ -43,7 +39,7 @@ def execute_trade(symbol, trade_type, quantity):
         )
 
         # **📌 Stop-Loss Order Aç**
-        client.futures_create_order(
+        get_binance_client().futures_create_order(
             symbol=symbol,
             side="SELL" if trade_type.upper() == "LONG" else "BUY",
             type="STOP_MARKET",
@@ -52,7 +48,7 @@ def execute_trade(symbol, trade_type, quantity):
         )
 
         # **📌 Take-Profit Order Aç**
-        client.futures_create_order(
+        get_binance_client().futures_create_order(
             symbol=symbol,
             side="SELL" if trade_type.upper() == "LONG" else "BUY",
             type="TAKE_PROFIT_MARKET",
@@ -81,10 +77,10 @@ def execute_trade(symbol, trade_type, quantity):
 def close_position(symbol):
     """Açık pozisyonları kapatır."""
     try:
-        positions = client.futures_position_information()
+        positions = get_binance_client().futures_position_information()
         for pos in positions:
             if pos["symbol"] == symbol and float(pos["positionAmt"]) != 0:
-                client.futures_create_order(
+                get_binance_client().futures_create_order(
                     symbol=symbol,
                     side="SELL" if float(pos["positionAmt"]) > 0 else "BUY",
                     type="MARKET",
@@ -103,7 +99,7 @@ def place_limit_order(symbol, trade_type, quantity, limit_price):
             raise ValueError("⚠️ Hata: İşlem miktarı veya limit fiyatı negatif olamaz.")
 
         side = "BUY" if trade_type.upper() == "LONG" else "SELL"
-        order = client.futures_create_order(
+        order = get_binance_client().futures_create_order(
             symbol=symbol,
             side=side,
             type="LIMIT",
@@ -123,7 +119,7 @@ def place_trailing_stop_order(symbol, trade_type, quantity, callback_rate=1.0):
             raise ValueError("⚠️ Hata: İşlem miktarı veya callback oranı negatif olamaz.")
 
         side = "SELL" if trade_type.upper() == "LONG" else "BUY"
-        order = client.futures_create_order(
+        order = get_binance_client().futures_create_order(
             symbol=symbol,
             side=side,
             type="TRAILING_STOP_MARKET",
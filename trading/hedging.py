@@ -2,6 +2,7 @@ import numpy as np
 from trading.binance_futures import execute_trade
 from risk_management.leverage import determine_leverage
 from notifications.telegram_bot import send_telegram_message
+from Websocket.stream_manager import get_live_price
 
 def delta_hedging(entry_price, volatility):
     """📉 AI destekli Delta Hedge stratejisi"""
@@ -63,8 +64,12 @@ def vega_hedging(volatility, vega_value):
 def correlation_hedging():
     """🔄 BTC ve ETH fiyat korelasyonunu AI ile analiz ederek hedge işlemi açar."""
     try:
-        btc_price = np.random.uniform(30000, 50000)  # Simüle edilmiş fiyat verisi (Gerçek fiyat API'den alınabilir)
-        eth_price = np.random.uniform(1500, 4000)
+        # Akış önbelleğinden son fiyatlar (taze değilse REST'e düşer)
+        btc_price = get_live_price("BTCUSDT")
+        eth_price = get_live_price("ETHUSDT")
+        if btc_price is None or eth_price is None:
+            print("⚠️ Fiyat verileri alınamadı, korelasyon hedge uygulanamadı.")
+            return
         correlation = np.corrcoef([btc_price], [eth_price])[0, 1]
 
         if correlation > 0.8:
@@ -1,11 +1,7 @@
 import numpy as np
 from trading.binance_futures import execute_trade
-from notifications.telegram_bot import send_telegram_message
-from binance.client import Client
-from config.config import BINANCE_API_KEY, BINANCE_API_SECRET, USE_TESTNET
-
-# **🚀 Binance API Bağlantısı**
-client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=USE_TESTNET)
+from notifications.telegram_bot import send_telegram_message, PRIORITY_DIGEST
+from config.app_context import get_binance_client
 
 def dynamic_leverage(volatility):
     """📈 AI destekli dinamik kaldıraç hesaplama (1x-10x)"""
@@ -21,7 +17,7 @@ def dynamic_leverage(volatility):
 
         message = f"🔧 AI Destekli Kaldıraç: {leverage}x (Volatilite: {volatility:.4f})"
         print(message)
-        send_telegram_message(message)
+        send_telegram_message(message, priority=PRIORITY_DIGEST, key="dynamic_leverage")  # Her hesaplamada değil, özet mesajda
 
         return leverage
     except Exception as e:
@@ -34,7 +30,7 @@ def adjust_leverage(symbol, volatility):
         leverage = dynamic_leverage(volatility)
 
         # Mevcut kaldıraç değerini kontrol et
-        account_info = client.futures_account()
+        account_info = get_binance_client().futures_account()
         current_leverage = None
         for position in account_info.get("positions", []):
             if position["symbol"] == symbol:
@@ -45,7 +41,7 @@ def adjust_leverage(symbol, volatility):
         if current_leverage and current_leverage == leverage:
             message = f"⚡ {symbol} için kaldıraç zaten {leverage}x, değişiklik yapılmadı."
         else:
-            client.futures_change_leverage(symbol=symbol, leverage=leverage)
+            get_binance_client().futures_change_leverage(symbol=symbol, leverage=leverage)
             message = f"✅ {symbol} için kaldıraç {leverage}x olarak güncellendi."
 
         print(message)
@@ -1,14 +1,13 @@
-from binance.client import Client
-from config.config import BINANCE_API_KEY, BINANCE_API_SECRET, USE_TESTNET
 from risk_management.leverage_manager import adjust_leverage
 from risk_management.stop_loss import calculate_dynamic_stop_loss, calculate_dynamic_take_profit
 from notifications.telegram_bot import send_telegram_message
+from trading.retry_engine import submit_order
 
-# **🚀 Binance API Bağlantısı**
-client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=USE_TESTNET)
+# 📌 Emirler RetryEngine üzerinden gönderilir: fonksiyonlar beklemeden bir Future döndürür,
+# geçici hatalar zamanlayıcıda yeniden denenir ve kalıcı hatalar motor tarafından bildirilir.
 
 def place_market_order(symbol, trade_type, quantity, volatility):
-    """📈 AI destekli market order (anlık alım-satım) işlemi"""
+    """📈 AI destekli market order (anlık alım-satım) işlemi; sonuç için Future döndürür"""
     try:
         if quantity <= 0:
             raise ValueError("⚠️ Hata: İşlem miktarı sıfır veya negatif olamaz.")
@@ -16,145 +15,140 @@ def place_market_order(symbol, trade_type, quantity, volatility):
         leverage = adjust_leverage(symbol, volatility)
         side = "BUY" if trade_type.upper() == "LONG" else "SELL"
 
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=side,
-            type="MARKET",
-            quantity=quantity
-        )
-
         message = (
             f"🚀 Market {trade_type.upper()} işlemi açıldı!\n"
             f"📌 {symbol}\n"
             f"💰 Miktar: {quantity} BTC\n"
             f"⚡ Kaldıraç: {leverage}x"
         )
-        print(message)
-        send_telegram_message(message)
+        print(f"📤 Market {trade_type.upper()} emri kuyruğa alındı: {symbol} {quantity}")
 
-        return order
+        return submit_order(
+            symbol,
+            description=f"{symbol} Market {trade_type.upper()}",
+            notify=message,
+            side=side,
+            type="MARKET",
+            quantity=quantity
+        )
     except Exception as e:
         error_message = f"⚠️ Market Order Hatası: {str(e)}"
         print(error_message)
         send_telegram_message(error_message)
 
 def place_limit_order(symbol, trade_type, quantity, limit_price):
-    """📊 AI destekli limit emir (belirlenen fiyattan işlem açma)"""
+    """📊 AI destekli limit emir (belirlenen fiyattan işlem açma); sonuç için Future döndürür"""
     try:
         if quantity <= 0 or limit_price <= 0:
             raise ValueError("⚠️ Hata: İşlem miktarı veya limit fiyatı sıfır veya negatif olamaz.")
 
         side = "BUY" if trade_type.upper() == "LONG" else "SELL"
 
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=side,
-            type="LIMIT",
-            price=limit_price,
-            quantity=quantity,
-            timeInForce="GTC"
-        )
-
         message = (
             f"🟢 Limit {trade_type.upper()} emri girildi!\n"
             f"📌 {symbol}\n"
             f"💲 Limit Fiyatı: {limit_price} USDT\n"
             f"💰 Miktar: {quantity}"
         )
-        print(message)
-        send_telegram_message(message)
+        print(f"📤 Limit {trade_type.upper()} emri kuyruğa alındı: {symbol} @ {limit_price}")
 
-        return order
+        return submit_order(
+            symbol,
+            description=f"{symbol} Limit {trade_type.upper()}",
+            notify=message,
+            side=side,
+            type="LIMIT",
+            price=limit_price,
+            quantity=quantity,
+            timeInForce="GTC"
+        )
     except Exception as e:
         error_message = f"⚠️ Limit Order Hatası: {str(e)}"
         print(error_message)
         send_telegram_message(error_message)
 
 def place_trailing_stop_order(symbol, trade_type, quantity, activation_price, callback_rate):
-    """🔄 AI destekli trailing stop-loss (otomatik stop seviyesi)"""
+    """🔄 AI destekli trailing stop-loss (otomatik stop seviyesi); sonuç için Future döndürür"""
     try:
         if quantity <= 0 or activation_price <= 0 or callback_rate <= 0:
             raise ValueError("⚠️ Hata: Parametrelerden biri geçersiz!")
 
         side = "SELL" if trade_type.upper() == "LONG" else "BUY"
 
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=side,
-            type="TRAILING_STOP_MARKET",
-            activationPrice=activation_price,
-            callbackRate=callback_rate,
-            quantity=quantity
-        )
-
         message = (
             f"🔄 Trailing Stop {trade_type.upper()} ayarlandı!\n"
             f"📌 {symbol}\n"
             f"💲 Aktivasyon Fiyatı: {activation_price} USDT\n"
             f"📉 Callback Oranı: {callback_rate}%"
         )
-        print(message)
-        send_telegram_message(message)
+        print(f"📤 Trailing Stop {trade_type.upper()} emri kuyruğa alındı: {symbol}")
 
-        return order
+        return submit_order(
+            symbol,
+            description=f"{symbol} Trailing Stop {trade_type.upper()}",
+            notify=message,
+            side=side,
+            type="TRAILING_STOP_MARKET",
+            activationPrice=activation_price,
+            callbackRate=callback_rate,
+            quantity=quantity
+        )
     except Exception as e:
         error_message = f"⚠️ Trailing Stop Order Hatası: {str(e)}"
         print(error_message)
         send_telegram_message(error_message)
 
 def place_stop_loss_order(symbol, trade_type, quantity, entry_price, volatility):
-    """🛑 AI destekli stop-loss işlemi (dinamik)"""
+    """🛑 AI destekli stop-loss işlemi (dinamik); sonuç için Future döndürür"""
     try:
         stop_loss_price = calculate_dynamic_stop_loss(entry_price, volatility)
 
         side = "SELL" if trade_type.upper() == "LONG" else "BUY"
 
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=side,
-            type="STOP_MARKET",
-            stopPrice=stop_loss_price,
-            quantity=quantity
-        )
-
         message = (
             f"🛑 Stop-Loss {trade_type.upper()} ayarlandı!\n"
             f"📌 {symbol}\n"
             f"🛑 Stop-Loss Fiyatı: {stop_loss_price} USDT"
         )
-        print(message)
-        send_telegram_message(message)
+        print(f"📤 Stop-Loss {trade_type.upper()} emri kuyruğa alındı: {symbol} @ {stop_loss_price}")
 
-        return order
+        return submit_order(
+            symbol,
+            description=f"{symbol} Stop-Loss {trade_type.upper()}",
+            notify=message,
+            side=side,
+            type="STOP_MARKET",
+            stopPrice=stop_loss_price,
+            quantity=quantity
+        )
     except Exception as e:
         error_message = f"⚠️ Stop-Loss Order Hatası: {str(e)}"
         print(error_message)
         send_telegram_message(error_message)
 
 def place_take_profit_order(symbol, trade_type, quantity, entry_price, volatility):
-    """🎯 AI destekli take-profit işlemi (dinamik)"""
+    """🎯 AI destekli take-profit işlemi (dinamik); sonuç için Future döndürür"""
     try:
         take_profit_price = calculate_dynamic_take_profit(entry_price, volatility)
 
         side = "SELL" if trade_type.upper() == "LONG" else "BUY"
 
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=side,
-            type="TAKE_PROFIT_MARKET",
-            stopPrice=take_profit_price,
-            quantity=quantity
-        )
-
         message = (
             f"🎯 Take-Profit {trade_type.upper()} ayarlandı!\n"
             f"📌 {symbol}\n"
             f"🎯 Take-Profit Fiyatı: {take_profit_price} USDT"
         )
-        print(message)
-        send_telegram_message(message)
+        print(f"📤 Take-Profit {trade_type.upper()} emri kuyruğa alındı: {symbol} @ {take_profit_price}")
 
-        return order
+        return submit_order(
+            symbol,
+            description=f"{symbol} Take-Profit {trade_type.upper()}",
+            notify=message,
+            side=side,
+            type="TAKE_PROFIT_MARKET",
+            stopPrice=take_profit_price,
+            quantity=quantity
+        )
     except Exception as e:
         error_message = f"⚠️ Take-Profit Order Hatası: {str(e)}"
         print(error_message)
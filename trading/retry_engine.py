@@ -0,0 +1,464 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from config.config import RETRY_MAX_WORKERS, CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_RESET_SECONDS
+from config.app_context import get_app_context, get_binance_client
+from notifications.telegram_bot import send_telegram_message, PRIORITY_CRITICAL, PRIORITY_TRADE
+from utils.lazy_import import lazy_import
+
+requests = lazy_import("requests")
+
+# 📌 Hata sınıfları
+ERROR_NETWORK = "network"                  # Bağlantı / zaman aşımı (istek borsaya ulaşmamış olabilir)
+ERROR_UNKNOWN_STATUS = "unknown_status"    # İstek gitti ama sonucu bilinmiyor (-1007 ...)
+ERROR_RATE_LIMIT = "rate_limit"            # 429 / 418 / -1003 / -1015
+ERROR_SERVER = "server"                    # 5xx / -1000 / -1001
+ERROR_TIMESTAMP = "timestamp"              # -1021: istek zamanı recvWindow dışında
+ERROR_DUPLICATE = "duplicate"              # -4116: aynı clientOrderId zaten var (emir önceden girilmiş)
+ERROR_INSUFFICIENT_BALANCE = "insufficient_balance"  # -2018 / -2019
+ERROR_SYMBOL_UNAVAILABLE = "symbol_unavailable"      # Sembol işlem dışı / kapalı
+ERROR_REJECTED = "rejected"                # Emir kuralları nedeniyle reddedildi (-2010, -2021, -2022 ...)
+ERROR_INVALID = "invalid"                  # Parametre / hassasiyet hataları (-11xx, -4003 ...)
+ERROR_AUTH = "auth"                        # API anahtarı / imza / yetki
+ERROR_CIRCUIT_OPEN = "circuit_open"        # Devre kesici açıkken istek yapılmadı
+ERROR_UNKNOWN = "unknown"
+
+# 📌 Binance USDⓈ-M Futures hata kodları -> sınıf
+BINANCE_ERROR_CODES = {
+    -1000: ERROR_SERVER, -1001: ERROR_SERVER, -1006: ERROR_UNKNOWN_STATUS, -1007: ERROR_UNKNOWN_STATUS,
+    -1003: ERROR_RATE_LIMIT, -1008: ERROR_SERVER, -1015: ERROR_RATE_LIMIT, -1016: ERROR_SERVER,
+    -1021: ERROR_TIMESTAMP, -1022: ERROR_AUTH, -2014: ERROR_AUTH, -2015: ERROR_AUTH,
+    -2010: ERROR_REJECTED, -2021: ERROR_REJECTED, -2022: ERROR_REJECTED, -2011: ERROR_REJECTED,
+    -2018: ERROR_INSUFFICIENT_BALANCE, -2019: ERROR_INSUFFICIENT_BALANCE,
+    -4116: ERROR_DUPLICATE, -1121: ERROR_SYMBOL_UNAVAILABLE, -4140: ERROR_SYMBOL_UNAVAILABLE,
+    -1111: ERROR_INVALID, -1116: ERROR_INVALID, -1117: ERROR_INVALID, -4003: ERROR_INVALID,
+    -4164: ERROR_INVALID, -1102: ERROR_INVALID, -1106: ERROR_INVALID,
+}
+
+# **📌 Bildirimsel Yeniden Deneme Politikaları**
+# retry: tekrar denenir mi | breaker: hangi devre kesici etkilenir
+#   "symbol":   sembolün bütün istekleri (ör. sembol işlem dışı)
+#   "endpoint": sadece bu sembolün bu uç noktası (ör. BTCUSDT emirleri; ETHUSDT emirleri devam eder)
+RetryPolicy = namedtuple("RetryPolicy", "retry max_attempts base_delay max_delay breaker")
+
+RETRY_POLICIES = {
+    ERROR_NETWORK: RetryPolicy(True, 5, 0.5, 10.0, "endpoint"),
+    ERROR_UNKNOWN_STATUS: RetryPolicy(True, 5, 0.5, 10.0, "endpoint"),
+    ERROR_SERVER: RetryPolicy(True, 4, 1.0, 30.0, "endpoint"),
+    ERROR_RATE_LIMIT: RetryPolicy(True, 5, 2.0, 60.0, "endpoint"),  # Bekleme asıl olarak ağırlık limitleyicisinde
+    ERROR_TIMESTAMP: RetryPolicy(True, 3, 0.2, 2.0, None),
+    ERROR_SYMBOL_UNAVAILABLE: RetryPolicy(False, 1, 0.0, 0.0, "symbol"),
+    ERROR_INSUFFICIENT_BALANCE: RetryPolicy(False, 1, 0.0, 0.0, None),
+    ERROR_REJECTED: RetryPolicy(False, 1, 0.0, 0.0, None),
+    ERROR_INVALID: RetryPolicy(False, 1, 0.0, 0.0, None),
+    ERROR_AUTH: RetryPolicy(False, 1, 0.0, 0.0, "endpoint"),
+    ERROR_CIRCUIT_OPEN: RetryPolicy(False, 1, 0.0, 0.0, None),
+    ERROR_UNKNOWN: RetryPolicy(True, 2, 1.0, 5.0, None),
+}
+
+class CircuitOpenError(RuntimeError):
+    """Devre kesici açıkken istek yapılmadı."""
+
+def classify_error(exception):
+    """Binance / ağ hatasını RETRY_POLICIES sınıflarından birine eşler."""
+    if isinstance(exception, CircuitOpenError):
+        return ERROR_CIRCUIT_OPEN
+    code = getattr(exception, "code", None)
+    if isinstance(code, int) and code in BINANCE_ERROR_CODES:
+        return BINANCE_ERROR_CODES[code]
+
+    status_code = getattr(exception, "status_code", None)
+    if status_code in (418, 429):
+        return ERROR_RATE_LIMIT
+    if isinstance(status_code, int) and status_code >= 500:
+        return ERROR_SERVER
+    if isinstance(exception, requests.exceptions.ReadTimeout):
+        return ERROR_UNKNOWN_STATUS  # İstek gönderildi, yanıt gelmedi
+    if isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                              ConnectionError, TimeoutError)):
+        return ERROR_NETWORK
+
+    message = str(exception).lower()
+    if "insufficient" in message or "margin is insufficient" in message:
+        return ERROR_INSUFFICIENT_BALANCE
+    if "rate limit" in message or "too many requests" in message:
+        return ERROR_RATE_LIMIT
+    if "network issue" in message or "connection" in message or "timed out" in message:
+        return ERROR_NETWORK
+    return ERROR_UNKNOWN
+
+def backoff_delay(policy, attempt):
+    """Full-jitter üstel bekleme: [0, min(max_delay, base_delay * 2^(attempt-1))]."""
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1)))
+
+def new_client_order_id(prefix="bot"):
+    """Binance newClientOrderId (en fazla 36 karakter, [A-Za-z0-9_-])."""
+    return f"{prefix}-{uuid.uuid4().hex[:28]}"
+
+# **📌 Devre Kesici**
+class CircuitBreaker:
+    """
+    Art arda `failure_threshold` hatada açılır; `reset_timeout` boyunca bu
+    sembol/uç nokta için istek yapılmaz. Süre dolunca tek bir deneme isteğine
+    izin verilir (half-open); başarılıysa kapanır, değilse tekrar açılır.
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_BREAKER_FAILURES, reset_timeout=CIRCUIT_BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+        self.metrics = {"opened": 0, "rejected": 0}
+
+    def retry_after(self):
+        """
+        İstek şimdi yapılabiliyorsa 0, değilse beklenecek süre (sn). Durumu
+        değiştirmez; deneme hakkı ayrıca claim_trial() ile alınır.
+        """
+        with self.lock:
+            if self.state == "closed":
+                return 0.0
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.metrics["rejected"] += 1
+                return remaining
+            if self.trial_in_flight:
+                return min(1.0, self.reset_timeout)
+            return 0.0
+
+    def claim_trial(self):
+        """Süresi dolmuş devre için tek deneme hakkını alır (half-open). :return: Hak alındıysa True"""
+        with self.lock:
+            if self.state == "closed" or self.trial_in_flight:
+                return False
+            if self.opened_at + self.reset_timeout > time.monotonic():
+                return False
+            self.state = "half_open"
+            self.trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Sonuçlanmadan bırakılan deneme hakkını geri verir (devre açık kalır, sonraki istek deneyebilir)."""
+        with self.lock:
+            if self.trial_in_flight:
+                self.trial_in_flight = False
+                if self.state == "half_open":
+                    self.state = "open"
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """:return: Devre bu hatayla açıldıysa True"""
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.metrics["opened"] += 1
+                return True
+            return False
+
+    def snapshot(self):
+        with self.lock:
+            return {"state": self.state, "failures": self.failures, **self.metrics}
+
+class _Task:
+    __slots__ = ("operation", "symbol", "endpoint", "description", "lookup", "future", "attempt",
+                 "last_category", "deadline", "trials")
+
+    def __init__(self, operation, symbol, endpoint, description, lookup, deadline):
+        self.operation = operation
+        self.symbol = symbol
+        self.endpoint = endpoint
+        self.description = description
+        self.lookup = lookup
+        self.future = Future()
+        self.attempt = 0
+        self.last_category = None
+        self.deadline = deadline
+        self.trials = []  # Bu denemenin aldığı half-open deneme hakları
+
+# **📌 Bloklamayan Yeniden Deneme Motoru**
+class RetryEngine:
+    """
+    İşlemler bir thread havuzunda çalışır; hata olursa sınıfına göre
+    (RETRY_POLICIES) jitter'lı bekleme ile tek bir zamanlayıcı thread'inde
+    yeniden planlanır. Çağıran thread hiç uyumaz; sonuç Future ile döner.
+
+    - Devre kesiciler sembol ve uç nokta başınadır: BTCUSDT'de açılan devre
+      ETHUSDT emirlerini durdurmaz.
+    - Sonucu bilinmeyen emirler (zaman aşımı) tekrar gönderilmeden önce
+      `lookup` ile clientOrderId üzerinden sorgulanır; -4116 (aynı
+      clientOrderId) yanıtı da mevcut emrin sorgulanmasıyla başarıya çevrilir.
+    """
+
+    def __init__(self, max_workers=RETRY_MAX_WORKERS, default_timeout=120.0):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retry-engine")
+        self.default_timeout = default_timeout
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.claim_lock = threading.Lock()  # Bütün devrelerin kontrolü + deneme hakkı alımı tek adımda
+        self.schedule = []  # (zaman, sıra, görev)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.timer_thread = threading.Thread(target=self._timer_loop, name="retry-engine-timer", daemon=True)
+        self.timer_thread.start()
+        self.metrics = {"submitted": 0, "succeeded": 0, "failed": 0, "retries": 0, "resolved_by_lookup": 0,
+                        "deferred_by_breaker": 0, "errors": {}}
+
+    # 📌 Devre kesiciler
+    def breaker(self, scope, name):
+        key = f"{scope}:{name}"
+        with self.lock:
+            breaker = self.breakers.get(key)
+            if breaker is None:
+                breaker = self.breakers[key] = CircuitBreaker(key)
+            return breaker
+
+    @staticmethod
+    def _endpoint_name(task):
+        return f"{task.endpoint}@{task.symbol}" if task.symbol else task.endpoint
+
+    def _task_breakers(self, task):
+        breakers = []
+        if task.symbol:
+            breakers.append(self.breaker("symbol", task.symbol))
+        if task.endpoint:
+            breakers.append(self.breaker("endpoint", self._endpoint_name(task)))
+        return breakers
+
+    # 📌 Çağıran tarafı
+    def submit(self, operation, symbol=None, endpoint=None, description="", lookup=None, timeout=None):
+        """
+        `operation()` çağrısını arka planda çalıştırır.
+        :param lookup: Sonucu bilinmeyen denemeden sonra, yeniden göndermeden önce
+                       çağrılır; sonuç döndürürse işlem başarılı sayılır (idempotency)
+        :return: concurrent.futures.Future
+        """
+        task = _Task(operation, symbol, endpoint, description or getattr(operation, "__name__", "işlem"), lookup,
+                     time.monotonic() + (timeout or self.default_timeout))
+        with self.lock:
+            self.metrics["submitted"] += 1
+        self.executor.submit(self._attempt, task)
+        return task.future
+
+    def _schedule(self, task, delay):
+        with self.condition:
+            heapq.heappush(self.schedule, (time.monotonic() + delay, next(self.sequence), task))
+            self.condition.notify()
+
+    def _timer_loop(self):
+        while True:
+            with self.condition:
+                while not self.schedule or self.schedule[0][0] > time.monotonic():
+                    self.condition.wait(self.schedule[0][0] - time.monotonic() if self.schedule else None)
+                _, _, task = heapq.heappop(self.schedule)
+            self.executor.submit(self._attempt, task)
+
+    # 📌 Deneme
+    def _attempt(self, task):
+        if task.future.done():
+            return
+        now = time.monotonic()
+        breakers = self._task_breakers(task)
+        with self.claim_lock:
+            # Önce bütün devreler durum değiştirmeden kontrol edilir; deneme hakkı
+            # sadece hepsi izin veriyorsa alınır (bir devre ertelerse diğeri kilitlenmez)
+            wait = max([breaker.retry_after() for breaker in breakers] + [0.0])
+            if wait <= 0:
+                task.trials = [breaker for breaker in breakers if breaker.claim_trial()]
+        if wait > 0:
+            if now + wait > task.deadline:
+                self._fail(task, CircuitOpenError(f"{task.description}: devre kesici açık "
+                                                  f"({task.symbol or ''} {task.endpoint or ''})".strip()))
+                return
+            with self.lock:
+                self.metrics["deferred_by_breaker"] += 1
+            self._schedule(task, wait)
+            return
+
+        # Önceki denemenin sonucu bilinmiyorsa önce sorgula, varsa tekrar gönderme
+        if task.lookup is not None and task.last_category in (ERROR_NETWORK, ERROR_UNKNOWN_STATUS, ERROR_SERVER,
+                                                              ERROR_DUPLICATE):
+            try:
+                existing = task.lookup()
+            except Exception:
+                existing = None
+            if existing:
+                with self.lock:
+                    self.metrics["resolved_by_lookup"] += 1
+                self._succeed(task, existing)
+                return
+            if task.last_category == ERROR_DUPLICATE:
+                self._fail(task, RuntimeError(f"{task.description}: clientOrderId tekrarlandı ama emir bulunamadı"))
+                return
+
+        task.attempt += 1
+        try:
+            result = task.operation()
+        except Exception as e:
+            self._on_error(task, e)
+            return
+        self._succeed(task, result)
+
+    @staticmethod
+    def _release_trials(task):
+        for breaker in task.trials:
+            breaker.release_trial()
+        task.trials = []
+
+    def _succeed(self, task, result):
+        for breaker in self._task_breakers(task):
+            breaker.record_success()
+        task.trials = []
+        with self.lock:
+            self.metrics["succeeded"] += 1
+        task.future.set_result(result)
+
+    def _on_error(self, task, exception):
+        category = classify_error(exception)
+        policy = RETRY_POLICIES[category]
+        task.last_category = category
+        with self.lock:
+            self.metrics["errors"][category] = self.metrics["errors"].get(category, 0) + 1
+
+        if policy.breaker == "symbol" and task.symbol:
+            self._trip(self.breaker("symbol", task.symbol), exception)
+        elif policy.breaker == "endpoint" and task.endpoint:
+            self._trip(self.breaker("endpoint", self._endpoint_name(task)), exception)
+        elif policy.breaker is None:
+            # Borsa yanıt verdi (ör. emir reddi); devreler sağlıklı sayılır
+            for breaker in self._task_breakers(task):
+                breaker.record_success()
+        # Hatayı kaydetmeyen devrelerdeki deneme hakkı geri verilir
+        self._release_trials(task)
+
+        if category == ERROR_DUPLICATE and task.lookup is not None:
+            self._schedule(task, 0.0)  # Mevcut emri sorgulayarak sonuçlandır
+            return
+        delay = backoff_delay(policy, task.attempt)
+        if policy.retry and task.attempt < policy.max_attempts and time.monotonic() + delay < task.deadline:
+            with self.lock:
+                self.metrics["retries"] += 1
+            print(f"🔁 {task.description} başarısız ({category}: {exception}); "
+                  f"{delay:.2f} sn sonra tekrar denenecek ({task.attempt}/{policy.max_attempts})")
+            self._schedule(task, delay)
+            return
+        self._fail(task, exception, category)
+
+    def _trip(self, breaker, exception):
+        if breaker.record_failure():
+            message = (f"⛔ Devre kesici açıldı: {breaker.name} ({breaker.reset_timeout:.0f} sn duraklatıldı). "
+                       f"Son hata: {exception}")
+            print(message)
+            send_telegram_message(message, priority=PRIORITY_CRITICAL, key=f"breaker:{breaker.name}")
+
+    def _fail(self, task, exception, category=None):
+        self._release_trials(task)
+        with self.lock:
+            self.metrics["failed"] += 1
+        category = category or classify_error(exception)
+        try:
+            exception.retry_attempts = task.attempt  # auto_fix_error motordan geçen hatayı böyle ayırt eder
+        except AttributeError:
+            pass
+        message = f"⚠️ {task.description} başarısız ({category}, {task.attempt} deneme): {exception}"
+        print(message)
+        send_telegram_message(message, priority=PRIORITY_CRITICAL, key=f"retry-failed:{task.description}:{category}")
+        task.future.set_exception(exception)
+
+    def get_metrics(self):
+        with self.lock:
+            metrics = {**self.metrics, "errors": dict(self.metrics["errors"])}
+            breakers = list(self.breakers.values())
+        with self.condition:
+            metrics["scheduled"] = len(self.schedule)
+        metrics["breakers"] = {breaker.name: breaker.snapshot() for breaker in breakers}
+        return metrics
+
+def get_retry_engine():
+    """Süreç genelinde paylaşılan yeniden deneme motoru (AppContext üzerinden)."""
+    return get_app_context().get_or_create("retry_engine", RetryEngine)
+
+# **📌 Idempotent Emir Gönderimi**
+def submit_order(symbol, description=None, notify=None, **order_params):
+    """
+    futures_create_order çağrısını yeniden deneme motoruyla gönderir. Her emir
+    bir newClientOrderId alır; tekrar denemeler aynı kimliği kullanır ve sonucu
+    bilinmeyen emir yeniden gönderilmeden önce bu kimlikle sorgulanır.
+    :param notify: Emir başarıyla girildiğinde Telegram'a gönderilecek mesaj
+    :return: concurrent.futures.Future (sonuç: Binance emir yanıtı)
+    """
+    client_order_id = order_params.setdefault("newClientOrderId", new_client_order_id())
+    description = description or f"{symbol} {order_params.get('type', '')} {order_params.get('side', '')} emri"
+
+    def place():
+        return get_binance_client().futures_create_order(symbol=symbol, **order_params)
+
+    def lookup():
+        return get_binance_client().futures_get_order(symbol=symbol, origClientOrderId=client_order_id)
+
+    future = get_retry_engine().submit(place, symbol=symbol, endpoint="/fapi/v1/order", description=description,
+                                       lookup=lookup)
+    if notify:
+        future.add_done_callback(lambda done: send_telegram_message(notify, priority=PRIORITY_TRADE)
+                                 if done.exception() is None else None)
+    return future
+
+# 📌 **Doğrudan çalıştırılırsa arıza benzetimi yapılır**
+if __name__ == "__main__":
+    class FakeBinanceError(Exception):
+        def __init__(self, code, message):
+            super().__init__(f"APIError(code={code}): {message}")
+            self.code = code
+
+    engine = RetryEngine(max_workers=4)
+    placed = {"ETHUSDT": 0, "BTCUSDT": 0}
+
+    def order(symbol):
+        def place():
+            time.sleep(0.01)  # Ağ gecikmesi
+            if symbol == "BTCUSDT":
+                raise FakeBinanceError(-1001, "Internal error; unable to process your request.")
+            placed[symbol] += 1
+            return {"symbol": symbol, "status": "NEW"}
+        return place
+
+    started = time.perf_counter()
+    btc = [engine.submit(order("BTCUSDT"), symbol="BTCUSDT", endpoint="/fapi/v1/order",
+                         description="BTC emri", timeout=3) for _ in range(10)]
+    eth = [engine.submit(order("ETHUSDT"), symbol="ETHUSDT", endpoint="/fapi/v1/order",
+                         description="ETH emri") for _ in range(50)]
+    submit_ms = (time.perf_counter() - started) * 1000
+    for future in eth:
+        future.result()
+    eth_ms = (time.perf_counter() - started) * 1000
+    btc_errors = sum(1 for future in btc if future.exception() is not None)
+    print(f"⚡ 60 emir {submit_ms:.1f} ms'de kuyruğa alındı (çağıran bloklanmadı)")
+    print(f"✅ BTC arızası sürerken 50 ETH emri {eth_ms:.0f} ms'de tamamlandı; BTC başarısız: {btc_errors}/10")
+    print(f"📊 {engine.get_metrics()}")
+
+    # Sonucu bilinmeyen emir: yanıt zaman aşımına uğradı ama emir borsada oluştu
+    exchange_orders = {}
+
+    def place_with_timeout():
+        exchange_orders["bot-1"] = {"clientOrderId": "bot-1", "status": "FILLED"}
+        raise requests.exceptions.ReadTimeout("read timed out")
+
+    result = engine.submit(place_with_timeout, symbol="SOLUSDT", description="SOL emri",
+                           lookup=lambda: exchange_orders.get("bot-1")).result(5)
+    print(f"🔐 Zaman aşımına uğrayan emir tekrar gönderilmedi, sorgulandı: {result} (borsadaki emir: {len(exchange_orders)})")
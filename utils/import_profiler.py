@@ -0,0 +1,80 @@
+import re
+import subprocess
+import sys
+
+# 📌 Başlangıç süresini izlemek istediğimiz giriş modülleri
+DEFAULT_MODULES = [
+    "main",
+    "ai_models.lstm_model",
+    "ai_models.reinforcement_trading",
+    "ai_models.garch_model",
+    "ai_models.monte_carlo_simulation",
+    "ai_models.risk_analysis",
+]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# **📌 -X importtime Çıktısını Ölç**
+def profile_import(module_name, python=sys.executable):
+    """
+    Modülü temiz bir yorumlayıcıda `-X importtime` ile içe aktarır.
+    :return: {"module", "total_ms", "modules": [(ad, self_ms, cumulative_ms), ...], "error"}
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True, text=True
+    )
+
+    modules = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        modules.append((name, self_us / 1000, cumulative_us / 1000))
+        if len(indent) == 1:  # En üst seviye importlar toplam süreyi verir
+            total_us += cumulative_us
+
+    error = None
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "bilinmeyen hata"
+
+    return {"module": module_name, "total_ms": total_us / 1000, "modules": modules, "error": error}
+
+def print_report(profile, top=15):
+    """En pahalı (kümülatif) importları tablo halinde yazdırır."""
+    if profile["error"]:
+        # Başarısız import erken durur; kısmi süre geçerli bir ölçüm değildir
+        print(f"\n📦 {profile['module']}: ölçülemedi")
+        print(f"   ⚠️ Import hatası: {profile['error']}")
+        return
+    print(f"\n📦 {profile['module']}: toplam {profile['total_ms']:.1f} ms")
+    for name, self_ms, cumulative_ms in sorted(profile["modules"], key=lambda m: m[2], reverse=True)[:top]:
+        print(f"   {cumulative_ms:9.1f} ms  (self {self_ms:7.1f} ms)  {name}")
+
+# 📌 **Doğrudan çalıştırılırsa başlangıç benchmark'ı yapılır**
+# Kullanım: python -m utils.import_profiler [--max-ms 500] [modül ...]
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    max_ms = None
+    if "--max-ms" in args:
+        index = args.index("--max-ms")
+        max_ms = float(args[index + 1])
+        del args[index:index + 2]
+
+    over_budget, failed = [], []
+    for module_name in args or DEFAULT_MODULES:
+        profile = profile_import(module_name)
+        print_report(profile)
+        if profile["error"]:
+            failed.append(module_name)
+        elif max_ms is not None and profile["total_ms"] > max_ms:
+            over_budget.append(module_name)
+
+    if failed:
+        print(f"\n🚨 İçe aktarılamayan modüller: {', '.join(failed)}")
+    if over_budget:
+        print(f"\n🚨 Başlangıç bütçesi ({max_ms} ms) aşıldı: {', '.join(over_budget)}")
+    if failed or over_budget:
+        sys.exit(1)
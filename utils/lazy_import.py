@@ -0,0 +1,48 @@
+import importlib
+import threading
+import types
+
+# **📌 Gecikmeli (Lazy) Modül Yükleme**
+class LazyModule(types.ModuleType):
+    """
+    Gerçek modülü ilk özellik erişiminde içe aktaran vekil (proxy) modül.
+    TensorFlow, stable-baselines3, arch, matplotlib gibi ağır kütüphaneler
+    böylece sadece onları kullanan bir strateji çalıştığında yüklenir.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "yüklendi" if self.__dict__["_lazy_module"] is not None else "yüklenmedi"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(module_name):
+    """
+    `import tensorflow as tf` yerine `tf = lazy_import("tensorflow")` kullanılır.
+    :param module_name: İçe aktarılacak modülün tam adı
+    :return: İlk kullanımda yüklenen LazyModule
+    """
+    return LazyModule(module_name)
+
+def is_loaded(module):
+    """Lazy modülün gerçekten içe aktarılıp aktarılmadığını söyler."""
+    return not isinstance(module, LazyModule) or module.__dict__["_lazy_module"] is not None